@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'users',
     'courses',
     'curriculum',
+    'progresstracker',
     'drf_spectacular',
 ]
 
@@ -53,6 +55,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.access.AccessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,6 +91,24 @@ DATABASES = {
 }
 
 
+# Cache
+# 'default' is shared by every worker process, so dropping progress analytics
+# reaches all of them. Migration core 0027_cache_table creates the table.
+# 'search' holds course search results and facets per process, keyed by the
+# catalog version in the database (see courses/cache.py), so a hit costs no query.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'app_cache',
+    },
+    'search': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'course-search',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -124,6 +145,19 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Lecture videos and files, stored once per content digest (see core/storage.py)
+    'lecture_media': {
+        'BACKEND': 'core.storage.DedupStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -141,6 +175,55 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Course search
+# Seconds facet counts stay cached for one filter signature
+COURSE_FACETS_CACHE_TIMEOUT = 300
+# Seconds a search response stays cached, writes invalidate it earlier
+COURSE_SEARCH_CACHE_TIMEOUT = 600
+# Seconds a worker reuses the catalog version it read, writes in other
+# workers reach its cached search results within this delay
+COURSE_SEARCH_VERSION_TTL = 2
+# Seconds before a worker rebuilds its autocomplete index from the database
+AUTOCOMPLETE_MAX_AGE = 300
+# Popularity score (see Course.recalculate_popularity): reviews of prior
+# weight at the catalog mean rating, and the window and weight of recent enrollments
+POPULARITY_PRIOR_REVIEWS = 10
+POPULARITY_RECENT_DAYS = 30
+POPULARITY_RECENT_WEIGHT = 2.0
+
+# Playback heartbeats (see progresstracker/heartbeat.py): buffered
+# positions are written after this many seconds or (student, lecture) keys
+HEARTBEAT_FLUSH_INTERVAL = 5
+HEARTBEAT_FLUSH_SIZE = 1000
+# Share of a lecture's duration watched that completes it
+HEARTBEAT_COMPLETE_FRACTION = 0.9
+# Seconds a worker trusts a granted heartbeat access check, refusals are not cached
+HEARTBEAT_ACCESS_TTL = 60
+# Progress rows recounted per UPDATE when a lecture is added to or removed
+# from a course (see CourseProgress.recalculate_for_course)
+PROGRESS_RECALCULATION_BATCH_SIZE = 5000
+# Seconds instructor progress analytics are cached, progress writes drop them earlier
+PROGRESS_ANALYTICS_CACHE_TIMEOUT = 60
+# Resumable lecture uploads (see curriculum/uploads.py): directory of the
+# partial files, largest accepted file in bytes, open sessions per lecture and
+# seconds a session may go without a chunk before expire_uploads deletes it
+CHUNKED_UPLOAD_DIR = Path(tempfile.gettempdir()) / 'lecture-uploads'
+CHUNKED_UPLOAD_MAX_SIZE = 5 * 1024 ** 3
+CHUNKED_UPLOAD_MAX_OPEN = 3
+CHUNKED_UPLOAD_EXPIRY = 24 * 3600
+# Lecture media delivery (see curriculum/media.py): 'django' answers Range
+# requests from the application, 'x-accel-redirect' (nginx) and 'x-sendfile'
+# (Apache, lighttpd) hand the file to the web server after the access check
+MEDIA_DELIVERY = 'django'
+# Internal nginx location serving MEDIA_ROOT for 'x-accel-redirect'
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Seconds an unreferenced media blob is kept before collect_media_blobs
+# removes it, covering uploads whose lecture is not saved yet
+MEDIA_BLOB_GRACE_PERIOD = 3600
+# Processes measuring uploaded lecture videos (see curriculum/durations.py),
+# 0 measures them in the committing thread
+MEDIA_DURATION_WORKERS = 2
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Udemy Clone API',
     'DESCRIPTION': 'A professional course management platform API',
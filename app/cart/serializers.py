@@ -4,7 +4,8 @@ Serializer for adding and removing courses in cart
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
-from core.models import Cart, Enrollment, Course
+from core.access import get_access
+from core.models import Cart, Course
 from rest_framework.exceptions import ValidationError as DjangoValidationError
 
 
@@ -46,7 +47,7 @@ class CartSerializers(serializers.ModelSerializer):
         data['course'] = course
         data['student'] = student
         cart = Cart(**data)
-        if Enrollment.objects.filter(student=student, course=course).exists():
+        if get_access(student).is_enrolled(course.id):
             raise serializers.ValidationError(
                 "You already enrolled in this course, check your enrollment list"
             )
@@ -4,13 +4,17 @@ Category Views
 from rest_framework import (mixins, viewsets)
 
 from category import serializers
-from core.models import Category
+from core.conditional import ConditionalListMixin
+from core.models import Category, SubCategory
 
 
 # Admin only will create category in the admin
-class CategoryViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class CategoryViewSet(ConditionalListMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """ViewSet for Category and its SubCategory Listing"""
 
     queryset = Category.objects.prefetch_related('subcategory').all()
     serializer_class = serializers.CategorySerializer
 
+    def get_validator_querysets(self):
+        return super().get_validator_querysets() + [SubCategory.objects.all()]
+
@@ -0,0 +1,156 @@
+"""
+Request-scoped enrollment and ownership lookups.
+
+Permissions, serializers and model validation all ask whether a user is
+enrolled in or teaches a course, often several times per request. Inside a
+request (see AccessMiddleware) the user's enrolled and taught course ids are
+loaded once, with one query each, and lecture/section -> course lookups are
+remembered. Outside a request, e.g. in a shell or a management command, every
+check is a single EXISTS query against the current data.
+
+Enrollment and instructor changes made during the request drop the cached
+ids of that user (see core/signal/signals.py).
+"""
+from contextvars import ContextVar
+
+from core.models import Course, Section, Lecture, Enrollment
+
+# user id -> AccessResolver of the current request, None outside requests
+_resolvers = ContextVar('access_resolvers', default=None)
+
+
+class AccessResolver:
+    """Enrollment and instructor checks of one user"""
+
+    def __init__(self, user_id, cached=True):
+        self.user_id = user_id
+        self.cached = cached
+        # course id -> is_active, loaded on first use
+        self._enrollments = None
+        self._taught = None
+        self._lecture_courses = {}
+        self._section_courses = {}
+
+    def _load_enrollments(self):
+        if self._enrollments is None:
+            self._enrollments = dict(
+                Enrollment.objects.filter(student_id=self.user_id)
+                .values_list('course_id', 'is_active')
+            )
+        return self._enrollments
+
+    def _load_taught(self):
+        if self._taught is None:
+            self._taught = set(
+                Course.instructor.through.objects.filter(user_id=self.user_id)
+                .values_list('course_id', flat=True)
+            )
+        return self._taught
+
+    def is_enrolled(self, course_id, active_only=False):
+        """True when the user has an enrollment, an active one with active_only"""
+        if course_id is None or self.user_id is None:
+            return False
+        if not self.cached:
+            enrollments = Enrollment.objects.filter(student_id=self.user_id, course_id=course_id)
+            if active_only:
+                enrollments = enrollments.filter(is_active=True)
+            return enrollments.exists()
+        course_id = int(course_id)
+        enrollments = self._load_enrollments()
+        return course_id in enrollments and (enrollments[course_id] or not active_only)
+
+    def is_instructor(self, course_id):
+        """True when the user teaches the course"""
+        if course_id is None or self.user_id is None:
+            return False
+        if not self.cached:
+            return Course.instructor.through.objects.filter(
+                user_id=self.user_id, course_id=course_id
+            ).exists()
+        return int(course_id) in self._load_taught()
+
+    def enrolled_course_ids(self, active_only=False):
+        if not self.cached:
+            enrollments = Enrollment.objects.filter(student_id=self.user_id)
+            if active_only:
+                enrollments = enrollments.filter(is_active=True)
+            return set(enrollments.values_list('course_id', flat=True))
+        return {
+            course_id for course_id, is_active in self._load_enrollments().items()
+            if is_active or not active_only
+        }
+
+    def taught_course_ids(self):
+        if not self.cached:
+            return set(
+                Course.instructor.through.objects.filter(user_id=self.user_id)
+                .values_list('course_id', flat=True)
+            )
+        return set(self._load_taught())
+
+    def lecture_course_id(self, lecture_id):
+        """Course id of a lecture, None when it does not exist"""
+        return _course_of(Lecture, 'section__course_id', lecture_id,
+                          self._lecture_courses if self.cached else {})
+
+    def section_course_id(self, section_id):
+        """Course id of a section, None when it does not exist"""
+        return _course_of(Section, 'course_id', section_id,
+                          self._section_courses if self.cached else {})
+
+    def forget(self):
+        """Drop loaded enrollments and taught courses, lookups stay cached"""
+        self._enrollments = None
+        self._taught = None
+
+
+def _course_of(model, field, pk, cache):
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if pk not in cache:
+        cache[pk] = model.objects.filter(pk=pk).values_list(field, flat=True).first()
+    return cache[pk]
+
+
+def get_access(user):
+    """
+    Resolver for a user or user id: the request's shared one inside a request,
+    an uncached one otherwise
+    """
+    user_id = getattr(user, 'pk', user)
+    resolvers = _resolvers.get()
+    if resolvers is None or user_id is None:
+        return AccessResolver(user_id, cached=False)
+    if user_id not in resolvers:
+        resolvers[user_id] = AccessResolver(user_id)
+    return resolvers[user_id]
+
+
+def forget_user(user_id):
+    """Drop the current request's cached ids of a user after they changed"""
+    resolvers = _resolvers.get()
+    if resolvers and user_id in resolvers:
+        resolvers[user_id].forget()
+
+
+def forget_all():
+    """Drop the current request's cached ids of every user"""
+    for resolver in (_resolvers.get() or {}).values():
+        resolver.forget()
+
+
+class AccessMiddleware:
+    """Share one AccessResolver per user for the duration of a request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _resolvers.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _resolvers.reset(token)
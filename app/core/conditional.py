@@ -0,0 +1,87 @@
+"""
+Conditional GET for read endpoints.
+
+Validators are computed before the view runs, from one aggregate query per
+queryset: MAX(updated_at) and COUNT(*). The ETag digests them together with
+the request path, query string and negotiated media type, so a request whose
+If-None-Match still matches is answered 304 Not Modified without serializing
+the payload. Rows removed from a list lower its count and change the ETag.
+
+Last-Modified is only sent for single objects: deleting a row from a list
+does not move MAX(updated_at), so If-Modified-Since cannot validate lists.
+"""
+import hashlib
+import json
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """Shared validator computation of ConditionalListMixin/ConditionalRetrieveMixin"""
+
+    validator_field = 'updated_at'
+
+    def get_validator_querysets(self):
+        """Querysets whose rows make up the response"""
+        return [self.filter_queryset(self.get_queryset())]
+
+    def get_validator_extras(self):
+        """Other values the response depends on, e.g. a cache version"""
+        return []
+
+    def get_validators(self, request):
+        """(etag, last modified datetime or None) of the response to this request"""
+        parts = [request.get_full_path(), getattr(request, 'accepted_media_type', None)]
+        last_modified = None
+        for queryset in self.get_validator_querysets():
+            summary = queryset.order_by().aggregate(
+                last=Max(self.validator_field), total=Count('pk')
+            )
+            parts.append([summary['last'] and summary['last'].isoformat(), summary['total']])
+            if summary['last'] and (last_modified is None or summary['last'] > last_modified):
+                last_modified = summary['last']
+        parts.extend(self.get_validator_extras())
+        digest = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+        return f'"{digest}"', last_modified
+
+    def conditional_response(self, request, handler, *args, with_last_modified=False, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if not with_last_modified:
+            last_modified = None
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """ETag validation of list responses"""
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """ETag and Last-Modified validation of single object responses"""
+
+    def get_validator_querysets(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            # list action of a viewset with both mixins
+            return super().get_validator_querysets()
+        return [self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )]
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, super().retrieve, *args, with_last_modified=True, **kwargs
+        )
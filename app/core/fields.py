@@ -0,0 +1,116 @@
+"""
+Compressed text storage.
+
+CompressedTextField keeps text in a binary column: values of at least
+`threshold` UTF-8 bytes are stored as a gzip stream (zlib, deterministic
+header) when that is smaller, shorter ones as plain UTF-8. A gzip stream
+starts with 0x1f 0x8b, which no UTF-8 text does, so the two never mix up.
+
+Rows are read into a StoredText and decompressed on first attribute
+access; saving an untouched value writes the stored bytes back as they
+are. `StoredText.gzip` is the stored stream itself, for responses sent with
+Content-Encoding: gzip. Text values of rows written before the column held
+bytes are read as they are (see the compress_articles command).
+"""
+import zlib
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def compress(text, threshold):
+    """Stored bytes of a text"""
+    data = text.encode()
+    if len(data) < threshold:
+        return data
+    compressor = zlib.compressobj(level=6, wbits=31)
+    packed = compressor.compress(data) + compressor.flush()
+    return packed if len(packed) < len(data) else data
+
+
+class StoredText:
+    """Database value of a CompressedTextField, decompressed on first use"""
+
+    __slots__ = ('stored', '_text')
+
+    def __init__(self, stored):
+        self.stored = bytes(stored)
+        self._text = None
+
+    @property
+    def gzip(self):
+        """The stored gzip stream, None when the text is stored plain"""
+        return self.stored if self.stored[:2] == GZIP_MAGIC else None
+
+    @property
+    def text(self):
+        if self._text is None:
+            data = zlib.decompress(self.stored, wbits=31) if self.gzip else self.stored
+            self._text = data.decode()
+        return self._text
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Reads the text of a StoredText, which stays in the instance until replaced"""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        return value.text if isinstance(value, StoredText) else value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """Text stored gzip compressed from `threshold` bytes on, in a binary column"""
+
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, threshold=1024, **kwargs):
+        self.threshold = threshold
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.threshold != 1024:
+            kwargs['threshold'] = self.threshold
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def stored_value(self, instance):
+        """StoredText of an instance's value as read from the database, if unchanged"""
+        value = instance.__dict__.get(self.attname)
+        return value if isinstance(value, StoredText) else None
+
+    def pre_save(self, model_instance, add):
+        # an untouched value is written back without recompressing
+        return self.stored_value(model_instance) or super().pre_save(model_instance, add)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, str):
+            return value
+        return StoredText(value)
+
+    def to_python(self, value):
+        if isinstance(value, StoredText):
+            return value.text
+        return super().to_python(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, StoredText) or value is None:
+            return value
+        return super().get_prep_value(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        stored = value.stored if isinstance(value, StoredText) else compress(value, self.threshold)
+        return connection.Database.Binary(stored)
@@ -0,0 +1,185 @@
+"""
+Measure latency and query counts of the read endpoints
+"""
+import json
+import math
+import platform
+import random
+import time
+from collections import Counter
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import (User, Category, Course, Enrollment, Cart,
+                         CourseReview, Lecture)
+from courses.cache import bump_catalog_version
+
+SEARCH_TERMS = ['python', 'django', 'react', 'data', 'design', 'docker',
+                'machine learning', 'excel', 'web dev', 'photo']
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every read endpoint in-process and report p50/p95/p99 latency '
+        'and query counts as JSON. Creates auth tokens for the sampled students.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed requests per endpoint')
+        parser.add_argument('--users', type=int, default=20,
+                            help='Students sampled for the authenticated endpoints')
+        parser.add_argument('--cache', choices=('cold', 'warm'), default='cold',
+                            help='cold invalidates cached search responses before '
+                                 'every request, warm lets them be served')
+        parser.add_argument('--endpoint', action='append', default=[],
+                            help='Only run the named endpoint, repeatable')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark_report.json',
+                            help='Path of the JSON report, - for stdout')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be a positive integer')
+        if not Course.objects.exists():
+            raise CommandError('No courses found, run generate_catalog first')
+
+        self.random = random.Random(options['seed'])
+        self.client = Client(HTTP_HOST=self.get_host())
+        endpoints = self.get_endpoints(options['users'])
+        unknown = set(options['endpoint']) - set(endpoints)
+        if unknown:
+            raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}. "
+                               f"Choose from {', '.join(endpoints)}")
+
+        results = {}
+        for name, make_request in endpoints.items():
+            if options['endpoint'] and name not in options['endpoint']:
+                continue
+            results[name] = self.measure(make_request, options)
+            self.stdout.write(
+                f"{name:<24} p50 {results[name]['p50_ms']:>8.2f} ms  "
+                f"p95 {results[name]['p95_ms']:>8.2f} ms  "
+                f"p99 {results[name]['p99_ms']:>8.2f} ms  "
+                f"queries {results[name]['queries_max']}"
+            )
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'cache': options['cache'],
+                'iterations': options['iterations'],
+            },
+            'dataset': {
+                'courses': Course.objects.count(),
+                'lectures': Lecture.objects.count(),
+                'students': User.objects.filter(role='student').count(),
+                'enrollments': Enrollment.objects.count(),
+                'reviews': CourseReview.objects.count(),
+                'carts': Cart.objects.count(),
+            },
+            'endpoints': results,
+        }
+        payload = json.dumps(report, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(payload)
+        else:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(payload + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    @staticmethod
+    def get_host():
+        """A host the request validation accepts, localhost when DEBUG allows it"""
+        for host in settings.ALLOWED_HOSTS:
+            if host != '*':
+                return host.lstrip('.')
+        return 'localhost'
+
+    def get_endpoints(self, user_count):
+        """name -> callable returning (path, query params, headers) for one request"""
+        course_ids = list(Course.objects.order_by('?').values_list('id', flat=True)[:500])
+        category_names = list(Category.objects.values_list('name', flat=True))
+        student_ids = list(
+            Enrollment.objects.order_by('?').values_list('student_id', flat=True)
+            .distinct()[:user_count]
+        )
+        tokens = [
+            Token.objects.get_or_create(user_id=student_id)[0].key
+            for student_id in student_ids
+        ]
+        search_url = reverse('course:course-search')
+        pick = self.random.choice
+
+        def authorized(path):
+            return lambda: (path, {}, {'HTTP_AUTHORIZATION': f'Token {pick(tokens)}'})
+
+        endpoints = {
+            'course-list': lambda: (reverse('course:course-list'), {}, {}),
+            'search-browse': lambda: (search_url, {}, {}),
+            'search-text': lambda: (search_url, {'q': pick(SEARCH_TERMS)}, {}),
+            'search-filters': lambda: (search_url, {
+                'category': pick(category_names), 'level': 'Beginner', 'price_max': '50',
+            }, {}),
+            'search-popular': lambda: (search_url, {'sort': 'popular'}, {}),
+            'search-facets': lambda: (search_url, {'q': pick(SEARCH_TERMS), 'facets': 'all'}, {}),
+            'search-cursor': lambda: (search_url, {'pagination': 'cursor', 'sort': 'price'}, {}),
+            'autocomplete': lambda: (reverse('course:course-autocomplete'),
+                                     {'q': pick(SEARCH_TERMS)[:3]}, {}),
+            'curriculum': lambda: (reverse('course:curriculum-detail', args=[pick(course_ids)]), {}, {}),
+        }
+        if tokens:
+            endpoints.update({
+                'my-cart': authorized(reverse('course:my-cart')),
+                'my-enrollments': authorized(reverse('course:my-enrollments')),
+                'my-progress': authorized(reverse('course:my-progress')),
+            })
+        return endpoints
+
+    def measure(self, make_request, options):
+        timings = []
+        queries = []
+        statuses = Counter()
+        for iteration in range(options['warmup'] + options['iterations']):
+            path, params, headers = make_request()
+            if options['cache'] == 'cold':
+                bump_catalog_version()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.client.get(path, params, **headers)
+                elapsed = time.perf_counter() - started
+            if iteration < options['warmup']:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses[response.status_code] += 1
+
+        return {
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'queries_p50': percentile(queries, 0.50),
+            'queries_max': max(queries),
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        }
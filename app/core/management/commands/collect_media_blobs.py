@@ -0,0 +1,163 @@
+"""
+Remove lecture media blobs nothing references any more
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import MediaBlob
+from core.storage import BLOB_DIR, TEMP_DIR
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete media blobs without references older than the grace period, '
+        'then blob files without a MediaBlob row, in primary key and directory batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of blobs read and deleted per query',
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=None,
+            help='Seconds an unreferenced blob is kept, MEDIA_BLOB_GRACE_PERIOD by default',
+        )
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Recount every blob\'s references from the lectures first',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be deleted without deleting it',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        grace = options['grace']
+        if grace is None:
+            grace = getattr(settings, 'MEDIA_BLOB_GRACE_PERIOD', 3600)
+        if grace < 0:
+            raise CommandError('--grace must not be negative')
+
+        self.storage = storages['lecture_media']
+        self.dry_run = options['dry_run']
+        cutoff = timezone.now() - timedelta(seconds=grace)
+
+        if options['recount']:
+            recounted = self.recount(batch_size)
+            self.stdout.write(f'Recounted the references of {recounted} blobs')
+        rows = self.delete_unreferenced(cutoff, batch_size)
+        files = self.delete_stray_files(cutoff.timestamp(), batch_size)
+
+        verb = 'Would delete' if self.dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {rows} unreferenced blobs and {files} stray files'
+        ))
+
+    def recount(self, batch_size):
+        changed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                MediaBlob.objects.filter(id__gt=last_id)
+                .order_by('id').values_list('id', 'name')[:batch_size]
+            )
+            if not batch:
+                return changed
+            if not self.dry_run:
+                changed += MediaBlob.recount([name for _, name in batch])
+            last_id = batch[-1][0]
+
+    def delete_unreferenced(self, cutoff, batch_size):
+        deleted = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    MediaBlob.objects.select_for_update()
+                    .filter(id__gt=last_id, ref_count=0, updated_at__lt=cutoff)
+                    .order_by('id').values_list('id', 'name')[:batch_size]
+                )
+                if not batch:
+                    return deleted
+                last_id = batch[-1][0]
+                if not self.dry_run:
+                    batch = self.delete_rows(batch, cutoff)
+            if not self.dry_run:
+                # a blob saved again since has a new row naming the same file
+                names = [name for _, name in batch]
+                saved = set(MediaBlob.objects.filter(name__in=names).values_list('name', flat=True))
+                for name in names:
+                    if name not in saved:
+                        self.remove(self.storage.path(name))
+            deleted += len(batch)
+
+    def delete_rows(self, batch, cutoff):
+        """
+        Delete the rows of a batch still unreferenced and untouched, the DELETE
+        repeating the conditions they were read with, and return the deleted ones.
+        select_for_update() does not lock anything on SQLite, a blob may have
+        been saved or referenced again since it was read.
+        """
+        ids = [blob_id for blob_id, _ in batch]
+        MediaBlob.objects.filter(id__in=ids, ref_count=0, updated_at__lt=cutoff).delete()
+        kept = set(MediaBlob.objects.filter(id__in=ids).values_list('id', flat=True))
+        return [(blob_id, name) for blob_id, name in batch if blob_id not in kept]
+
+    def delete_stray_files(self, cutoff, batch_size):
+        """Blob files without a row and abandoned temporary files, one directory at a time"""
+        deleted = 0
+        root = self.storage.path(BLOB_DIR)
+        temp = self.storage.path(TEMP_DIR)
+        for directory, subdirectories, filenames in os.walk(root):
+            subdirectories.sort()
+            paths = [
+                os.path.join(directory, filename) for filename in filenames
+                if self.older_than(os.path.join(directory, filename), cutoff)
+            ]
+            if directory != temp:
+                for start in range(0, len(paths), batch_size):
+                    chunk = {
+                        os.path.relpath(path, self.storage.location).replace(os.sep, '/'): path
+                        for path in paths[start:start + batch_size]
+                    }
+                    known = set(MediaBlob.objects.filter(name__in=chunk).values_list('name', flat=True))
+                    deleted += self.remove_all(
+                        [path for name, path in chunk.items() if name not in known]
+                    )
+            else:
+                deleted += self.remove_all(paths)
+        return deleted
+
+    def older_than(self, path, cutoff):
+        try:
+            return os.stat(path).st_mtime < cutoff
+        except FileNotFoundError:
+            return False
+
+    def remove_all(self, paths):
+        if not self.dry_run:
+            for path in paths:
+                self.remove(path)
+        return len(paths)
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,78 @@
+"""
+Rewrite lecture articles stored uncompressed in the compressed format
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.fields import StoredText, compress
+from core.models import Lecture
+
+
+class Command(BaseCommand):
+    help = (
+        'Store article bodies of at least the field threshold gzip compressed, '
+        'converting rows written as text before, in primary key batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of lectures read and written per query',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be rewritten without writing it',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        self.dry_run = options['dry_run']
+        self.field = Lecture._meta.get_field('article')
+
+        rewritten = saved = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Lecture.objects.with_content()
+                .filter(id__gt=last_id, article__isnull=False)
+                .order_by('id').values_list('id', 'article')[:batch_size]
+            )
+            if not batch:
+                break
+            changed = []
+            for lecture_id, value in batch:
+                stored = self.stored(value)
+                if stored is None:
+                    continue
+                text = value if isinstance(value, str) else value.text
+                packed = compress(text, self.field.threshold)
+                if packed == stored and isinstance(value, StoredText):
+                    # stored plain because gzip would not make it smaller
+                    continue
+                changed.append(Lecture(pk=lecture_id, article=text))
+                saved += len(stored) - len(packed)
+            if changed and not self.dry_run:
+                with transaction.atomic():
+                    # the text is unchanged, so updated_at and the signals are left alone
+                    Lecture.objects.bulk_update(changed, ['article'])
+            rewritten += len(changed)
+            last_id = batch[-1][0]
+
+        verb = 'Would rewrite' if self.dry_run else 'Rewrote'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {rewritten} articles, saving {saved} bytes'
+        ))
+
+    def stored(self, value):
+        """Stored bytes of a row that may need rewriting, None for a compressed one"""
+        if isinstance(value, str):
+            # written to the text column before the migration
+            return value.encode()
+        if value.gzip is None and len(value.stored) >= self.field.threshold:
+            return value.stored
+        return None
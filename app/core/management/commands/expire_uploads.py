@@ -0,0 +1,69 @@
+"""
+Delete resumable uploads abandoned before they were finalized
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import UploadSession
+from curriculum import uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete open upload sessions that received no chunk for CHUNKED_UPLOAD_EXPIRY '
+        'seconds, with their partial files, in primary key batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of sessions read and deleted per query',
+        )
+        parser.add_argument(
+            '--expiry',
+            type=int,
+            default=None,
+            help='Seconds an open session may go without a chunk, CHUNKED_UPLOAD_EXPIRY by default',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be deleted without deleting it',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        expiry = options['expiry']
+        if expiry is None:
+            expiry = uploads.expiry()
+        if expiry < 0:
+            raise CommandError('--expiry must not be negative')
+
+        cutoff = timezone.now() - timedelta(seconds=expiry)
+        expired = UploadSession.objects.filter(status='open', updated_at__lt=cutoff)
+        deleted = 0
+        last_id = None
+        while True:
+            batch = expired if last_id is None else expired.filter(id__gt=last_id)
+            batch = list(batch.order_by('id')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            if not options['dry_run']:
+                ids = [session.pk for session in batch]
+                # repeats the conditions, a chunk received since keeps the session
+                expired.filter(pk__in=ids).delete()
+                kept = set(UploadSession.objects.filter(pk__in=ids).values_list('pk', flat=True))
+                batch = [session for session in batch if session.pk not in kept]
+                for session in batch:
+                    uploads.discard(session)
+            deleted += len(batch)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} expired uploads'))
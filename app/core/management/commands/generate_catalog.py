@@ -0,0 +1,274 @@
+"""
+Generate a synthetic catalog for load and latency testing
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core import search
+from core.models import (User, Category, SubCategory, Course, Section, Lecture,
+                         Enrollment, CourseReview, Cart, LectureProgress,
+                         CourseProgress)
+from courses.cache import bump_catalog_version
+
+TAXONOMY = {
+    'Development': ['Web Development', 'Mobile Development', 'Game Development',
+                    'Databases', 'Programming Languages'],
+    'Data Science': ['Machine Learning', 'Data Analysis', 'Deep Learning',
+                     'Statistics', 'Data Engineering'],
+    'Design': ['UI Design', 'UX Research', 'Graphic Design', '3D Modeling',
+               'Design Tools'],
+    'Business': ['Entrepreneurship', 'Project Management', 'Sales', 'Finance',
+                 'Strategy'],
+    'IT & Software': ['Cloud Computing', 'Network Security', 'DevOps',
+                      'Operating Systems', 'Certifications'],
+    'Marketing': ['Digital Marketing', 'SEO', 'Content Marketing',
+                  'Social Media', 'Branding'],
+    'Photography': ['Portrait Photography', 'Video Editing', 'Lighting',
+                    'Photo Editing', 'Drone Photography'],
+    'Music': ['Music Production', 'Guitar', 'Piano', 'Vocals', 'Music Theory'],
+}
+
+TOPICS = [
+    'Python', 'Django', 'JavaScript', 'React', 'Node.js', 'SQL', 'PostgreSQL',
+    'Docker', 'Kubernetes', 'AWS', 'Azure', 'Flutter', 'Swift', 'Kotlin',
+    'Rust', 'Go', 'TensorFlow', 'PyTorch', 'Pandas', 'Excel', 'Figma',
+    'Photoshop', 'Blender', 'Unity', 'Linux', 'Git', 'GraphQL', 'TypeScript',
+    'Tableau', 'Power BI', 'Marketing Analytics', 'Copywriting', 'Lightroom',
+    'Ableton', 'Agile', 'Scrum', 'Cybersecurity', 'Networking', 'Statistics',
+]
+PREFIXES = ['Complete', 'Ultimate', 'Practical', 'Modern', 'Hands-On',
+            'Essential', 'Advanced', 'Beginner', 'Professional', 'Mastering']
+SUFFIXES = ['Bootcamp', 'Masterclass', 'Fundamentals', 'for Beginners',
+            'in Practice', 'Crash Course', 'from Scratch', 'Deep Dive',
+            'Projects', 'Certification Prep']
+LEVELS = [code for code, label in Course.LEVEL_CHOICES]
+LANGUAGES = ['English'] * 6 + ['Spanish', 'Portuguese', 'German', 'French',
+                               'Japanese', 'Hindi']
+PRICES = [Decimal('0.00')] + [Decimal(price) for price in (
+    '9.99', '12.99', '19.99', '24.99', '29.99', '49.99', '59.99', '84.99',
+    '99.99', '129.99', '199.99')]
+# Skewed towards good ratings, as on real course marketplaces
+RATINGS = [1, 2, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 5, 5]
+FIRST_NAMES = ['Ana', 'Ben', 'Chen', 'Dara', 'Elif', 'Femi', 'Goran', 'Hana',
+               'Ivan', 'Jia', 'Kofi', 'Lena', 'Mateo', 'Nora', 'Omar', 'Priya']
+LAST_NAMES = ['Silva', 'Okafor', 'Kowalski', 'Nguyen', 'Haddad', 'Schmidt',
+              'Tanaka', 'Garcia', 'Ivanova', 'Mensah', 'Rossi', 'Patel']
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic catalog with bulk_create: courses with sections, '
+        'lectures, enrollments, reviews, carts and progress. Bypasses model '
+        'signals and recomputes the stored aggregates and the search index after.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=10000)
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--instructors', type=int, default=500)
+        parser.add_argument('--sections', type=int, default=6,
+                            help='Average sections per course')
+        parser.add_argument('--lectures', type=int, default=5,
+                            help='Average lectures per section')
+        parser.add_argument('--enrollments', type=int, default=20,
+                            help='Average enrollments per course, long-tailed')
+        parser.add_argument('--review-rate', type=float, default=0.2,
+                            help='Share of enrollments that leave a review')
+        parser.add_argument('--progress-rate', type=float, default=0.5,
+                            help='Share of enrollments with lecture progress')
+        parser.add_argument('--carts', type=int, default=2,
+                            help='Average cart entries per course')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Courses generated per transaction')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--tag', default='gen',
+                            help='Marks generated titles and emails, use a new '
+                                 'tag to add to an already generated catalog')
+
+    def handle(self, *args, **options):
+        for name in ('courses', 'students', 'instructors', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be a positive integer")
+        for name in ('review_rate', 'progress_rate'):
+            if not 0 <= options[name] <= 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be between 0 and 1")
+        if User.objects.filter(email__endswith=f"@{options['tag']}.example.com").exists():
+            raise CommandError(f"Tag {options['tag']!r} was already generated, pass another --tag")
+
+        self.random = random.Random(options['seed'])
+        self.options = options
+        self.password = make_password(None)
+
+        subcategories = self.create_taxonomy()
+        instructor_ids = self.create_users('instructor', options['instructors'])
+        student_ids = self.create_users('student', options['students'])
+
+        created = 0
+        while created < options['courses']:
+            size = min(options['batch_size'], options['courses'] - created)
+            with transaction.atomic():
+                course_ids = self.create_courses(created, size, subcategories, instructor_ids)
+                self.create_activity(course_ids, student_ids)
+                Course.recalculate_rating_aggregates(course_ids)
+                Course.recalculate_curriculum_totals(course_ids)
+            created += size
+            self.stdout.write(f'  {created}/{options["courses"]} courses')
+
+        call_command('recompute_popularity', stdout=self.stdout)
+        if search.is_available():
+            call_command('rebuild_search_index', stdout=self.stdout)
+        # bulk_create skips the signals that invalidate cached search responses
+        bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created} courses, {len(student_ids)} students '
+            f'and {len(instructor_ids)} instructors'
+        ))
+
+    def create_taxonomy(self):
+        """Category/subcategory pairs, reusing existing rows with the same names"""
+        subcategories = []
+        for category_name, names in TAXONOMY.items():
+            category, _ = Category.objects.get_or_create(name=category_name)
+            for name in names:
+                subcategory, _ = SubCategory.objects.get_or_create(
+                    name=name, defaults={'category': category}
+                )
+                subcategories.append((subcategory.category_id, subcategory.id))
+        return subcategories
+
+    def create_users(self, role, count):
+        tag = self.options['tag']
+        ids = []
+        for start in range(0, count, 5000):
+            users = User.objects.bulk_create([
+                User(
+                    email=f'{role}{number}@{tag}.example.com',
+                    name=f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}',
+                    role=role,
+                    password=self.password,
+                )
+                for number in range(start, min(start + 5000, count))
+            ])
+            ids.extend(user.id for user in users)
+        return ids
+
+    def create_courses(self, offset, size, subcategories, instructor_ids):
+        tag = self.options['tag']
+        picks = [self.random.choice(subcategories) for _ in range(size)]
+        courses = Course.objects.bulk_create([
+            Course(
+                title=(f'{self.random.choice(PREFIXES)} {self.random.choice(TOPICS)} '
+                       f'{self.random.choice(SUFFIXES)} ({tag}-{offset + number})'),
+                description=f'Learn {self.random.choice(TOPICS)} and '
+                            f'{self.random.choice(TOPICS)} with real-world projects.',
+                objectives=[f'Build a {self.random.choice(TOPICS)} project',
+                            f'Understand {self.random.choice(TOPICS)}'],
+                category_id=category_id,
+                language=self.random.choice(LANGUAGES),
+                level=self.random.choice(LEVELS),
+                price=self.random.choice(PRICES),
+            )
+            for number, (category_id, subcategory_id) in enumerate(picks)
+        ])
+        course_ids = [course.id for course in courses]
+
+        Course.subcategory.through.objects.bulk_create([
+            Course.subcategory.through(course_id=course_id, subcategory_id=subcategory_id)
+            for course_id, (category_id, subcategory_id) in zip(course_ids, picks)
+        ])
+        Course.instructor.through.objects.bulk_create([
+            Course.instructor.through(course_id=course_id, user_id=user_id)
+            for course_id in course_ids
+            for user_id in self.random.sample(
+                instructor_ids, min(len(instructor_ids), self.random.choice((1, 1, 1, 2)))
+            )
+        ])
+        return course_ids
+
+    def spread(self, average):
+        """Long-tailed count with the given mean (Pareto, alpha 1.5, mean 3)"""
+        return int(average * self.random.paretovariate(1.5) / 3)
+
+    def create_activity(self, course_ids, student_ids):
+        options = self.options
+        sections = Section.objects.bulk_create([
+            Section(course_id=course_id, title=f'Section {order}', order=order)
+            for course_id in course_ids
+            for order in range(1, max(1, self.spread(options['sections'])) + 1)
+        ])
+        lectures = Lecture.objects.bulk_create([
+            Lecture(
+                section_id=section.id,
+                title=f'Lecture {order}',
+                content_type='article',
+                article='Lorem ipsum dolor sit amet. ' * self.random.randint(5, 40),
+                duration=self.random.randint(60, 1800),
+                order=order,
+                is_preview=order == 1,
+            )
+            for section in sections
+            for order in range(1, max(1, self.spread(options['lectures'])) + 1)
+        ], batch_size=2000)
+
+        section_course = {section.id: section.course_id for section in sections}
+        course_lectures = {}
+        for lecture in lectures:
+            course_lectures.setdefault(section_course[lecture.section_id], []).append(lecture.id)
+
+        enrollments = []
+        carts = []
+        for course_id in course_ids:
+            enrolled = self.random.sample(
+                student_ids, min(len(student_ids), self.spread(options['enrollments']))
+            )
+            enrollments.extend(
+                Enrollment(course_id=course_id, student_id=student_id)
+                for student_id in enrolled
+            )
+            enrolled = set(enrolled)
+            carts.extend(
+                Cart(course_id=course_id, student_id=student_id)
+                for student_id in set(self.random.sample(
+                    student_ids, min(len(student_ids), self.spread(options['carts']))
+                )) - enrolled
+            )
+        Enrollment.objects.bulk_create(enrollments, batch_size=2000)
+        Cart.objects.bulk_create(carts, batch_size=2000)
+
+        now = timezone.now()
+        reviews = []
+        lecture_progress = []
+        course_progress = []
+        for enrollment in enrollments:
+            if self.random.random() < options['review_rate']:
+                reviews.append(CourseReview(
+                    course_id=enrollment.course_id,
+                    student_id=enrollment.student_id,
+                    rating=self.random.choice(RATINGS),
+                    review_text='Generated review',
+                ))
+            lecture_ids = course_lectures.get(enrollment.course_id, [])
+            if lecture_ids and self.random.random() < options['progress_rate']:
+                completed = lecture_ids[:self.random.randint(0, len(lecture_ids))]
+                lecture_progress.extend(
+                    LectureProgress(student_id=enrollment.student_id, lecture_id=lecture_id,
+                                    is_completed=True, completed_at=now, watch_time=60)
+                    for lecture_id in completed
+                )
+                course_progress.append(CourseProgress(
+                    student_id=enrollment.student_id,
+                    course_id=enrollment.course_id,
+                    completed_lectures=len(completed),
+                    total_lectures=len(lecture_ids),
+                    progress_percentage=round(Decimal(100 * len(completed)) / len(lecture_ids), 2),
+                ))
+        CourseReview.objects.bulk_create(reviews, batch_size=2000)
+        LectureProgress.objects.bulk_create(lecture_progress, batch_size=2000)
+        CourseProgress.objects.bulk_create(course_progress, batch_size=2000)
@@ -0,0 +1,30 @@
+"""
+Rebuild the course full-text search index from scratch
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 course search index in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of courses indexed per INSERT ... SELECT',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        if not search.is_available():
+            raise CommandError(
+                'Full-text search needs SQLite with the core_course_search table, '
+                'run migrate first'
+            )
+
+        indexed = search.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} courses'))
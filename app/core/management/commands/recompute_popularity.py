@@ -0,0 +1,44 @@
+"""
+Recompute the stored course popularity scores
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Recompute Course.popularity_score in primary key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of courses updated per UPDATE statement',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        # One reference time so every batch uses the same recent window
+        now = timezone.now()
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Course.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += Course.recalculate_popularity(
+                Course.objects.filter(id__range=(ids[0], ids[-1])).values('id'),
+                now=now,
+            )
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Scored {updated} courses'))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:42
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    CourseReview = apps.get_model('core', 'CourseReview')
+    reviews = CourseReview.objects.filter(
+        course=OuterRef('pk')
+    ).order_by().values('course')
+    Course.objects.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0
+        ),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')), 0
+        ),
+        average_rating=Coalesce(
+            Subquery(reviews.annotate(avg=Avg('rating')).values('avg')),
+            Value(0.0),
+            output_field=models.FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_cart'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='average_rating',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:47
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 only exists on SQLite, other backends fall back to icontains"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS core_course_search USING fts5("
+        "title, description, objectives, category, subcategories, instructors, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO core_course_search(core_course_search, rank) "
+        "VALUES ('rank', 'bm25(10.0, 2.0, 2.0, 4.0, 4.0, 3.0)')"
+    )
+    schema_editor.execute(
+        "INSERT INTO core_course_search ("
+        " rowid, title, description, objectives,"
+        " category, subcategories, instructors) "
+        "SELECT c.id, c.title, c.description, c.objectives, cat.name, "
+        " (SELECT group_concat(s.name, ' ') FROM core_subcategory s"
+        "   JOIN core_course_subcategory cs ON cs.subcategory_id = s.id"
+        "  WHERE cs.course_id = c.id), "
+        " (SELECT group_concat(u.name, ' ') FROM core_user u"
+        "   JOIN core_course_instructor ci ON ci.user_id = u.id"
+        "  WHERE ci.course_id = c.id) "
+        "FROM core_course c JOIN core_category cat ON cat.id = c.category_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS core_course_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_course_average_rating_course_rating_sum_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSearchDocument',
+            fields=[
+                ('course', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='core.course')),
+                ('document', core.models.FullTextSearchField(db_column='core_course_search')),
+                ('rank', models.FloatField(db_column='rank')),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('objectives', models.TextField()),
+                ('category', models.TextField()),
+                ('subcategories', models.TextField()),
+                ('instructors', models.TextField()),
+            ],
+            options={
+                'db_table': 'core_course_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_course_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['created_at', 'id'], name='core_course_created_45bd79_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['price', 'id'], name='core_course_price_76a529_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['average_rating', 'id'], name='core_course_average_ef048a_idx'),
+        ),
+    ]
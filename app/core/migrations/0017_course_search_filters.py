@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_duration(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    Lecture = apps.get_model('core', 'Lecture')
+    lectures = Lecture.objects.filter(
+        section__course=OuterRef('pk')
+    ).order_by().values('section__course')
+    Course.objects.update(
+        total_duration=Coalesce(
+            Subquery(lectures.annotate(total=Sum('duration')).values('total')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_course_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='total_duration',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of lecture durations in seconds'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['category', 'level', 'price', 'created_at'], name='core_course_categor_5765ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['level', 'price'], name='core_course_level_3e9677_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['language'], name='core_course_languag_536538_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['total_duration'], name='core_course_total_d_cae7d7_idx'),
+        ),
+        # Filters on the M2M tables start from the subcategory/instructor id
+        # and only need the course id, so these cover them without a table lookup
+        migrations.RunSQL(
+            'CREATE INDEX core_course_subcategory_sub_course_idx '
+            'ON core_course_subcategory (subcategory_id, course_id)',
+            'DROP INDEX core_course_subcategory_sub_course_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_course_instructor_user_course_idx '
+            'ON core_course_instructor (user_id, course_id)',
+            'DROP INDEX core_course_instructor_user_course_idx',
+        ),
+        migrations.RunPython(backfill_total_duration, migrations.RunPython.noop),
+    ]
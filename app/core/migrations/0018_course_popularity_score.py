@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_course_search_filters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='popularity_score',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['popularity_score', 'id'], name='core_course_popular_384794_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'enrolled_at'], name='core_enroll_course__bd4413_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_lecture_count(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    Lecture = apps.get_model('core', 'Lecture')
+    lectures = Lecture.objects.filter(
+        section__course=OuterRef('pk')
+    ).order_by().values('section__course')
+    Course.objects.update(
+        lecture_count=Coalesce(
+            Subquery(lectures.annotate(total=Count('id')).values('total')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_course_popularity_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='lecture_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_lecture_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_course_lecture_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lectureprogress',
+            name='last_position',
+            field=models.PositiveIntegerField(default=0, help_text='Playback position in seconds to resume from'),
+        ),
+    ]
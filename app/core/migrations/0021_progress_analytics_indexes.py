@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_lectureprogress_last_position'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courseprogress',
+            index=models.Index(fields=['course', 'progress_percentage'], name='core_course_course__fc1cfc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lectureprogress',
+            index=models.Index(fields=['lecture', 'is_completed'], name='core_lectur_lecture_8cbc9d_idx'),
+        ),
+    ]
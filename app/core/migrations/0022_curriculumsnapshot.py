@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_progress_analytics_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurriculumSnapshot',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='curriculum_snapshot', serialize=False, to='core.course')),
+                ('payload', models.TextField()),
+                ('etag', models.CharField(max_length=64)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
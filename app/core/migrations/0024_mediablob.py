@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:19
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lecture',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=core.models.lecture_media_storage, upload_to='lectures/files/'),
+        ),
+        migrations.AlterField(
+            model_name='lecture',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=core.models.lecture_media_storage, upload_to='lectures/videos/'),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='core_mediab_ref_cou_7cfd2c_idx')],
+            },
+        ),
+    ]
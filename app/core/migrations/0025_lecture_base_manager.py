@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_mediablob'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='lecture',
+            options={'base_manager_name': 'objects', 'ordering': ['order']},
+        ),
+    ]
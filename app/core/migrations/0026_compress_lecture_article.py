@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:41
+
+import core.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_lecture_base_manager'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lecture',
+            name='article',
+            field=core.fields.CompressedTextField(blank=True, null=True),
+        ),
+    ]
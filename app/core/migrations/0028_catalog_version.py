@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:38
+
+import time
+
+from django.db import migrations, models
+
+
+def create_version(apps, schema_editor):
+    # seeded from the clock, so versions handed out by the cache before are not reused
+    apps.get_model('core', 'CatalogVersion').objects.create(pk=1, version=time.time_ns())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version, migrations.RunPython.noop),
+    ]
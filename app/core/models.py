@@ -1,7 +1,14 @@
 """
 API Models
 """
-from django.db.models import Avg, Count
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import (Avg, Count, F, Case, When, Value, OuterRef, Subquery,
+                              Sum, ExpressionWrapper, Exists)
+from django.db.models.functions import Cast, Coalesce, Greatest, Ln, NullIf, Round
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -10,7 +17,9 @@ from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.db.models import JSONField
 from django.utils import timezone
-from django.db import models
+from django.core.files.storage import storages
+from django.db import connection, models
+from core.fields import CompressedTextField
 from django.contrib.auth.models import (AbstractBaseUser,
                                         BaseUserManager,
                                         PermissionsMixin)
@@ -161,6 +170,39 @@ class Course(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # rating aggregates maintained by the CourseReview signal handlers
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    average_rating = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+    )
+    # recomputed in batches by the recompute_popularity command
+    popularity_score = models.FloatField(default=0.0, editable=False)
+    # maintained by the Lecture signal handlers
+    total_duration = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Sum of lecture durations in seconds'
+    )
+    lecture_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # keyset pagination keys, one per search sort
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['average_rating', 'id']),
+            models.Index(fields=['popularity_score', 'id']),
+            # structured search filters
+            models.Index(fields=['category', 'level', 'price', 'created_at']),
+            models.Index(fields=['level', 'price']),
+            models.Index(fields=['language']),
+            models.Index(fields=['total_duration']),
+        ]
+
     def get_instructor_names(self):
         """Return comma-separated list of instructor names"""
         return ', '.join([instructor.name for instructor in self.instructor.all()])
@@ -169,22 +211,207 @@ class Course(models.Model):
     def total_enrollments(self):
         return getattr(self, "enrollments").count()
 
-    @property
-    def average_rating(self):
-        """Calculate average rating efficiently"""
-        result = self.reviews.aggregate(
-            avg_rating=Avg('rating'),
-            review_count=Count('rating')
+    @classmethod
+    def apply_rating_delta(cls, course_id, rating_delta, count_delta):
+        """
+        Shift the stored rating aggregates of one course in a single UPDATE.
+        Every expression reads the pre-update row, so concurrent reviews
+        never overwrite each other.
+        """
+        new_sum = F('rating_sum') + rating_delta
+        new_count = F('review_count') + count_delta
+        cls.objects.filter(pk=course_id).update(
+            rating_sum=new_sum,
+            review_count=new_count,
+            updated_at=timezone.now(),
+            average_rating=Case(
+                When(review_count=-count_delta, then=Value(0.0)),
+                default=Cast(new_sum, models.FloatField()) / new_count,
+                output_field=models.FloatField(),
+            ),
+        )
+
+    @classmethod
+    def apply_curriculum_delta(cls, section_id, duration_delta, count_delta=0):
+        """Shift the stored curriculum totals of the course owning a section"""
+        cls.objects.filter(sections=section_id).update(
+            total_duration=F('total_duration') + duration_delta,
+            lecture_count=F('lecture_count') + count_delta,
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def recalculate_curriculum_totals(cls, course_ids=None):
+        """Rebuild the stored curriculum totals from the lectures table"""
+        lectures = Lecture.objects.filter(
+            section__course=OuterRef('pk')
+        ).order_by().values('section__course')
+        queryset = cls.objects.all()
+        if course_ids is not None:
+            queryset = queryset.filter(pk__in=course_ids)
+        queryset.update(
+            updated_at=timezone.now(),
+            total_duration=Coalesce(
+                Subquery(lectures.annotate(total=Sum('duration')).values('total')),
+                0
+            ),
+            lecture_count=Coalesce(
+                Subquery(lectures.annotate(total=Count('id')).values('total')),
+                0
+            ),
+        )
+
+    @classmethod
+    def recalculate_rating_aggregates(cls, course_ids=None):
+        """
+        Rebuild the stored rating aggregates from the reviews table.
+        Used when reviews were written without going through save()/delete().
+        """
+        reviews = CourseReview.objects.filter(
+            course=OuterRef('pk')
+        ).order_by().values('course')
+        queryset = cls.objects.all()
+        if course_ids is not None:
+            queryset = queryset.filter(pk__in=course_ids)
+        queryset.update(
+            updated_at=timezone.now(),
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('rating')).values('total')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            average_rating=Coalesce(
+                Subquery(reviews.annotate(avg=Avg('rating')).values('avg')),
+                Value(0.0),
+                output_field=models.FloatField(),
+            ),
+        )
+
+    @classmethod
+    def recalculate_popularity(cls, course_ids=None, now=None):
+        """
+        Store popularity_score for the given courses in one UPDATE:
+
+            bayesian_rating * (1 + ln(1 + enrollments) + w * ln(1 + recent enrollments))
+
+        The Bayesian rating pulls courses with few reviews towards the
+        catalog mean, so one 5-star review does not beat 2,000 reviews at 4.7.
+        Recent enrollments are those of the last POPULARITY_RECENT_DAYS.
+        """
+        prior_weight = getattr(settings, 'POPULARITY_PRIOR_REVIEWS', 10)
+        recent_days = getattr(settings, 'POPULARITY_RECENT_DAYS', 30)
+        recent_weight = getattr(settings, 'POPULARITY_RECENT_WEIGHT', 2.0)
+        now = now or timezone.now()
+
+        catalog_mean = CourseReview.objects.aggregate(mean=Avg('rating'))['mean'] or 0.0
+        bayesian_rating = (
+            (prior_weight * catalog_mean + Cast('rating_sum', models.FloatField()))
+            / (prior_weight + F('review_count'))
+        )
+
+        enrollments = Enrollment.objects.filter(
+            course=OuterRef('pk'), is_active=True
+        ).order_by().values('course')
+        total = Coalesce(
+            Subquery(enrollments.annotate(total=Count('id')).values('total')), 0
+        )
+        recent = Coalesce(
+            Subquery(
+                enrollments.filter(enrolled_at__gte=now - timedelta(days=recent_days))
+                .annotate(total=Count('id')).values('total')
+            ),
+            0
+        )
+
+        queryset = cls.objects.all()
+        if course_ids is not None:
+            queryset = queryset.filter(pk__in=course_ids)
+        return queryset.update(
+            popularity_score=ExpressionWrapper(
+                bayesian_rating * (
+                    1 + Ln(1 + total) + recent_weight * Ln(1 + recent)
+                ),
+                output_field=models.FloatField(),
+            ),
         )
-        return {
-            'average_rating': round(result['avg_rating'] or 0, 1),
-            'review_count': result['review_count']
-        }
 
     def __str__(self):
         return self.title
 
 
+class FullTextSearchField(models.TextField):
+    """
+    The hidden FTS5 column that carries the table name.
+    Only used as the left hand side of the `match` lookup.
+    """
+
+
+@FullTextSearchField.register_lookup
+class FullTextMatch(models.Lookup):
+    """`document__match=...` compiles to an FTS5 MATCH"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class CourseSearchDocument(models.Model):
+    """
+    Read side of the SQLite FTS5 index over courses.
+    The virtual table is created by migration and kept in sync by core.search,
+    rows are never written through the ORM.
+    """
+    course = models.OneToOneField(
+        Course,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_document',
+    )
+    document = FullTextSearchField(db_column='core_course_search')
+    rank = models.FloatField(db_column='rank')
+    title = models.TextField()
+    description = models.TextField()
+    objectives = models.TextField()
+    category = models.TextField()
+    subcategories = models.TextField()
+    instructors = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'core_course_search'
+
+
+class CatalogVersion(models.Model):
+    """
+    Version of the course catalog shared by every worker, one row moved by
+    each catalog write (see courses/cache.py). Search results are cached
+    under it, so a new version makes every older entry unreachable.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        """Move the version, never to a value a rolled back bump handed out"""
+        version = Greatest(
+            F('version') + 1, Value(time.time_ns(), output_field=models.PositiveBigIntegerField())
+        )
+        if not cls.objects.filter(pk=1).update(version=version):
+            _, created = cls.objects.get_or_create(pk=1, defaults={'version': time.time_ns()})
+            if not created:
+                cls.objects.filter(pk=1).update(version=version)
+
+
 class Section(models.Model):
     """Section Model"""
     title = models.CharField(max_length=255)
@@ -197,10 +424,14 @@ class Section(models.Model):
 
     @property
     def lecture_count(self):
+        if 'lectures' in getattr(self, '_prefetched_objects_cache', {}):
+            return len(self.lectures.all())
         return self.lectures.count()
 
     @property
     def total_duration(self):
+        if 'lectures' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(lecture.duration for lecture in self.lectures.all())
         return self.lectures.aggregate(
             total=models.Sum('duration')
         )['total'] or 0
@@ -230,6 +461,54 @@ class Section(models.Model):
         return self.title
 
 
+def lecture_media_storage():
+    """Storage of lecture videos and files, STORAGES['lecture_media']"""
+    return storages['lecture_media']
+
+
+class LectureQuerySet(models.QuerySet):
+    """Lecture queries, see LectureManager"""
+
+    def with_content(self):
+        """Load the article body too"""
+        return self.defer(None)
+
+    def only(self, *fields):
+        # only() after the manager's defer('article') would load every field,
+        # e.g. when refresh_from_db() loads a deferred article
+        return super(LectureQuerySet, self.defer(None)).only(*fields)
+
+    def with_access(self, user):
+        """
+        Annotate `enrolled` (active enrollment) and `teaches` of a user in each
+        lecture's course, as EXISTS subqueries of the same query
+        """
+        if not user.is_authenticated:
+            return self.annotate(
+                enrolled=Value(False, output_field=models.BooleanField()),
+                teaches=Value(False, output_field=models.BooleanField()),
+            )
+        course = OuterRef('section__course_id')
+        return self.annotate(
+            enrolled=Exists(Enrollment.objects.filter(
+                student_id=user.pk, course_id=course, is_active=True
+            )),
+            teaches=Exists(Course.instructor.through.objects.filter(
+                user_id=user.pk, course_id=course
+            )),
+        )
+
+
+class LectureManager(models.Manager.from_queryset(LectureQuerySet)):
+    """
+    Defers `article`, which can hold megabytes, in every lecture query and
+    related object access; with_content() loads it where the body is served
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer('article')
+
+
 class Lecture(models.Model):
     """Lecture Model"""
 
@@ -253,9 +532,13 @@ class Lecture(models.Model):
     order = models.PositiveIntegerField()
     is_preview = models.BooleanField(default=False)
 
-    video = models.FileField(upload_to='lectures/videos/', blank=True, null=True)
-    article = models.TextField(blank=True, null=True)
-    file = models.FileField(upload_to="lectures/files/", blank=True, null=True)
+    video = models.FileField(
+        upload_to='lectures/videos/', storage=lecture_media_storage, blank=True, null=True
+    )
+    article = CompressedTextField(blank=True, null=True)
+    file = models.FileField(
+        upload_to="lectures/files/", storage=lecture_media_storage, blank=True, null=True
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -273,7 +556,7 @@ class Lecture(models.Model):
         # Validation Rule 2: Only one content field should be provided
         content_fields = [
             (self.video, 'video'),
-            (self.article, 'article'),
+            (self.has_article(), 'article'),
             (self.file, 'file')
         ]
 
@@ -295,7 +578,7 @@ class Lecture(models.Model):
                 'video': 'Video content is required for video lectures.'
             })
 
-        if self.content_type == 'article' and not self.article:
+        if self.content_type == 'article' and not self.has_article():
             raise ValidationError({
                 'article': 'Article content is required for article lectures.'
             })
@@ -318,18 +601,186 @@ class Lecture(models.Model):
             return f'{hours}:{minutes:02d}:{seconds:02d}'
         return f'{minutes}:{seconds:02d}'
 
+    def has_article(self):
+        """
+        Whether the lecture has an article body, without loading a deferred
+        one: a stored lecture has a body exactly when it was stored as an article
+        """
+        if 'article' in self.__dict__:
+            return bool(self.article)
+        return self._stored_content_type == 'article'
+
     def save(self, *args, **kwargs):
         """Ensure validation runs on save"""
-        self.full_clean()
+        # a deferred article is unchanged and not written, clean() checks its presence
+        self.full_clean(exclude=None if 'article' in self.__dict__ else ['article'])
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored duration and media so save/delete hooks can apply a delta"""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_stored_duration()
+        instance.remember_stored_media()
+        instance._stored_content_type = instance.__dict__.get('content_type')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """Reload a loaded article too, the base manager defers it"""
+        if from_queryset is None and fields is None and 'article' in self.__dict__:
+            from_queryset = Lecture.objects.with_content()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def remember_stored_duration(self):
+        if 'duration' in self.__dict__ and 'section_id' in self.__dict__:
+            self._stored_duration = (self.section_id, self.duration)
+        else:
+            self._stored_duration = None
+
+    def media_names(self):
+        """Storage names of the video and file, empty ones left out"""
+        return {fieldfile.name for fieldfile in (self.video, self.file) if fieldfile}
+
+    def remember_stored_media(self):
+        if 'video' in self.__dict__ and 'file' in self.__dict__:
+            self._stored_media = self.media_names()
+        else:
+            self._stored_media = None
+
+    _stored_content_type = None
+
+    objects = LectureManager()
+
     class Meta:
         ordering = ['order']
+        # related object access (progress.lecture) defers the article as well
+        base_manager_name = 'objects'
 
     def __str__(self):
         return self.title
 
 
+class CurriculumSnapshot(models.Model):
+    """
+    Pre-rendered curriculum JSON of a course and its strong ETag,
+    rebuilt after commit by curriculum.snapshot when sections or lectures change
+    """
+    course = models.OneToOneField(
+        Course,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='curriculum_snapshot',
+    )
+    payload = models.TextField()
+    etag = models.CharField(max_length=64)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Curriculum of course {self.course_id}"
+
+
+class MediaBlob(models.Model):
+    """
+    One stored copy of lecture media content, named after its SHA-256 digest
+    by core.storage.DedupStorage. ref_count is the number of lecture video and
+    file fields naming it; blobs left at 0 are removed by collect_media_blobs.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=100, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # unreferenced blobs past the grace period, see collect_media_blobs
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+
+    @classmethod
+    def acquire(cls, names):
+        """Count one more reference to each blob name"""
+        if names:
+            cls.objects.filter(name__in=names).update(
+                ref_count=F('ref_count') + 1, updated_at=timezone.now()
+            )
+
+    @classmethod
+    def release(cls, names):
+        """Drop one reference from each blob name"""
+        if names:
+            cls.objects.filter(name__in=names, ref_count__gt=0).update(
+                ref_count=F('ref_count') - 1, updated_at=timezone.now()
+            )
+
+    @classmethod
+    def recount(cls, names):
+        """Set the references of blob names from the lectures naming them"""
+        blobs = list(cls.objects.filter(name__in=names))
+        counts = Counter()
+        for field in ('video', 'file'):
+            counts.update(dict(
+                Lecture.objects.filter(**{f'{field}__in': names}).order_by()
+                .values_list(field).annotate(total=Count('id'))
+            ))
+        changed = []
+        for blob in blobs:
+            if blob.ref_count != counts[blob.name]:
+                blob.ref_count = counts[blob.name]
+                blob.updated_at = timezone.now()
+                changed.append(blob)
+        cls.objects.bulk_update(changed, ['ref_count', 'updated_at'])
+        return len(changed)
+
+    def __str__(self):
+        return self.name
+
+
+class UploadSession(models.Model):
+    """
+    Resumable chunked upload of a lecture video or file,
+    written and attached to the lecture by curriculum.uploads
+    """
+
+    FIELD_CHOICES = [
+        ('video', 'Video'),
+        ('file', 'File'),
+    ]
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lecture = models.ForeignKey(
+        Lecture,
+        related_name='upload_sessions',
+        on_delete=models.CASCADE,
+    )
+    owner = models.ForeignKey(
+        User,
+        related_name='upload_sessions',
+        on_delete=models.CASCADE,
+    )
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text='Total size in bytes')
+    received = models.PositiveBigIntegerField(default=0, help_text='Bytes written so far')
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='Expected digest given by the client, or the digest of the finished upload',
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} to lecture {self.lecture_id}"
+
+
 class Enrollment(models.Model):
     """Enrollment Model"""
     student = models.ForeignKey(User, related_name='enrollments', on_delete=models.CASCADE)
@@ -340,6 +791,10 @@ class Enrollment(models.Model):
     class Meta:
         unique_together = [['student', 'course']]
         ordering = ['-enrolled_at']
+        indexes = [
+            # recent enrollment counts for the popularity score
+            models.Index(fields=['course', 'enrolled_at']),
+        ]
 
     def save(self, *args, **kwargs):
         """Ensure validation runs on save"""
@@ -375,12 +830,20 @@ class LectureProgress(models.Model):
         default=0,
         help_text='Seconds watched'
     )
+    last_position = models.PositiveIntegerField(
+        default=0,
+        help_text='Playback position in seconds to resume from'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = [['student', 'lecture']]
         ordering = ['-updated_at']
+        indexes = [
+            # per-lecture completion counts of progress analytics
+            models.Index(fields=['lecture', 'is_completed']),
+        ]
 
     def clean(self):
         """
@@ -389,9 +852,11 @@ class LectureProgress(models.Model):
         if not getattr(self, 'lecture', None) or not getattr(self, 'student', None):
             return
 
-        course = self.lecture.section.course
+        from core.access import get_access
+        access = get_access(self.student_id)
+        course_id = access.lecture_course_id(self.lecture_id)
 
-        if not course.enrollments.filter(student=self.student, is_active=True).exists():
+        if not access.is_enrolled(course_id, active_only=True):
             raise ValidationError("Student must be enrolled in the course to track progress.")
 
     def save(self, *args, **kwargs):
@@ -403,12 +868,27 @@ class LectureProgress(models.Model):
         if self.is_completed and not self.completed_at:
             self.completed_at = timezone.now()
             self.watch_time = self.lecture.duration
-        elif not self.is_completed:
+        elif not self.is_completed and self.completed_at:
+            # Marked incomplete, heartbeat watch time of unfinished lectures is kept
             self.completed_at = None
             self.watch_time = 0
+            self.last_position = 0
 
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored completion so save/delete hooks can apply a delta"""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_stored_completion()
+        return instance
+
+    def remember_stored_completion(self):
+        if 'is_completed' in self.__dict__ and 'lecture_id' in self.__dict__:
+            self._stored_completion = (self.lecture_id, self.is_completed)
+        else:
+            self._stored_completion = None
+
     def __str__(self):
         status = "✓" if self.is_completed else "○"
         return f"{self.student.email} - {self.lecture.title} {status}"
@@ -445,24 +925,127 @@ class CourseProgress(models.Model):
     class Meta:
         unique_together = [['student', 'course']]
         ordering = ['-last_accessed']
+        indexes = [
+            # progress histogram and median of one course
+            models.Index(fields=['course', 'progress_percentage']),
+        ]
+
+    @classmethod
+    def apply_completion_delta(cls, student_id, lecture_id, completed_delta):
+        """
+        Shift the completed count of the student's progress in the course
+        owning a lecture, refreshing the total from Course.lecture_count and
+        the percentage in the same UPDATE. Returns the number of rows
+        updated, 0 when the student has no progress row for the course yet.
+        """
+        course_id = Subquery(
+            Section.objects.filter(lectures=lecture_id).values('course_id')[:1]
+        )
+        total = Subquery(
+            Course.objects.filter(pk=OuterRef('course_id')).values('lecture_count')[:1]
+        )
+        completed = F('completed_lectures') + completed_delta
+        return cls.objects.filter(student_id=student_id, course_id=course_id).update(
+            completed_lectures=completed,
+            total_lectures=total,
+            progress_percentage=Coalesce(
+                Round(Cast(completed, models.FloatField()) * 100 / NullIf(total, 0), 2),
+                Value(0.0),
+                output_field=models.FloatField(),
+            ),
+            last_accessed=timezone.now(),
+        )
+
+    @classmethod
+    def recalculate_for_course(cls, course_id, batch_size=None):
+        """
+        Recount every student's progress in one course after its curriculum
+        changed: one UPDATE ... FROM (aggregate subquery) per window of
+        `batch_size` progress rows, so courses with hundreds of thousands
+        of students never hold one long write lock.
+        Returns the number of progress rows updated.
+        """
+        batch_size = batch_size or getattr(settings, 'PROGRESS_RECALCULATION_BATCH_SIZE', 5000)
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            return cls._recalculate_for_course_with_subqueries(course_id)
+
+        sql = f"""
+            UPDATE {cls._meta.db_table} SET
+                completed_lectures = agg.completed,
+                total_lectures = agg.total,
+                progress_percentage = CASE WHEN agg.total > 0
+                    THEN ROUND(agg.completed * 100.0 / agg.total, 2) ELSE 0 END
+            FROM (
+                SELECT cp.id AS progress_id, c.lecture_count AS total,
+                       COUNT(lp.id) AS completed
+                FROM {cls._meta.db_table} cp
+                JOIN {Course._meta.db_table} c ON c.id = cp.course_id
+                LEFT JOIN {LectureProgress._meta.db_table} lp
+                    ON lp.student_id = cp.student_id
+                    AND lp.is_completed = %s
+                    AND lp.lecture_id IN (
+                        SELECT l.id FROM {Lecture._meta.db_table} l
+                        JOIN {Section._meta.db_table} s ON s.id = l.section_id
+                        WHERE s.course_id = %s
+                    )
+                WHERE cp.course_id = %s AND cp.id BETWEEN %s AND %s
+                GROUP BY cp.id, c.lecture_count
+            ) agg
+            WHERE {cls._meta.db_table}.id = agg.progress_id
+        """
+        updated = 0
+        last_id = 0
+        with connection.cursor() as cursor:
+            while True:
+                ids = list(
+                    cls.objects.filter(course_id=course_id, id__gt=last_id)
+                    .order_by('id').values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                cursor.execute(sql, [True, course_id, course_id, ids[0], ids[-1]])
+                updated += cursor.rowcount
+                last_id = ids[-1]
+        return updated
+
+    @classmethod
+    def _recalculate_for_course_with_subqueries(cls, course_id):
+        """Portable fallback for databases without UPDATE ... FROM"""
+        completed = LectureProgress.objects.filter(
+            student=OuterRef('student'),
+            lecture__section__course=course_id,
+            is_completed=True,
+        ).order_by().values('student').annotate(total=Count('id')).values('total')
+        total = Course.objects.filter(pk=course_id).values('lecture_count')
+        completed = Coalesce(Subquery(completed), 0)
+        return cls.objects.filter(course_id=course_id).update(
+            completed_lectures=completed,
+            total_lectures=Subquery(total),
+            progress_percentage=Coalesce(
+                Round(Cast(completed, models.FloatField()) * 100 / NullIf(Subquery(total), 0), 2),
+                Value(0.0),
+                output_field=models.FloatField(),
+            ),
+        )
 
     def update_progress(self):
         """
         Recalculates progress based on current lecture completions.
-        This method is called automatically
+        Used when a progress row is created or a delta cannot be applied.
         """
         course_lectures_completed_count = LectureProgress.objects.filter(
             student=self.student,
             lecture__section__course=self.course,
             is_completed=True
         ).count()
-        course_total_lectures = Lecture.objects.filter(
-            section__course=self.course
-        ).count()
+        # The stored total, read fresh since self.course may predate new lectures
+        course_total_lectures = Course.objects.filter(
+            pk=self.course_id
+        ).values_list('lecture_count', flat=True).get()
 
         self.total_lectures = course_total_lectures
         self.completed_lectures = course_lectures_completed_count
-        if self.completed_lectures > 0:
+        if self.completed_lectures > 0 and course_total_lectures:
             self.progress_percentage = (course_lectures_completed_count / course_total_lectures) * 100
         else:
             self.progress_percentage = 0
@@ -525,10 +1108,8 @@ class CourseReview(models.Model):
         """Custom model validation"""
         super().clean()
 
-        if not Enrollment.objects.filter(
-                student=self.student,
-                course=self.course
-        ).exists():
+        from core.access import get_access
+        if not get_access(self.student_id).is_enrolled(self.course_id):
             raise ValidationError({
                 'student': 'Student must be enrolled in the course to create a review.'
             })
@@ -537,6 +1118,19 @@ class CourseReview(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored rating so save/delete hooks can apply a delta"""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_stored_rating()
+        return instance
+
+    def remember_stored_rating(self):
+        if 'rating' in self.__dict__ and 'course_id' in self.__dict__:
+            self._stored_rating = (self.course_id, self.rating)
+        else:
+            self._stored_rating = None
+
 
 class Cart(models.Model):
     """
@@ -565,10 +1159,8 @@ class Cart(models.Model):
 
     def clean(self):
         """Custom validation"""
-        if Enrollment.objects.filter(
-                student=self.student,
-                course=self.course
-        ).exists():
+        from core.access import get_access
+        if get_access(self.student_id).is_enrolled(self.course_id):
             raise ValidationError("Cannot add enrolled course to cart")
 
     def save(self, *args, **kwargs):
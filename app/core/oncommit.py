@@ -0,0 +1,62 @@
+"""
+Batched after-commit work.
+
+Signal handlers that fire once per row would register one on_commit callback
+per row. `on_commit_once` collects the keys of every call made for a handler
+while its callback is pending into one CommitBatch, registered with a single
+transaction.on_commit, so a handler processes each key once, after the data
+it reads is committed.
+
+The pending batches are kept per thread and database alias, that is per
+connection, and only weakly: a batch is forgotten once it has run, or when
+Django discards it with a rolled back savepoint, and the next call starts
+a new one. Callbacks are robust, a failing handler is logged by Django and
+does not fail the request whose transaction already committed.
+"""
+import threading
+import weakref
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+_state = threading.local()
+
+
+class CommitBatch:
+    """on_commit callback passing the collected keys to its handler"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        # named in Django's log of a failing callback
+        self.__qualname__ = getattr(handler, '__qualname__', type(self).__qualname__)
+        self.keys = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.handler(self.keys)
+
+
+def _pending(using):
+    if not hasattr(_state, 'batches'):
+        _state.batches = {}
+    return _state.batches.setdefault(using or DEFAULT_DB_ALIAS, weakref.WeakValueDictionary())
+
+
+def on_commit_once(handler, keys, using=None):
+    """
+    Run handler(keys) after the current transaction commits, merged with the
+    keys of earlier calls for the same handler. Outside a transaction it
+    runs immediately.
+    """
+    if not transaction.get_connection(using).in_atomic_block:
+        batch = CommitBatch(handler)
+        batch.keys.update(keys)
+        transaction.on_commit(batch, using=using, robust=True)
+        return
+    pending = _pending(using)
+    batch = pending.get(handler)
+    if batch is None or batch.done:
+        batch = CommitBatch(handler)
+        pending[handler] = batch
+        transaction.on_commit(batch, using=using, robust=True)
+    batch.keys.update(keys)
@@ -0,0 +1,147 @@
+"""
+SQLite FTS5 full-text index over courses.
+
+Each course is one row of the `core_course_search` virtual table (rowid = course id)
+holding its title, description, objectives, category, subcategory names and
+instructor names. Rows are (re)built with a single INSERT ... SELECT so the
+index always reflects what is in the catalog tables.
+"""
+import re
+
+from django.db import connection, transaction
+
+from core.models import Course, Category, SubCategory, User, CourseSearchDocument
+
+INDEX_TABLE = CourseSearchDocument._meta.db_table
+
+# title, description, objectives, category, subcategories, instructors
+BM25_WEIGHTS = (10.0, 2.0, 2.0, 4.0, 4.0, 3.0)
+
+_available = None
+
+
+def is_available():
+    """True when the database is SQLite and the FTS5 table exists"""
+    global _available
+    if connection.vendor != 'sqlite':
+        return False
+    if _available is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [INDEX_TABLE]
+            )
+            _available = cursor.fetchone() is not None
+    return _available
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 expression: every word must match as a prefix.
+    Returns None when the text has no searchable words.
+    """
+    tokens = re.findall(r'\w+', query.lower())
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def _document_select(where):
+    """INSERT ... SELECT building index rows for the courses matched by `where`"""
+    course = Course._meta.db_table
+    category = Category._meta.db_table
+    subcategory = SubCategory._meta.db_table
+    user = User._meta.db_table
+    course_subcategory = Course.subcategory.through._meta.db_table
+    course_instructor = Course.instructor.through._meta.db_table
+
+    return f'''
+        INSERT INTO {INDEX_TABLE} (
+            rowid, title, description, objectives,
+            category, subcategories, instructors
+        )
+        SELECT
+            c.id, c.title, c.description, c.objectives, cat.name,
+            (SELECT group_concat(s.name, ' ')
+               FROM {subcategory} s
+               JOIN {course_subcategory} cs ON cs.subcategory_id = s.id
+              WHERE cs.course_id = c.id),
+            (SELECT group_concat(u.name, ' ')
+               FROM {user} u
+               JOIN {course_instructor} ci ON ci.user_id = u.id
+              WHERE ci.course_id = c.id)
+        FROM {course} c
+        JOIN {category} cat ON cat.id = c.category_id
+        WHERE {where}
+    '''
+
+
+def _chunks(ids, size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def index_courses(course_ids, batch_size=500):
+    """Insert or refresh the index rows of the given courses"""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(course_ids, batch_size):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f'DELETE FROM {INDEX_TABLE} WHERE rowid IN ({placeholders})',
+                chunk
+            )
+            cursor.execute(_document_select(f'c.id IN ({placeholders})'), chunk)
+
+
+def remove_courses(course_ids, batch_size=500):
+    """Drop the index rows of deleted courses"""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(course_ids, batch_size):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f'DELETE FROM {INDEX_TABLE} WHERE rowid IN ({placeholders})',
+                chunk
+            )
+
+
+def rebuild(batch_size=1000):
+    """
+    Rebuild the whole index from the catalog tables in one transaction,
+    walking courses in primary key windows of `batch_size`.
+    Returns the number of indexed courses.
+    """
+    if not is_available():
+        return 0
+
+    indexed = 0
+    last_id = 0
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    # one transaction: searches meanwhile read the old index, a failure keeps it
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {INDEX_TABLE}({INDEX_TABLE}, rank) VALUES ('rank', %s)",
+            [f'bm25({weights})']
+        )
+        cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+        while True:
+            ids = list(
+                Course.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            cursor.execute(
+                _document_select('c.id BETWEEN %s AND %s'),
+                [ids[0], ids[-1]]
+            )
+            indexed += len(ids)
+            last_id = ids[-1]
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {INDEX_TABLE}({INDEX_TABLE}) VALUES ('optimize')")
+    return indexed
@@ -1,10 +1,20 @@
 """
-Signal for post_save and post_delete Course Progress Tracking
+Signal for post_save and post_delete Course Progress Tracking,
+the denormalized Course rating aggregates and media blob references
 """
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
+import threading
 
-from core.models import LectureProgress, CourseProgress, Lecture, Enrollment, Cart
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import Signal, receiver
+
+from core import access, search
+from core.oncommit import on_commit_once
+from core.models import (LectureProgress, CourseProgress, Lecture, Section,
+                         Enrollment, Cart, Course, CourseReview,
+                         Category, SubCategory, User, MediaBlob)
+
+# Sent with `course_ids` after their students' progress was recounted
+progress_recalculated = Signal()
 
 
 @receiver(post_save, sender=Enrollment)
@@ -19,23 +29,56 @@ def remove_cart_item_on_enrollment(sender, instance, created, **kwargs):
         ).delete()
 
 
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def forget_cached_access_on_enrollment_change(sender, instance, **kwargs):
+    """Drop the request's cached enrollments of the student"""
+    access.forget_user(instance.student_id)
+
+
+@receiver(m2m_changed, sender=Course.instructor.through)
+def forget_cached_access_on_instructor_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop the request's cached taught courses of the affected instructors"""
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        access.forget_user(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            access.forget_user(user_id)
+    else:
+        access.forget_all()
+
+
 @receiver(post_save, sender=LectureProgress)
 def update_course_progress_on_lecture_save(sender, instance, created, **kwargs):
     """
     Signal handler: Called automatically AFTER a LectureProgress is saved.
-    This runs every time someone marks a lecture complete/incomplete.
+    Applies a +1/-1 delta to CourseProgress only when is_completed flips,
+    creating the CourseProgress row on the student's first lecture.
     """
+    stored = getattr(instance, '_stored_completion', None)
+    instance.remember_stored_completion()
 
-    course = instance.lecture.section.course
+    if created:
+        delta = 1 if instance.is_completed else 0
+    elif stored is None or stored[0] != instance.lecture_id:
+        delta = None
+    elif stored[1] == instance.is_completed:
+        return
+    else:
+        delta = 1 if instance.is_completed else -1
 
-    course_progress, created = CourseProgress.objects.get_or_create(
-        student= instance.student,
-        course=course,
-        defaults={
-            'total_lectures': Lecture.objects.filter(section__course=course).count()
-        }
-    )
+    if delta is not None and CourseProgress.apply_completion_delta(
+            instance.student_id, instance.lecture_id, delta):
+        return
 
+    # No progress row yet, or the previous state is unknown: full recount
+    course_progress, _ = CourseProgress.objects.get_or_create(
+        student_id=instance.student_id,
+        course_id=instance.lecture.section.course_id,
+        defaults={'total_lectures': 0}
+    )
     course_progress.update_progress()
 
 
@@ -44,13 +87,212 @@ def update_course_progress_on_lecture_delete(sender, instance, **kwargs):
     """
     Signal handler: Called automatically AFTER a LectureProgress is deleted.
     """
-    try:
-        course = instance.lecture.section.course
-        course_progress = CourseProgress.objects.get(
-            student=instance.student,
-            course=course
+    stored = getattr(instance, '_stored_completion', None)
+    lecture_id, is_completed = stored or (instance.lecture_id, instance.is_completed)
+    if lecture_id in _deleting_lectures():
+        # Cascaded from a lecture delete, recounted after commit instead
+        return
+    if is_completed:
+        CourseProgress.apply_completion_delta(instance.student_id, lecture_id, -1)
+
+
+@receiver(post_save, sender=CourseReview)
+def update_course_rating_on_review_save(sender, instance, created, **kwargs):
+    """
+    Apply the rating change of a saved review to its course aggregates.
+    """
+    stored = getattr(instance, '_stored_rating', None)
+
+    if created:
+        Course.apply_rating_delta(instance.course_id, instance.rating, 1)
+    elif stored is None:
+        # Saved without a loaded snapshot, the old rating is unknown
+        Course.recalculate_rating_aggregates([instance.course_id])
+    elif stored[0] != instance.course_id:
+        Course.apply_rating_delta(stored[0], -stored[1], -1)
+        Course.apply_rating_delta(instance.course_id, instance.rating, 1)
+    elif stored[1] != instance.rating:
+        Course.apply_rating_delta(instance.course_id, instance.rating - stored[1], 0)
+
+    instance.remember_stored_rating()
+
+
+@receiver(post_delete, sender=CourseReview)
+def update_course_rating_on_review_delete(sender, instance, **kwargs):
+    """
+    Remove a deleted review from its course aggregates.
+    """
+    stored = getattr(instance, '_stored_rating', None)
+    course_id, rating = stored or (instance.course_id, instance.rating)
+    Course.apply_rating_delta(course_id, -rating, -1)
+
+
+def _recalculate_progress(course_ids):
+    for course_id in sorted(course_ids):
+        CourseProgress.recalculate_for_course(course_id)
+    progress_recalculated.send(sender=CourseProgress, course_ids=course_ids)
+
+
+def schedule_progress_recalculation(course_ids):
+    """Recount every student's progress in the courses once the transaction commits"""
+    on_commit_once(_recalculate_progress, course_ids)
+
+
+def _schedule_progress_recalculation(section_ids):
+    """Recount the progress of the sections' courses once the transaction commits"""
+    schedule_progress_recalculation(Section.objects.filter(
+        pk__in=section_ids
+    ).values_list('course_id', flat=True))
+
+
+_state = threading.local()
+
+
+def _deleting_lectures():
+    """Ids of lectures being deleted by this thread"""
+    if not hasattr(_state, 'deleting_lectures'):
+        _state.deleting_lectures = set()
+    return _state.deleting_lectures
+
+
+@receiver(post_save, sender=Lecture)
+def update_course_duration_on_lecture_save(sender, instance, created, **kwargs):
+    """
+    Apply the duration/count change of a saved lecture to its course totals.
+    """
+    stored = getattr(instance, '_stored_duration', None)
+
+    if created:
+        Course.apply_curriculum_delta(instance.section_id, instance.duration, 1)
+        _schedule_progress_recalculation([instance.section_id])
+    elif stored is None:
+        Course.recalculate_curriculum_totals(
+            Section.objects.filter(pk=instance.section_id).values('course')
         )
+    elif stored[0] != instance.section_id:
+        Course.apply_curriculum_delta(stored[0], -stored[1], -1)
+        Course.apply_curriculum_delta(instance.section_id, instance.duration, 1)
+        _schedule_progress_recalculation([stored[0], instance.section_id])
+    elif stored[1] != instance.duration:
+        Course.apply_curriculum_delta(instance.section_id, instance.duration - stored[1])
+
+    instance.remember_stored_duration()
+
+
+@receiver(pre_delete, sender=Lecture)
+def mark_lecture_deleting(sender, instance, **kwargs):
+    _deleting_lectures().add(instance.pk)
+
+
+@receiver(post_delete, sender=Lecture)
+def update_course_duration_on_lecture_delete(sender, instance, **kwargs):
+    _deleting_lectures().discard(instance.pk)
+    stored = getattr(instance, '_stored_duration', None)
+    section_id, duration = stored or (instance.section_id, instance.duration)
+    Course.apply_curriculum_delta(section_id, -duration, -1)
+    _schedule_progress_recalculation([section_id])
+
+
+@receiver(post_save, sender=Lecture)
+def count_media_references_on_lecture_save(sender, instance, created, **kwargs):
+    """Move blob references from the stored video/file names to the saved ones"""
+    names = instance.media_names()
+    stored = set() if created else getattr(instance, '_stored_media', None)
+    if stored is None:
+        # loaded without its media fields, the saved names are recounted
+        MediaBlob.recount(names)
+    else:
+        MediaBlob.acquire(names - stored)
+        MediaBlob.release(stored - names)
+    instance.remember_stored_media()
+
+
+@receiver(post_delete, sender=Lecture)
+def release_media_on_lecture_delete(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_media', None)
+    if stored is None and 'video' in instance.__dict__ and 'file' in instance.__dict__:
+        stored = instance.media_names()
+    # a lecture deleted without its media fields loaded leaves the count high
+    MediaBlob.release(stored or set())
+
+
+@receiver(post_save, sender=Course)
+def index_course_on_save(sender, instance, **kwargs):
+    """
+    Keep the full-text index row of a course in sync with its fields.
+    """
+    search.index_courses([instance.pk])
+
+
+@receiver(post_delete, sender=Course)
+def unindex_course_on_delete(sender, instance, **kwargs):
+    search.remove_courses([instance.pk])
+
+
+@receiver(m2m_changed, sender=Course.subcategory.through)
+@receiver(m2m_changed, sender=Course.instructor.through)
+def index_course_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Reindex courses whose subcategories or instructors changed,
+    from either side of the relation.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            search.index_courses([instance.pk])
+        return
+
+    if action == 'pre_clear':
+        instance._search_course_ids = _related_course_ids(sender, instance)
+    elif action in ('post_add', 'post_remove'):
+        search.index_courses(pk_set)
+    elif action == 'post_clear':
+        search.index_courses(getattr(instance, '_search_course_ids', []))
+
+
+def _related_course_ids(through, instance):
+    """Course ids linked to a SubCategory or User through an M2M table"""
+    column = 'subcategory' if isinstance(instance, SubCategory) else 'user'
+    return list(
+        through.objects.filter(**{column: instance}).values_list('course_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Category)
+def index_courses_on_category_save(sender, instance, created, **kwargs):
+    if not created:
+        search.index_courses(
+            Course.objects.filter(category=instance).values_list('id', flat=True)
+        )
+
+
+@receiver(post_save, sender=SubCategory)
+def index_courses_on_subcategory_save(sender, instance, created, **kwargs):
+    if not created:
+        search.index_courses(
+            _related_course_ids(Course.subcategory.through, instance)
+        )
+
+
+@receiver(post_save, sender=User)
+def index_courses_on_instructor_save(sender, instance, created, update_fields, **kwargs):
+    """Instructor names are indexed, logins only touch last_login"""
+    if created or (update_fields and 'name' not in update_fields):
+        return
+    search.index_courses(
+        _related_course_ids(Course.instructor.through, instance)
+    )
+
+
+@receiver(pre_delete, sender=SubCategory)
+@receiver(pre_delete, sender=User)
+def collect_indexed_courses_before_delete(sender, instance, **kwargs):
+    """M2M rows vanish with the cascade, remember the courses first"""
+    through = (Course.subcategory.through if sender is SubCategory
+               else Course.instructor.through)
+    instance._search_course_ids = _related_course_ids(through, instance)
+
 
-        course_progress.update_progress()
-    except CourseProgress.DoesNotExist:
-        pass
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_delete, sender=User)
+def index_courses_after_related_delete(sender, instance, **kwargs):
+    search.index_courses(getattr(instance, '_search_course_ids', []))
@@ -0,0 +1,122 @@
+"""
+Content-addressed storage of lecture media.
+
+DedupStorage is a FileSystemStorage that names every saved file after the
+SHA-256 digest of its content, blobs/<d[:2]>/<d[2:4]>/<digest><ext>, so the
+same intro video or handout uploaded to many lectures is stored once. The
+digest is computed while the upload is streamed to a temporary file in the
+storage (READ_SIZE pieces, bounded memory), which is then renamed into
+place. Uploads already on disk (temporary_file_path()) are hashed, or take
+the `sha256` they carry, and moved without a copy.
+
+Each blob has a MediaBlob row. Lecture saves and deletes count references
+to it (see core/signal/signals.py), deleting through the storage is a no-op
+for blobs, and the collect_media_blobs command removes blobs left without
+references after MEDIA_BLOB_GRACE_PERIOD seconds.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+READ_SIZE = 64 * 1024
+
+BLOB_DIR = 'blobs'
+TEMP_DIR = f'{BLOB_DIR}/tmp'
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for data in iter(lambda: source.read(READ_SIZE), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def blob_name(digest, name):
+    """Storage name of a digest, keeping the extension of the uploaded name"""
+    extension = os.path.splitext(name)[1].lower()[:10]
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_DIR}/') and not name.startswith(f'{TEMP_DIR}/')
+
+
+class DedupStorage(FileSystemStorage):
+    """FileSystemStorage keeping one file per content digest, see MediaBlob"""
+
+    def get_available_name(self, name, max_length=None):
+        # _save names the file after its digest, the given name only lends its extension
+        return name
+
+    def _save(self, name, content):
+        from core.models import MediaBlob
+
+        if hasattr(content, 'temporary_file_path'):
+            source = content.temporary_file_path()
+            digest = getattr(content, 'sha256', None) or hash_file(source)
+            size = os.path.getsize(source)
+            owned = False
+        else:
+            source, digest, size = self._spool(content)
+            owned = True
+
+        try:
+            blob = self._register(MediaBlob, digest, blob_name(digest, name), size)
+            full_path = self.path(blob.name)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                file_move_safe(source, full_path, allow_overwrite=True)
+                owned = False
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if owned:
+                os.remove(source)
+        return blob.name
+
+    def _spool(self, content):
+        """Copy content to a temporary file next to the blobs, hashing it on the way"""
+        directory = self.path(TEMP_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as spool:
+            try:
+                content.seek(0)
+            except (AttributeError, OSError):
+                pass
+            for data in content.chunks(READ_SIZE):
+                if isinstance(data, str):
+                    data = data.encode()
+                spool.write(data)
+                digest.update(data)
+                size += len(data)
+        return spool.name, digest.hexdigest(), size
+
+    def _register(self, model, digest, name, size):
+        """
+        Blob row of a digest, created with no references for new content.
+        An existing one is touched so a running collection keeps it, and
+        created again when a collection deleted it in the meantime.
+        """
+        blob = model.objects.filter(digest=digest).first()
+        if blob is not None and model.objects.filter(pk=blob.pk).update(updated_at=timezone.now()):
+            return blob
+        try:
+            with transaction.atomic():
+                return model.objects.create(digest=digest, name=name, size=size)
+        except IntegrityError:
+            # saved concurrently by another request
+            return model.objects.get(digest=digest)
+
+    def delete(self, name):
+        if is_blob(name):
+            # other lectures may name the same blob, collect_media_blobs removes it
+            return
+        super().delete(name)
@@ -0,0 +1,76 @@
+"""
+Test the request-scoped access resolver
+"""
+from django.test import TestCase, RequestFactory
+
+from core.access import AccessMiddleware, get_access
+from core.models import User, Category, Course, Section, Lecture, Enrollment
+
+
+class AccessResolverTest(TestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(email='student@test.com', password='Testpass123!')
+        self.instructor = User.objects.create_user(
+            email='instructor@test.com', password='Testpass123!', role='instructor'
+        )
+        category = Category.objects.create(name='Programming')
+        self.course = Course.objects.create(
+            title='Python', description='Learn Python', category=category, price=10
+        )
+        self.other = Course.objects.create(
+            title='Go', description='Learn Go', category=category, price=10
+        )
+        self.course.instructor.add(self.instructor)
+        section = Section.objects.create(course=self.course, title='Intro', order=1)
+        self.lecture = Lecture.objects.create(
+            section=section, title='Welcome', order=1, duration=60,
+            content_type='article', article='Hello'
+        )
+        Enrollment.objects.create(student=self.student, course=self.course)
+        Enrollment.objects.create(student=self.student, course=self.other, is_active=False)
+
+    def in_request(self, check):
+        """Run check inside the middleware's request scope"""
+        results = []
+        middleware = AccessMiddleware(lambda request: results.append(check()))
+        middleware(RequestFactory().get('/'))
+        return results[0]
+
+    def test_request_scope_loads_each_fact_once(self):
+        """Test repeated checks in one request share one query per kind"""
+        def check():
+            with self.assertNumQueries(3):
+                access = get_access(self.student)
+                course_id = access.lecture_course_id(self.lecture.id)
+                results = [
+                    access.is_enrolled(course_id),
+                    get_access(self.student.id).is_enrolled(self.course.id, active_only=True),
+                    access.is_enrolled(self.other.id),
+                    access.is_enrolled(self.other.id, active_only=True),
+                    access.lecture_course_id(self.lecture.id) == self.course.id,
+                    get_access(self.student).is_instructor(self.course.id),
+                ]
+            return results
+
+        self.assertEqual(self.in_request(check), [True, True, True, False, True, False])
+
+    def test_changes_during_the_request_are_seen(self):
+        """Test enrollments and instructors added mid-request drop the cached ids"""
+        def check():
+            access = get_access(self.instructor)
+            before = (access.is_enrolled(self.course.id), access.is_instructor(self.other.id))
+            Enrollment.objects.create(student=self.instructor, course=self.course)
+            self.other.instructor.add(self.instructor)
+            return before, (access.is_enrolled(self.course.id), access.is_instructor(self.other.id))
+
+        self.assertEqual(self.in_request(check), ((False, False), (True, True)))
+
+    def test_outside_request_queries_current_data(self):
+        """Test checks outside a request are not cached"""
+        access = get_access(self.student)
+        self.assertFalse(access.is_instructor(self.course.id))
+        self.course.instructor.add(self.student)
+        self.assertTrue(access.is_instructor(self.course.id))
+        self.assertIsNone(access.lecture_course_id(0))
+        self.assertFalse(get_access(None).is_enrolled(self.course.id))
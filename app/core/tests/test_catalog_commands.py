@@ -0,0 +1,47 @@
+"""
+Test the synthetic catalog generator and the endpoint benchmark
+"""
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import Course, Enrollment, Lecture, CourseReview
+
+
+class CatalogCommandsTest(TestCase):
+
+    def test_generate_and_benchmark(self):
+        """Test a small catalog is generated with consistent aggregates and benchmarked"""
+        call_command(
+            'generate_catalog', '--courses', '12', '--students', '30',
+            '--instructors', '3', '--batch-size', '5', '--review-rate', '0.5',
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Course.objects.count(), 12)
+        self.assertTrue(Enrollment.objects.exists())
+        course = Course.objects.filter(reviews__isnull=False).first()
+        ratings = list(CourseReview.objects.filter(course=course).values_list('rating', flat=True))
+        self.assertEqual((course.review_count, course.rating_sum), (len(ratings), sum(ratings)))
+        self.assertEqual(
+            course.total_duration,
+            sum(Lecture.objects.filter(section__course=course).values_list('duration', flat=True))
+        )
+        with self.assertRaises(CommandError):
+            call_command('generate_catalog', '--courses', '1', stdout=StringIO())
+
+        out = StringIO()
+        call_command(
+            'benchmark_endpoints', '--iterations', '2', '--warmup', '0',
+            '--endpoint', 'search-text', '--endpoint', 'my-cart',
+            '--output', '-', stdout=out,
+        )
+        report = json.loads(out.getvalue()[out.getvalue().index('{'):])
+        self.assertEqual(report['dataset']['courses'], 12)
+        self.assertEqual(set(report['endpoints']), {'search-text', 'my-cart'})
+        for result in report['endpoints'].values():
+            self.assertEqual(result['status_codes'], {'200': 2})
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
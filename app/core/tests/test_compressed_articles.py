@@ -0,0 +1,104 @@
+"""
+Tests for compressed lecture article storage
+"""
+import zlib
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.fields import GZIP_MAGIC
+from core.models import Lecture, Section
+from core.tests.test_curriculum_models import BaseModelTestCase
+
+ARTICLE = '<p>Lists, tuples and dictionaries.</p>\n' * 200
+
+
+class CompressedArticleTests(BaseModelTestCase):
+    """Tests for CompressedTextField on Lecture.article and compress_articles"""
+
+    def setUp(self):
+        super().setUp()
+        self.section = Section.objects.create(title='Intro', course=self.course, order=1)
+
+    def lecture(self, order, article=ARTICLE):
+        return Lecture.objects.create(
+            section=self.section, title=f'Reading {order}', order=order, duration=60,
+            content_type='article', article=article,
+        )
+
+    def stored(self, lecture):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT article FROM core_lecture WHERE id = %s', [lecture.pk])
+            return cursor.fetchone()[0]
+
+    def test_long_article_is_stored_compressed(self):
+        lecture = self.lecture(1)
+        stored = bytes(self.stored(lecture))
+
+        self.assertEqual(stored[:2], GZIP_MAGIC)
+        self.assertLess(len(stored), len(ARTICLE) // 10)
+        self.assertEqual(zlib.decompress(stored, wbits=31).decode(), ARTICLE)
+        self.assertEqual(Lecture.objects.with_content().get(pk=lecture.pk).article, ARTICLE)
+
+    def test_short_article_is_stored_plain(self):
+        lecture = self.lecture(1, article='<p>Short é</p>')
+
+        self.assertEqual(bytes(self.stored(lecture)), '<p>Short é</p>'.encode())
+        self.assertEqual(Lecture.objects.with_content().get(pk=lecture.pk).article, '<p>Short é</p>')
+
+    def test_unchanged_article_is_written_back_as_stored(self):
+        lecture = self.lecture(1)
+        loaded = Lecture.objects.with_content().get(pk=lecture.pk)
+        field = Lecture._meta.get_field('article')
+        before = field.stored_value(loaded).stored
+
+        loaded.title = 'Renamed'
+        loaded.save()
+        self.assertEqual(bytes(self.stored(lecture)), before)
+
+        loaded.article = 'Rewritten'
+        loaded.save()
+        self.assertEqual(Lecture.objects.with_content().get(pk=lecture.pk).article, 'Rewritten')
+
+    def test_saving_leaves_the_deferred_article_unloaded(self):
+        lecture = Lecture.objects.get(pk=self.lecture(1).pk)
+        lecture.title = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            lecture.save()
+        self.assertFalse([
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and '"core_lecture"."article"' in query['sql']
+        ])
+        self.assertNotIn('article', lecture.__dict__)
+        self.assertEqual(Lecture.objects.with_content().get(pk=lecture.pk).article, ARTICLE)
+
+        lecture.content_type = 'file'
+        with self.assertRaises(ValidationError):
+            lecture.save()
+
+    def test_command_compresses_text_rows(self):
+        legacy = self.lecture(1)
+        short = self.lecture(2, article='Short')
+        with connection.cursor() as cursor:
+            # rows written to the text column before the migration
+            cursor.execute('UPDATE core_lecture SET article = %s WHERE id IN (%s, %s)',
+                           [ARTICLE, legacy.pk, short.pk])
+        self.assertIsInstance(self.stored(legacy), str)
+        updated_at = Lecture.objects.get(pk=legacy.pk).updated_at
+
+        out = StringIO()
+        call_command('compress_articles', '--batch-size', '1', stdout=out)
+
+        self.assertIn('Rewrote 2 articles', out.getvalue())
+        for lecture in (legacy, short):
+            self.assertEqual(bytes(self.stored(lecture))[:2], GZIP_MAGIC)
+            reloaded = Lecture.objects.with_content().get(pk=lecture.pk)
+            self.assertEqual(reloaded.article, ARTICLE)
+        self.assertEqual(Lecture.objects.get(pk=legacy.pk).updated_at, updated_at)
+
+        out = StringIO()
+        call_command('compress_articles', stdout=out)
+        self.assertIn('Rewrote 0 articles', out.getvalue())
@@ -277,6 +277,29 @@ class SectionAggregationTests(BaseModelTestCase):
         lecture.delete()
         self.assertEqual(self.section.lectures.count(), 0)
 
+    def test_course_total_duration_follows_lectures(self):
+        """Test the stored course duration and lecture count track lecture writes"""
+        other = Section.objects.create(title="Other", course=self.course, order=2)
+        lecture = Lecture.objects.create(title="One", section=self.section, content_type="article",
+                                         article="Text", duration=600, order=1)
+        Lecture.objects.create(title="Two", section=other, content_type="article",
+                               article="Text", duration=300, order=1)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_duration, 900)
+        self.assertEqual(self.course.lecture_count, 2)
+
+        lecture = Lecture.objects.get(pk=lecture.pk)
+        lecture.duration = 120
+        lecture.save()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_duration, 420)
+
+        lecture.delete()
+        other.delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_duration, 0)
+        self.assertEqual(self.course.lecture_count, 0)
+
     def test_preview_lecture_filtering(self):
         """Test preview system for access control"""
         preview_lecture = Lecture.objects.create(
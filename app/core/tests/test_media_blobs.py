@@ -0,0 +1,121 @@
+"""
+Tests for content-addressed lecture media storage
+"""
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import QuerySet
+
+from core.management.commands.collect_media_blobs import Command as CollectMediaBlobs
+from core.models import Lecture, MediaBlob, Section
+from core.tests.test_curriculum_models import BaseModelTestCase
+
+
+class MediaBlobTests(BaseModelTestCase):
+    """Tests for DedupStorage, blob references and collect_media_blobs"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        super().setUp()
+        self.section = Section.objects.create(title='Intro', course=self.course, order=1)
+
+    def lecture(self, order, content=b'intro video', name='intro.mp4'):
+        return Lecture.objects.create(
+            section=self.section, title=f'Lecture {order}', order=order, duration=60,
+            content_type='video', video=SimpleUploadedFile(name, content),
+        )
+
+    def collect(self, *args):
+        call_command('collect_media_blobs', '--grace', '0', *args, stdout=StringIO())
+
+    def test_same_content_is_stored_once(self):
+        first = self.lecture(1)
+        second = self.lecture(2, name='copy.MP4')
+
+        self.assertEqual(first.video.name, second.video.name)
+        self.assertTrue(first.video.name.startswith('blobs/'))
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.size, len(b'intro video'))
+        with first.video.open('rb') as stored:
+            self.assertEqual(stored.read(), b'intro video')
+
+    def test_deleting_lectures_releases_references(self):
+        first = self.lecture(1)
+        second = self.lecture(2)
+        path = first.video.path
+
+        first.delete()
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+        self.collect()
+        self.assertTrue(os.path.exists(path))
+
+        Lecture.objects.get(pk=second.pk).delete()
+        self.assertEqual(MediaBlob.objects.get().ref_count, 0)
+        self.collect()
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_replacing_media_moves_the_reference(self):
+        lecture = Lecture.objects.get(pk=self.lecture(1).pk)
+        old_name = lecture.video.name
+        lecture.video = SimpleUploadedFile('new.mp4', b'new video')
+        lecture.save()
+
+        counts = dict(MediaBlob.objects.values_list('name', 'ref_count'))
+        self.assertEqual(counts[old_name], 0)
+        self.assertEqual(counts[lecture.video.name], 1)
+
+    def test_collect_removes_stray_files_and_fixes_counts(self):
+        lecture = self.lecture(1)
+        stray = os.path.join(os.path.dirname(lecture.video.path), 'f' * 64 + '.mp4')
+        with open(stray, 'wb') as handle:
+            handle.write(b'orphan')
+        MediaBlob.objects.update(ref_count=0)
+
+        self.collect('--recount')
+        self.assertFalse(os.path.exists(stray))
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+        self.assertTrue(os.path.exists(lecture.video.path))
+
+    def test_collect_keeps_blobs_referenced_after_they_were_read(self):
+        lecture = self.lecture(1)
+        MediaBlob.objects.update(ref_count=0)
+        delete_rows = CollectMediaBlobs.delete_rows
+
+        def referenced_meanwhile(command, batch, cutoff):
+            # a lecture names the blob between the collection's read and its delete
+            MediaBlob.acquire([name for _, name in batch])
+            return delete_rows(command, batch, cutoff)
+
+        with mock.patch.object(CollectMediaBlobs, 'delete_rows', referenced_meanwhile):
+            self.collect()
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+        self.assertTrue(os.path.exists(lecture.video.path))
+
+    def test_saving_recreates_a_blob_collected_meanwhile(self):
+        path = self.lecture(1).video.path
+        first = QuerySet.first
+
+        def collected_meanwhile(queryset):
+            blob = first(queryset)
+            if queryset.model is MediaBlob and blob is not None:
+                # the collection deletes the row and the file after it was read
+                MediaBlob.objects.all().delete()
+                os.remove(path)
+            return blob
+
+        with mock.patch.object(QuerySet, 'first', collected_meanwhile):
+            lecture = self.lecture(2)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+        with lecture.video.open('rb') as stored:
+            self.assertEqual(stored.read(), b'intro video')
@@ -0,0 +1,52 @@
+"""
+Tests for batched after-commit callbacks
+"""
+from django.db import transaction
+from django.test import TestCase
+
+from core.oncommit import on_commit_once
+
+
+class OnCommitOnceTests(TestCase):
+    """Tests for on_commit_once"""
+
+    def setUp(self):
+        self.calls = []
+
+    def handler(self, keys):
+        self.calls.append(set(keys))
+
+    def failing_handler(self, keys):
+        raise RuntimeError('pool is broken')
+
+    def test_keys_of_one_transaction_share_a_callback(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, transaction.atomic():
+            on_commit_once(self.handler, [1, 2])
+            with transaction.atomic():
+                on_commit_once(self.handler, [2, 3])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.calls, [{1, 2, 3}])
+
+    def test_rolled_back_savepoint_starts_a_new_batch(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, transaction.atomic():
+            try:
+                with transaction.atomic():
+                    on_commit_once(self.handler, [1])
+                    raise ValueError
+            except ValueError:
+                pass
+            on_commit_once(self.handler, [2])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.calls, [{2}])
+
+    def test_batch_that_ran_is_not_reused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            on_commit_once(self.handler, [1])
+        with self.captureOnCommitCallbacks(execute=True):
+            on_commit_once(self.handler, [2])
+        self.assertEqual(self.calls, [{1}, {2}])
+
+    def test_failing_handler_is_logged_not_raised(self):
+        with self.assertLogs('django', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                on_commit_once(self.failing_handler, [1])
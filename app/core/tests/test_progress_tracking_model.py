@@ -3,7 +3,8 @@ Test for Progress Tracking Model
 CourseProgress and LectureProgress Model Test
 """
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.db import transaction
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from core.signal import signals
@@ -96,9 +97,15 @@ class LectureProgressModelTest(TestCase):
         self.assertEqual(progress.watch_time, 0)
 
 
+@override_settings(MEDIA_DURATION_WORKERS=0)
 class CourseProgressModelTest(TestCase):
 
     def setUp(self):
+        # committed, so the tests' own after-commit work gets its own callbacks
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_course()
+
+    def create_course(self):
         """Setup course with multiple lectures"""
         self.student = User.objects.create_user(
             email='student@test.com',
@@ -217,3 +224,85 @@ class CourseProgressModelTest(TestCase):
         )
 
         self.assertTrue(course_progress.is_completed)
+
+    def test_completion_flips_apply_deltas(self):
+        """Test only is_completed flips change CourseProgress, one UPDATE each"""
+        Enrollment.objects.create(student=self.student, course=self.course)
+        progress = LectureProgress.objects.create(
+            student=self.student, lecture=self.lecture1, is_completed=True
+        )
+        LectureProgress.objects.create(
+            student=self.student, lecture=self.lecture2, is_completed=True
+        )
+        course_progress = CourseProgress.objects.get(student=self.student, course=self.course)
+        self.assertEqual(course_progress.completed_lectures, 2)
+
+        progress = LectureProgress.objects.get(pk=progress.pk)
+        progress.is_completed = False
+        with self.assertNumQueries(1):
+            signals.update_course_progress_on_lecture_save(
+                LectureProgress, progress, created=False
+            )
+        course_progress.refresh_from_db()
+        self.assertEqual(course_progress.completed_lectures, 1)
+        self.assertEqual(course_progress.total_lectures, 3)
+        self.assertAlmostEqual(float(course_progress.progress_percentage), 33.33, places=2)
+
+        # Saving without a flip leaves the counter alone
+        with self.assertNumQueries(0):
+            signals.update_course_progress_on_lecture_save(
+                LectureProgress, progress, created=False
+            )
+
+        LectureProgress.objects.get(student=self.student, lecture=self.lecture2).delete()
+        course_progress.refresh_from_db()
+        self.assertEqual(course_progress.completed_lectures, 0)
+        self.assertEqual(float(course_progress.progress_percentage), 0)
+
+    def test_lecture_create_and_delete_recount_all_students(self):
+        """Test curriculum changes recount every student's progress after commit"""
+        other = User.objects.create_user(email='other@test.com', password='Testpass123!')
+        for student in (self.student, other):
+            Enrollment.objects.create(student=student, course=self.course)
+            LectureProgress.objects.create(student=student, lecture=self.lecture1, is_completed=True)
+        LectureProgress.objects.create(student=other, lecture=self.lecture2, is_completed=True)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, transaction.atomic():
+            Lecture.objects.create(section=self.section, title="Extra", order=4,
+                                   duration=60, content_type="article", article="Notes")
+            Lecture.objects.create(section=self.section, title="Extra 2", order=5,
+                                   duration=60, content_type="article", article="Notes")
+        self.assertEqual(
+            [callback.handler for callback in callbacks].count(signals._recalculate_progress), 1
+        )
+        progress = {p.student_id: p for p in CourseProgress.objects.filter(course=self.course)}
+        self.assertEqual(progress[self.student.id].total_lectures, 5)
+        self.assertEqual(float(progress[self.student.id].progress_percentage), 20)
+        self.assertEqual(progress[other.id].total_lectures, 5)
+        self.assertEqual(float(progress[other.id].progress_percentage), 40)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lecture2.delete()
+        progress = {p.student_id: p for p in CourseProgress.objects.filter(course=self.course)}
+        self.assertEqual(progress[other.id].completed_lectures, 1)
+        self.assertEqual(progress[other.id].total_lectures, 4)
+        self.assertEqual(float(progress[other.id].progress_percentage), 25)
+
+    def test_recalculate_for_course_in_batches(self):
+        """Test the recount covers every progress row across id windows"""
+        students = [
+            User.objects.create_user(email=f's{number}@test.com', password='Testpass123!')
+            for number in range(5)
+        ]
+        for student in students:
+            Enrollment.objects.create(student=student, course=self.course)
+            LectureProgress.objects.create(student=student, lecture=self.lecture3, is_completed=True)
+        CourseProgress.objects.filter(course=self.course).update(
+            completed_lectures=0, total_lectures=0, progress_percentage=0
+        )
+
+        self.assertEqual(CourseProgress.recalculate_for_course(self.course.id, batch_size=2), 5)
+        self.assertEqual(CourseProgress._recalculate_for_course_with_subqueries(self.course.id), 5)
+        for progress in CourseProgress.objects.filter(course=self.course):
+            self.assertEqual((progress.completed_lectures, progress.total_lectures), (1, 3))
+            self.assertAlmostEqual(float(progress.progress_percentage), 33.33, places=2)
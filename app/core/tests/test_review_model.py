@@ -203,3 +203,59 @@ class CourseReviewModelTests(TestCase):
         review.refresh_from_db()
 
         self.assertGreater(review.updated_at, original_updated_at)
+
+    def test_review_updates_course_rating_aggregates(self):
+        """Test that creating, editing and deleting reviews keeps Course aggregates in sync"""
+        Enrollment.objects.create(
+            student=self.student2,
+            course=self.course
+        )
+        review1 = CourseReview.objects.create(
+            student=self.student,
+            course=self.course,
+            rating=5
+        )
+        CourseReview.objects.create(
+            student=self.student2,
+            course=self.course,
+            rating=2
+        )
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.rating_sum, 7)
+        self.assertEqual(self.course.review_count, 2)
+        self.assertEqual(float(self.course.average_rating), 3.5)
+
+        review1.rating = 3
+        review1.save()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.rating_sum, 5)
+        self.assertEqual(self.course.review_count, 2)
+        self.assertEqual(float(self.course.average_rating), 2.5)
+
+        CourseReview.objects.get(pk=review1.pk).delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.rating_sum, 2)
+        self.assertEqual(self.course.review_count, 1)
+        self.assertEqual(float(self.course.average_rating), 2.0)
+
+        CourseReview.objects.get(student=self.student2).delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.review_count, 0)
+        self.assertEqual(float(self.course.average_rating), 0)
+
+    def test_recalculate_rating_aggregates(self):
+        """Test rebuilding aggregates after a write that bypassed save()"""
+        review = CourseReview.objects.create(
+            student=self.student,
+            course=self.course,
+            rating=5
+        )
+        CourseReview.objects.filter(pk=review.pk).update(rating=1)
+
+        Course.recalculate_rating_aggregates([self.course.id])
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.rating_sum, 1)
+        self.assertEqual(self.course.review_count, 1)
+        self.assertEqual(float(self.course.average_rating), 1.0)
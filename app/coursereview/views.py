@@ -2,7 +2,9 @@
 Views for handling POST, GET & UPDATE CourseReview
 """
 from coursereview.serializers import CourseReviewSerializer
-from core.models import Lecture, Section, Course, Enrollment, CourseReview
+from core.access import get_access
+from core.conditional import ConditionalListMixin
+from core.models import Lecture, Section, Course, CourseReview
 from django.shortcuts import get_object_or_404
 from rest_framework.authentication import TokenAuthentication
 from rest_framework import generics, status
@@ -13,7 +15,7 @@ from coursereview.permissions import CanUpdateOwnCourseReview
 from rest_framework.response import Response
 
 
-class CourseReviewView(generics.ListCreateAPIView):
+class CourseReviewView(ConditionalListMixin, generics.ListCreateAPIView):
     """CourseReview: Handle POST AND GET"""
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -38,10 +40,7 @@ class CourseReviewView(generics.ListCreateAPIView):
         course_id = kwargs.get('course_id')
         course = get_object_or_404(Course, id=course_id)
 
-        if not Enrollment.objects.filter(
-                student=request.user,
-                course=course
-        ).exists():
+        if not get_access(request.user).is_enrolled(course.id):
             return Response(
                 {'detail': 'You must be enrolled in this course to create a review.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -0,0 +1,254 @@
+"""
+In-memory prefix index for search-as-you-type.
+
+Course titles, category and subcategory names and instructor names are
+stored in a trie keyed by every word-start suffix of the lowercased label,
+so "dja" and "web dev" both reach "Complete Django Web Development".
+Every trie node keeps its top-k suggestions by popularity weight (the
+number of enrollments behind the entry), overall and per entry type, so a
+lookup is one walk down the trie and no sorting, and a types filter is not
+starved by heavier entries of other types.
+
+The index lives per worker process. It is built lazily on first use,
+patched by the signals in courses/signals.py and rebuilt once it is
+older than AUTOCOMPLETE_MAX_AGE seconds to pick up writes seen by other
+workers.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Count
+
+from core.models import Course, Category, SubCategory, User, Enrollment
+
+Suggestion = namedtuple('Suggestion', ['type', 'id', 'label', 'weight'])
+
+TYPES = ('course', 'category', 'subcategory', 'instructor')
+TOP_K = 10
+MAX_KEY_LENGTH = 32
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def label_suffixes(label):
+    """Every word-start suffix of the normalized label"""
+    words = normalize(label).split()
+    return [' '.join(words[start:]) for start in range(len(words))]
+
+
+def label_keys(label):
+    """Trie keys of a label: its suffixes capped to MAX_KEY_LENGTH"""
+    return {suffix[:MAX_KEY_LENGTH] for suffix in label_suffixes(label)}
+
+
+class _Node:
+    __slots__ = ('children', 'entries', 'top', 'top_by_type')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = set()
+        self.top = ()
+        self.top_by_type = {}
+
+
+class PrefixIndex:
+    """Trie of label suffixes whose nodes cache their top-k suggestions"""
+
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self.root = _Node()
+        self.suggestions = {}
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+
+    def _rank(self, keys):
+        live = [self.suggestions[key] for key in keys if key in self.suggestions]
+        live.sort(key=lambda suggestion: (-suggestion.weight, suggestion.label))
+        return [(suggestion.type, suggestion.id) for suggestion in live]
+
+    def _refresh_top(self, node):
+        # the overall top-k is within the union of the per-type ones
+        candidates = set(node.entries)
+        for child in node.children.values():
+            for top in child.top_by_type.values():
+                candidates.update(top)
+        ranked = self._rank(candidates)
+        node.top = tuple(ranked[:self.top_k])
+        top_by_type = {}
+        for key in ranked:
+            top = top_by_type.setdefault(key[0], [])
+            if len(top) < self.top_k:
+                top.append(key)
+        node.top_by_type = {type: tuple(top) for type, top in top_by_type.items()}
+
+    def _refresh_path(self, text):
+        """Recompute top-k bottom-up along the path of `text`, pruning empty nodes"""
+        path = [self.root]
+        for char in text:
+            node = path[-1].children.get(char)
+            if node is None:
+                break
+            path.append(node)
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            self._refresh_top(node)
+            if depth and not node.top:
+                del path[depth - 1].children[text[depth - 1]]
+
+    def _refresh_all(self, node):
+        for child in node.children.values():
+            self._refresh_all(child)
+        self._refresh_top(node)
+
+    def _link(self, key, suggestion):
+        for text in label_keys(suggestion.label):
+            node = self.root
+            for char in text:
+                node = node.children.setdefault(char, _Node())
+            node.entries.add(key)
+
+    def _unlink(self, key, suggestion):
+        texts = label_keys(suggestion.label)
+        for text in texts:
+            node = self.root
+            for char in text:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                node.entries.discard(key)
+        for text in texts:
+            self._refresh_path(text)
+
+    def load(self, suggestions):
+        """Bulk insert, computing every node's top-k in one pass"""
+        with self.lock:
+            for suggestion in suggestions:
+                key = (suggestion.type, suggestion.id)
+                self.suggestions[key] = suggestion
+                self._link(key, suggestion)
+            self._refresh_all(self.root)
+
+    def upsert(self, type, id, label=None, weight_delta=0):
+        """Insert an entry or change its label/weight, keeping the old weight"""
+        key = (type, id)
+        with self.lock:
+            current = self.suggestions.get(key)
+            if current is None:
+                if not label:
+                    return
+                current = Suggestion(type, id, label, 0)
+            updated = current._replace(
+                label=label or current.label,
+                weight=max(current.weight + weight_delta, 0),
+            )
+            if updated == current and key in self.suggestions:
+                return
+
+            if key in self.suggestions:
+                self.suggestions.pop(key)
+                self._unlink(key, current)
+            self.suggestions[key] = updated
+            self._link(key, updated)
+            for text in label_keys(updated.label):
+                self._refresh_path(text)
+
+    def remove(self, type, id):
+        key = (type, id)
+        with self.lock:
+            current = self.suggestions.pop(key, None)
+            if current is not None:
+                self._unlink(key, current)
+
+    def search(self, prefix, limit=TOP_K, types=None):
+        text = normalize(prefix)
+        if not text:
+            return []
+        node = self.root
+        for char in text[:MAX_KEY_LENGTH]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        if types:
+            keys = self._rank(
+                key for type in types for key in node.top_by_type.get(type, ())
+            )
+        else:
+            keys = node.top
+        results = []
+        for key in keys:
+            suggestion = self.suggestions.get(key)
+            if suggestion is None:
+                continue
+            if len(text) > MAX_KEY_LENGTH and not any(
+                    suffix.startswith(text) for suffix in label_suffixes(suggestion.label)):
+                continue
+            results.append(suggestion)
+            if len(results) == limit:
+                break
+        return results
+
+
+def load_suggestions():
+    """Every suggestion with its enrollment weight, in a fixed number of grouped queries"""
+    course_weights = dict(
+        Enrollment.objects.values('course').annotate(total=Count('id'))
+        .order_by().values_list('course', 'total')
+    )
+    category_weights = dict(
+        Enrollment.objects.values('course__category').annotate(total=Count('id'))
+        .order_by().values_list('course__category', 'total')
+    )
+    subcategory_weights = dict(
+        Enrollment.objects.values('course__subcategory').annotate(total=Count('id'))
+        .order_by().values_list('course__subcategory', 'total')
+    )
+    instructor_weights = dict(
+        Enrollment.objects.values('course__instructor').annotate(total=Count('id'))
+        .order_by().values_list('course__instructor', 'total')
+    )
+
+    for pk, title in Course.objects.values_list('id', 'title'):
+        yield Suggestion('course', pk, title, course_weights.get(pk, 0))
+    for pk, name in Category.objects.values_list('id', 'name'):
+        yield Suggestion('category', pk, name, category_weights.get(pk, 0))
+    for pk, name in SubCategory.objects.values_list('id', 'name'):
+        yield Suggestion('subcategory', pk, name, subcategory_weights.get(pk, 0))
+    instructors = User.objects.filter(role='instructor').exclude(name='')
+    for pk, name in instructors.values_list('id', 'name'):
+        yield Suggestion('instructor', pk, name, instructor_weights.get(pk, 0))
+
+
+_index = None
+_build_lock = threading.Lock()
+
+
+def get_index():
+    """The worker's index, built on first use and when older than AUTOCOMPLETE_MAX_AGE"""
+    global _index
+    max_age = getattr(settings, 'AUTOCOMPLETE_MAX_AGE', 300)
+    index = _index
+    if index is None or time.monotonic() - index.built_at > max_age:
+        with _build_lock:
+            if _index is index:
+                index = PrefixIndex()
+                index.load(load_suggestions())
+                _index = index
+            index = _index
+    return index
+
+
+def loaded_index():
+    """The index if this worker already built it, signals skip unbuilt ones"""
+    return _index
+
+
+def reset():
+    global _index
+    _index = None
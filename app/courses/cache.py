@@ -0,0 +1,135 @@
+"""
+Versioned result cache for Course search.
+
+Every cache key embeds the current catalog version, a CatalogVersion row
+shared by every worker. Writes to courses, reviews, categories and the
+course M2M tables bump it (see courses/signals.py), so stale entries are
+never read again and simply expire, no key scan is needed.
+
+Results and facets live in the per-process 'search' cache, so a hit costs
+no query: the version is read from the database at most once every
+COURSE_SEARCH_VERSION_TTL seconds, and read back by a local bump. A
+write in another worker reaches this one's results within that TTL. The
+hit/miss counters are kept per process as well.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core.models import CatalogVersion
+from courses.filters import FILTER_PARAMS
+
+CACHE_ALIAS = 'search'
+
+# Every parameter that changes the search response body
+RESULT_PARAMS = ('q',) + FILTER_PARAMS + (
+    'sort', 'facets', 'page', 'page_size', 'pagination', 'cursor', 'count',
+)
+
+_lock = threading.Lock()
+# (monotonic expiry, version) read from the database, None to read it again
+_version = None
+_counts = Counter()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def filter_signature(query_params, names):
+    """
+    Stable digest of the filter parameters in `names`:
+    missing and blank values are dropped and whitespace is collapsed,
+    so equivalent requests share one cache entry.
+    """
+    normalized = {}
+    for name in names:
+        value = ' '.join(query_params.get(name, '').split())
+        if value:
+            normalized[name] = value.lower() if name == 'q' else value
+    payload = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _read_version():
+    global _version
+    version = CatalogVersion.current()
+    _version = (time.monotonic() + getattr(settings, 'COURSE_SEARCH_VERSION_TTL', 2), version)
+    return version
+
+
+def _forget_version():
+    global _version
+    _version = None
+
+
+def get_catalog_version():
+    cached = _version
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    return _read_version()
+
+
+def bump_catalog_version():
+    """
+    Move the shared version and read it back for this process. A bump rolled
+    back leaves a version no other write reuses, its cached entries are unreachable.
+    """
+    CatalogVersion.bump()
+    version = _read_version()
+    # a read racing the bump may have cached the version before it committed
+    transaction.on_commit(_forget_version)
+    return version
+
+
+def result_key(request):
+    """Cache key for one search request at the current catalog version"""
+    return 'course-search:v{}:{}:{}'.format(
+        get_catalog_version(),
+        request.get_host(),
+        filter_signature(request.query_params, RESULT_PARAMS),
+    )
+
+
+def get_result(request):
+    """Cached response data for the request, counting the hit or miss"""
+    data = get_cache().get(result_key(request))
+    with _lock:
+        _counts['hits' if data is not None else 'misses'] += 1
+    return data
+
+
+def set_result(request, data):
+    get_cache().set(
+        result_key(request),
+        data,
+        getattr(settings, 'COURSE_SEARCH_CACHE_TIMEOUT', 600),
+    )
+
+
+def stats():
+    """Hit/miss counters of this worker process for sizing the cache"""
+    with _lock:
+        hits, misses = _counts['hits'], _counts['misses']
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+        'catalog_version': get_catalog_version(),
+    }
+
+
+def reset():
+    """Forget this process's cached results, version and counters"""
+    global _version
+    get_cache().clear()
+    with _lock:
+        _version = None
+        _counts.clear()
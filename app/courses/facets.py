@@ -0,0 +1,97 @@
+"""
+Facet counts for Course search results
+"""
+from django.conf import settings
+from django.db.models import Case, CharField, Count, Q, Value, When
+from rest_framework.exceptions import ValidationError
+
+from core.models import Course
+from courses.cache import filter_signature, get_cache, get_catalog_version
+
+FACETS = ('category', 'subcategory', 'level', 'language', 'price')
+
+# (bucket, condition) in display order
+PRICE_BUCKETS = (
+    ('free', Q(price=0)),
+    ('0-20', Q(price__gt=0, price__lt=20)),
+    ('20-50', Q(price__gte=20, price__lt=50)),
+    ('50-100', Q(price__gte=50, price__lt=100)),
+    ('100+', Q(price__gte=100)),
+)
+
+
+def parse_facets(value):
+    """`category,level` or `all` -> tuple of facet names"""
+    if value.strip() == 'all':
+        return FACETS
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = sorted(set(names) - set(FACETS))
+    if unknown:
+        raise ValidationError({
+            'facets': f"Unknown facet(s): {', '.join(unknown)}. "
+                      f"Choose from {', '.join(FACETS)} or all."
+        })
+    return tuple(name for name in FACETS if name in names)
+
+
+def compute_facets(queryset, names):
+    """
+    Count the courses of `queryset` per value of every facet in `names`,
+    one grouped query per facet over the deduplicated result ids.
+    """
+    course_ids = queryset.order_by().values('pk')
+    courses = Course.objects.filter(pk__in=course_ids).order_by()
+    facets = {}
+
+    if 'category' in names:
+        facets['category'] = [
+            {'id': row['category_id'], 'name': row['category__name'], 'count': row['count']}
+            for row in courses.values('category_id', 'category__name')
+            .annotate(count=Count('id')).order_by('-count', 'category__name')
+        ]
+
+    if 'subcategory' in names:
+        through = Course.subcategory.through.objects.filter(course_id__in=course_ids)
+        facets['subcategory'] = [
+            {'id': row['subcategory_id'], 'name': row['subcategory__name'], 'count': row['count']}
+            for row in through.values('subcategory_id', 'subcategory__name')
+            .annotate(count=Count('course_id', distinct=True)).order_by('-count', 'subcategory__name')
+        ]
+
+    for field in ('level', 'language'):
+        if field in names:
+            facets[field] = [
+                {'value': row[field], 'count': row['count']}
+                for row in courses.values(field)
+                .annotate(count=Count('id')).order_by('-count', field)
+            ]
+
+    if 'price' in names:
+        bucket = Case(
+            *[When(condition, then=Value(label)) for label, condition in PRICE_BUCKETS],
+            output_field=CharField(),
+        )
+        counts = dict(
+            courses.annotate(bucket=bucket).values('bucket')
+            .annotate(count=Count('id')).values_list('bucket', 'count')
+        )
+        facets['price'] = [
+            {'bucket': label, 'count': counts.get(label, 0)}
+            for label, condition in PRICE_BUCKETS
+        ]
+
+    return facets
+
+
+def get_facets(queryset, query_params, filter_params, names):
+    """compute_facets() cached under the catalog version and normalized filter signature"""
+    key = 'course-facets:v{}:{}:{}'.format(
+        get_catalog_version(),
+        ','.join(names),
+        filter_signature(query_params, filter_params),
+    )
+    facets = get_cache().get(key)
+    if facets is None:
+        facets = compute_facets(queryset, names)
+        get_cache().set(key, facets, getattr(settings, 'COURSE_FACETS_CACHE_TIMEOUT', 300))
+    return facets
@@ -0,0 +1,131 @@
+"""
+Structured filters for Course search.
+
+Every filter compiles to a condition on a Course column or to an
+`id IN (...)` subquery on an M2M through table, so a request with any
+combination of filters is one query over indexed columns that returns
+each course once. Names are resolved with exact matches against the
+unique name columns; the old `name__icontains` join filters could
+neither use an index nor avoid duplicate rows.
+
+Comma separated values are ORed within a parameter, parameters are ANDed.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from core.models import Course, Category
+
+# Every parameter handled here, in the order the conditions are applied
+FILTER_PARAMS = (
+    'category', 'subcategory', 'instructor', 'level', 'language',
+    'free', 'price_min', 'price_max', 'min_duration', 'max_duration',
+    'min_rating',
+)
+
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+def _values(query_params, name):
+    return [value.strip() for value in query_params.get(name, '').split(',') if value.strip()]
+
+
+def _matching_ids(model, values, name_field):
+    """Subquery of `model` ids given as numeric ids or exact names"""
+    ids = [int(value) for value in values if value.isdigit()]
+    names = [value for value in values if not value.isdigit()]
+    return model.objects.filter(
+        Q(id__in=ids) | Q(**{f'{name_field}__in': names})
+    ).order_by().values('id')
+
+
+def _decimal(query_params, name):
+    value = query_params.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: 'A valid number is required.'})
+    if not number.is_finite() or number < 0:
+        raise ValidationError({name: 'A non-negative number is required.'})
+    return number
+
+
+def _minutes(query_params, name):
+    """Duration filters are given in minutes and compared to stored seconds"""
+    value = query_params.get(name, '').strip()
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValidationError({name: 'A whole number of minutes is required.'})
+    return int(value) * 60
+
+
+def _linked_course_ids(field, values, name_field):
+    """Course ids linked through an M2M table to any of the given targets"""
+    target_column = field.m2m_reverse_name()
+    return field.remote_field.through.objects.filter(**{
+        f'{target_column}__in': _matching_ids(field.related_model, values, name_field)
+    }).values('course_id')
+
+
+def filter_courses(queryset, query_params):
+    """Apply every structured filter present in `query_params` to a Course queryset"""
+    category = _values(query_params, 'category')
+    if category:
+        queryset = queryset.filter(
+            category_id__in=_matching_ids(Category, category, 'name')
+        )
+
+    subcategory = _values(query_params, 'subcategory')
+    if subcategory:
+        queryset = queryset.filter(id__in=_linked_course_ids(
+            Course.subcategory.field, subcategory, 'name'
+        ))
+
+    instructor = _values(query_params, 'instructor')
+    if instructor:
+        queryset = queryset.filter(id__in=_linked_course_ids(
+            Course.instructor.field, instructor, 'email'
+        ))
+
+    level = _values(query_params, 'level')
+    if level:
+        queryset = queryset.filter(level__in=level)
+
+    language = _values(query_params, 'language')
+    if language:
+        queryset = queryset.filter(language__in=language)
+
+    free = query_params.get('free', '').strip().lower()
+    if free in TRUE_VALUES:
+        queryset = queryset.filter(price=0)
+    elif free in FALSE_VALUES:
+        queryset = queryset.filter(price__gt=0)
+    elif free:
+        raise ValidationError({'free': 'Use true or false.'})
+
+    price_min = _decimal(query_params, 'price_min')
+    price_max = _decimal(query_params, 'price_max')
+    if price_min is not None and price_max is not None and price_min > price_max:
+        raise ValidationError({'price_min': 'Must not be greater than price_max.'})
+    if price_min is not None:
+        queryset = queryset.filter(price__gte=price_min)
+    if price_max is not None:
+        queryset = queryset.filter(price__lte=price_max)
+
+    min_duration = _minutes(query_params, 'min_duration')
+    max_duration = _minutes(query_params, 'max_duration')
+    if min_duration is not None:
+        queryset = queryset.filter(total_duration__gte=min_duration)
+    if max_duration is not None:
+        queryset = queryset.filter(total_duration__lte=max_duration)
+
+    min_rating = _decimal(query_params, 'min_rating')
+    if min_rating is not None:
+        queryset = queryset.filter(average_rating__gte=min_rating)
+
+    return queryset
@@ -0,0 +1,165 @@
+"""
+Pagination for Course listing and search
+"""
+import base64
+import binascii
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+class CourseKeysetPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+
+    `?pagination=cursor` starts a cursor walk and `?cursor=<token>` continues it.
+    Cursor pages filter on the sort key of the last row seen instead of using
+    OFFSET, so a deep page costs the same as the first one. The total count
+    is skipped unless the client passes `?count=true`.
+
+    The keyset is the queryset ordering, with the primary key appended when
+    the ordering does not already end on it.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        keys = self.get_keys(queryset)
+
+        queryset = queryset.annotate(**{
+            alias: F(field) for alias, field, descending in keys
+        })
+        self.total = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.total = queryset.count()
+
+        reverse = cursor is not None and cursor['d'] == 'p'
+        if cursor is not None:
+            if len(cursor['v']) != len(keys):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                values = self.key_values(queryset, keys, cursor['v'])
+                queryset = queryset.filter(self.keyset_filter(keys, values, reverse))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        order = [
+            f"{'-' if descending != reverse else ''}{alias}"
+            for alias, field, descending in keys
+        ]
+        rows = list(queryset.order_by(*order)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.first_key = self.row_key(rows[0], keys) if rows else None
+        self.last_key = self.row_key(rows[-1], keys) if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        response = {
+            'next': self.get_cursor_link('n', self.last_key) if self.has_next else None,
+            'previous': self.get_cursor_link('p', self.first_key) if self.has_previous else None,
+        }
+        if self.total is not None:
+            response['count'] = self.total
+        response['results'] = data
+        return Response(response)
+
+    def get_keys(self, queryset):
+        """(alias, field, descending) for every ordering term, ending on the pk"""
+        ordering = [
+            term for term in (queryset.query.order_by or ('-pk',))
+            if isinstance(term, str)
+        ]
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering.append(f"{'-' if ordering[0].startswith('-') else ''}pk")
+
+        return [
+            (f'keyset_{index}', term.lstrip('-'), term.startswith('-'))
+            for index, term in enumerate(ordering)
+        ]
+
+    @staticmethod
+    def keyset_filter(keys, values, reverse):
+        """
+        Rows strictly after `values` in key order (before it when reversed):
+        k0 <= v0 AND (k0 < v0 OR (k0 = v0 AND k1 < v1) OR ...) for descending keys.
+        The leading range lets the database seek on an index of k0.
+        """
+        after = Q()
+        equal = Q()
+        for (alias, field, descending), value in zip(keys, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            after |= equal & Q(**{f'{alias}__{lookup}': value})
+            equal &= Q(**{alias: value})
+
+        alias, field, descending = keys[0]
+        lookup = 'lte' if descending != reverse else 'gte'
+        return Q(**{f'{alias}__{lookup}': values[0]}) & after
+
+    @staticmethod
+    def key_values(queryset, keys, values):
+        """Cursor values converted to the type of their key, raising ValidationError"""
+        return [
+            queryset.query.annotations[alias].output_field.to_python(value)
+            for (alias, field, descending), value in zip(keys, values)
+        ]
+
+    @staticmethod
+    def row_key(row, keys):
+        return [getattr(row, alias) for alias, field, descending in keys]
+
+    def get_cursor_link(self, direction, values):
+        payload = json.dumps({'d': direction, 'v': values}, default=_encode_value)
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(cursor, dict) or cursor.get('d') not in ('n', 'p')
+                or not isinstance(cursor.get('v'), list)):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
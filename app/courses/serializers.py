@@ -20,7 +20,7 @@ class CourseSerializer(serializers.ModelSerializer):
     instructor = slug_field_helper('email', get_user_model().objects.all(), many=True, required=True,)
     category = slug_field_helper('name', Category.objects.all())
     subcategory = slug_field_helper('name', SubCategory.objects.all(), many=True, required=True,)
-    average_rating = serializers.ReadOnlyField()
+    average_rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
@@ -30,6 +30,12 @@ class CourseSerializer(serializers.ModelSerializer):
             'language', 'level', 'price', 'average_rating'
         ]
 
+    def get_average_rating(self, obj):
+        """Read the rating aggregates stored on the course row"""
+        return {
+            'average_rating': round(float(obj.average_rating), 1),
+            'review_count': obj.review_count,
+        }
 
     def validate_instructor(self, value):
         """Ensure all provided instructors have role='instructor'."""
@@ -0,0 +1,142 @@
+"""
+Signals invalidating the Course search cache on catalog writes, touching
+courses whose subcategories or instructors change, and patching the
+autocomplete index
+"""
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Course, CourseReview, Category, SubCategory, User, Enrollment
+from courses import autocomplete
+from courses.cache import bump_catalog_version
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseReview)
+@receiver(post_delete, sender=CourseReview)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+def invalidate_search_cache_on_write(sender, **kwargs):
+    """
+    Any catalog write moves the search cache to a new version.
+    """
+    bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=Course.subcategory.through)
+@receiver(m2m_changed, sender=Course.instructor.through)
+def invalidate_search_cache_on_m2m_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=Course.subcategory.through)
+@receiver(m2m_changed, sender=Course.instructor.through)
+def touch_courses_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Subcategories and instructors are part of a course's payload, their
+    edits move its updated_at and so its Last-Modified and list validators.
+    """
+    if reverse and action == 'pre_clear':
+        # the rows are gone by post_clear
+        column = 'subcategory' if isinstance(instance, SubCategory) else 'user'
+        instance._touched_course_ids = list(
+            sender.objects.filter(**{column: instance}).values_list('course_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        course_ids = [instance.pk]
+    elif action == 'post_clear':
+        course_ids = getattr(instance, '_touched_course_ids', [])
+    else:
+        course_ids = pk_set
+    if course_ids:
+        Course.objects.filter(pk__in=course_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+def invalidate_search_cache_on_instructor_change(sender, instance, update_fields, **kwargs):
+    """Instructor emails are part of every search result, logins are not"""
+    if update_fields and not {'email', 'name'} & set(update_fields):
+        return
+    if instance.role == 'instructor':
+        bump_catalog_version()
+
+
+AUTOCOMPLETE_LABELS = {
+    Course: ('course', 'title'),
+    Category: ('category', 'name'),
+    SubCategory: ('subcategory', 'name'),
+}
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+def update_autocomplete_on_save(sender, instance, **kwargs):
+    """
+    Insert or relabel the entry, indexes not built yet load it on first use.
+    """
+    index = autocomplete.loaded_index()
+    if index is not None:
+        type, field = AUTOCOMPLETE_LABELS[sender]
+        index.upsert(type, instance.pk, getattr(instance, field))
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    index = autocomplete.loaded_index()
+    if index is not None:
+        index.remove(AUTOCOMPLETE_LABELS[sender][0], instance.pk)
+
+
+@receiver(post_save, sender=User)
+def update_autocomplete_on_instructor_save(sender, instance, update_fields, **kwargs):
+    index = autocomplete.loaded_index()
+    if index is None or (update_fields and not {'name', 'role'} & set(update_fields)):
+        return
+    if instance.role == 'instructor' and instance.name:
+        index.upsert('instructor', instance.pk, instance.name)
+    else:
+        index.remove('instructor', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def update_autocomplete_on_user_delete(sender, instance, **kwargs):
+    index = autocomplete.loaded_index()
+    if index is not None:
+        index.remove('instructor', instance.pk)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def update_autocomplete_weights_on_enrollment(sender, instance, **kwargs):
+    """
+    An enrollment adds (or removes) one unit of weight to the course,
+    its category, subcategories and instructors.
+    """
+    index = autocomplete.loaded_index()
+    if index is None or kwargs.get('created') is False:
+        return
+    delta = 1 if kwargs.get('created') else -1
+    course = Course.objects.filter(pk=instance.course_id).values('category_id').first()
+    if course is None:
+        return
+
+    index.upsert('course', instance.course_id, weight_delta=delta)
+    index.upsert('category', course['category_id'], weight_delta=delta)
+    related = Course.objects.filter(pk=instance.course_id)
+    for subcategory_id in related.values_list('subcategory', flat=True):
+        if subcategory_id:
+            index.upsert('subcategory', subcategory_id, weight_delta=delta)
+    for instructor_id in related.values_list('instructor', flat=True):
+        if instructor_id:
+            index.upsert('instructor', instructor_id, weight_delta=delta)
@@ -0,0 +1,146 @@
+"""
+Test Autocomplete API and prefix index
+"""
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Category, SubCategory, Course, User, Enrollment
+from courses import autocomplete
+from courses.autocomplete import PrefixIndex, Suggestion
+
+
+class PrefixIndexTest(SimpleTestCase):
+    """Test the trie without the database"""
+
+    def setUp(self):
+        self.index = PrefixIndex(top_k=3)
+        self.index.load([
+            Suggestion('course', 1, 'Complete Django Web Development', 50),
+            Suggestion('course', 2, 'Django for Beginners', 80),
+            Suggestion('course', 3, 'Data Science Bootcamp', 20),
+            Suggestion('category', 1, 'Development', 5),
+        ])
+
+    def labels(self, prefix, **kwargs):
+        return [suggestion.label for suggestion in self.index.search(prefix, **kwargs)]
+
+    def test_prefix_matches_any_word_start_by_weight(self):
+        """Test results come from every word start, heaviest first"""
+        self.assertEqual(
+            self.labels('d'),
+            ['Django for Beginners', 'Complete Django Web Development', 'Data Science Bootcamp']
+        )
+        self.assertEqual(self.labels('web dev'), ['Complete Django Web Development'])
+        self.assertEqual(self.labels('  DJANGO   w'), ['Complete Django Web Development'])
+        self.assertEqual(self.labels('xyz'), [])
+
+    def test_limit_and_types(self):
+        """Test limit and type filtering"""
+        self.assertEqual(self.labels('d', limit=1), ['Django for Beginners'])
+        self.assertEqual(self.labels('dev', types={'category'}), ['Development'])
+
+    def test_types_filter_reaches_past_the_overall_top_k(self):
+        """Test a type is found when heavier entries of another type fill the top-k"""
+        self.index.load([Suggestion('course', pk, f'Design {pk}', 100 + pk) for pk in range(4, 8)])
+        self.assertEqual([suggestion.type for suggestion in self.index.search('d')],
+                         ['course'] * 3)
+        self.assertEqual(self.labels('d', types={'category'}), ['Development'])
+        self.assertEqual(self.labels('d', types={'category', 'course'}, limit=2),
+                         ['Design 7', 'Design 6'])
+
+    def test_incremental_updates(self):
+        """Test upsert, weight changes and removal keep top-k right"""
+        self.index.upsert('course', 3, weight_delta=100)
+        self.assertEqual(self.labels('d', limit=1), ['Data Science Bootcamp'])
+
+        self.index.upsert('course', 3, label='Flask Fundamentals')
+        self.assertEqual(self.labels('data'), [])
+        self.assertEqual(self.labels('fla'), ['Flask Fundamentals'])
+
+        self.index.remove('course', 2)
+        self.assertEqual(self.labels('django'), ['Complete Django Web Development'])
+        self.assertNotIn('b', self.index.root.children)
+
+
+class AutocompleteAPITest(APITestCase):
+    """Test the autocomplete endpoint"""
+
+    def setUp(self):
+        autocomplete.reset()
+        self.url = reverse('course:course-autocomplete')
+        self.category = Category.objects.create(name='Programming')
+        self.subcategory = SubCategory.objects.create(
+            category=self.category, name='Python Development'
+        )
+        self.instructor = User.objects.create_user(
+            email='guido@example.com',
+            password='Testpass123@',
+            name='Pythonista Guido',
+            role='instructor'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='Testpass123@',
+        )
+        self.basics = Course.objects.create(
+            title='Python Basics',
+            description='Learn Python',
+            category=self.category,
+            price=Decimal('10.00')
+        )
+        self.advanced = Course.objects.create(
+            title='Python Advanced',
+            description='Go deeper',
+            category=self.category,
+            price=Decimal('20.00')
+        )
+        self.advanced.instructor.add(self.instructor)
+        self.advanced.subcategory.add(self.subcategory)
+        Enrollment.objects.create(student=self.student, course=self.advanced)
+
+    def tearDown(self):
+        autocomplete.reset()
+
+    def test_suggestions_ranked_by_enrollments(self):
+        """Test every entry type is suggested, most enrolled first"""
+        response = self.client.get(self.url, {'q': 'pyth'})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'type': 'course', 'id': self.advanced.id,
+                                      'label': 'Python Advanced'})
+        self.assertEqual(
+            {(result['type'], result['label']) for result in results},
+            {('course', 'Python Advanced'), ('course', 'Python Basics'),
+             ('subcategory', 'Python Development'), ('instructor', 'Pythonista Guido')}
+        )
+
+    def test_index_follows_model_signals(self):
+        """Test writes after the index is built are reflected"""
+        self.client.get(self.url, {'q': 'p'})
+
+        self.basics.title = 'Rust Basics'
+        self.basics.save()
+        Enrollment.objects.create(student=self.instructor, course=self.basics)
+        Enrollment.objects.create(student=User.objects.create_user(
+            email='other@example.com', password='Testpass123@'), course=self.basics)
+        Category.objects.create(name='Robotics')
+
+        response = self.client.get(self.url, {'q': 'r'})
+        self.assertEqual(
+            [result['label'] for result in response.json()['results']],
+            ['Rust Basics', 'Robotics']
+        )
+
+        self.advanced.delete()
+        response = self.client.get(self.url, {'q': 'python a'})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_invalid_parameters(self):
+        """Test bad limit and types are rejected"""
+        self.assertEqual(self.client.get(self.url, {'q': 'p', 'limit': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'p', 'types': 'video'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': ''}).json()['results'], [])
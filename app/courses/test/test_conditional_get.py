@@ -0,0 +1,107 @@
+"""
+Test conditional GET on course, category and review reads
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import Category, SubCategory, Course, CourseReview, Enrollment, User
+
+
+class ConditionalGetTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Development')
+        self.subcategory = SubCategory.objects.create(category=self.category, name='Web')
+        self.instructor = User.objects.create_user(
+            email='instructor@example.com', password='Testpass123@', role='instructor'
+        )
+        self.student = User.objects.create_user(email='student@example.com', password='Testpass123@')
+        self.course = Course.objects.create(
+            title='Django', description='Web apps', category=self.category, price=10
+        )
+        self.course.instructor.add(self.instructor)
+        self.course.subcategory.add(self.subcategory)
+
+    def revalidate(self, url):
+        """Status of a request repeating the validators of a first GET"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        headers = {'HTTP_IF_NONE_MATCH': response['ETag']}
+        return lambda: self.client.get(url, **headers).status_code
+
+    def test_course_detail(self):
+        """Test detail 304s until the course or its rating changes"""
+        url = reverse('course:course-detail', args=[self.course.id])
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        status_code = self.revalidate(url)
+        # the validator query, the catalog version is read once per TTL
+        with self.assertNumQueries(1):
+            self.assertEqual(status_code(), status.HTTP_304_NOT_MODIFIED)
+
+        Enrollment.objects.create(student=self.student, course=self.course)
+        CourseReview.objects.create(student=self.student, course=self.course, rating=4)
+        self.assertEqual(status_code(), status.HTTP_200_OK)
+
+    def test_course_detail_moves_with_m2m_edits(self):
+        """Test instructor and subcategory edits move the detail's Last-Modified"""
+        url = reverse('course:course-detail', args=[self.course.id])
+        Course.objects.filter(pk=self.course.pk).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+        last_modified = self.client.get(url)['Last-Modified']
+        status_code = self.revalidate(url)
+
+        self.subcategory.courses.clear()
+        self.assertEqual(status_code(), status.HTTP_200_OK)
+        self.assertNotEqual(self.client.get(url)['Last-Modified'], last_modified)
+        self.assertEqual(self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code, status.HTTP_200_OK)
+
+    def test_course_list(self):
+        """Test the list 304s until an instructor changes"""
+        status_code = self.revalidate(reverse('course:course-list'))
+        # MAX(updated_at) and COUNT of the listed courses in one query
+        with self.assertNumQueries(1):
+            self.assertEqual(status_code(), status.HTTP_304_NOT_MODIFIED)
+        self.course.instructor.remove(self.instructor)
+        self.assertEqual(status_code(), status.HTTP_200_OK)
+
+    def test_course_list_validated_from_the_database(self):
+        """Test a course change moves the list ETag without a catalog version bump"""
+        status_code = self.revalidate(reverse('course:course-list'))
+        # a write another worker's cache never saw
+        Course.objects.filter(pk=self.course.pk).update(title='Django 5', updated_at=timezone.now())
+        self.assertEqual(status_code(), status.HTTP_200_OK)
+
+    def test_category_list(self):
+        """Test categories 304 until a subcategory is added"""
+        status_code = self.revalidate(reverse('course:category-list'))
+        self.assertEqual(status_code(), status.HTTP_304_NOT_MODIFIED)
+        SubCategory.objects.create(category=self.category, name='Mobile')
+        self.assertEqual(status_code(), status.HTTP_200_OK)
+
+    def test_review_list(self):
+        """Test reviews 304 until one is deleted"""
+        Enrollment.objects.create(student=self.student, course=self.course)
+        review = CourseReview.objects.create(student=self.student, course=self.course, rating=4)
+        url = reverse('course:course-review-create', kwargs={'course_id': self.course.id})
+        status_code = self.revalidate(url)
+        self.assertEqual(status_code(), status.HTTP_304_NOT_MODIFIED)
+        review.delete()
+        self.assertEqual(status_code(), status.HTTP_200_OK)
+
+    def test_query_string_is_part_of_the_etag(self):
+        url = reverse('course:course-list')
+        self.assertNotEqual(self.client.get(url)['ETag'], self.client.get(url, {'page_size': 1})['ETag'])
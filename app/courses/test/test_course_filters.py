@@ -0,0 +1,125 @@
+"""
+Test structured Course search filters
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import (Category, SubCategory, Course, Section,
+                         Lecture, User)
+from courses import cache as search_cache
+from courses.filters import filter_courses
+
+
+class CourseFilterAPITest(APITestCase):
+    """Test the search endpoint filter parameters"""
+
+    def setUp(self):
+        search_cache.reset()
+        self.url = reverse('course:course-search')
+        self.programming = Category.objects.create(name='Programming')
+        self.design = Category.objects.create(name='Design')
+        self.web = SubCategory.objects.create(category=self.programming, name='Web Development')
+        self.backend = SubCategory.objects.create(category=self.programming, name='Backend')
+        self.instructor = User.objects.create_user(
+            email='john@example.com', password='Testpass123@', role='instructor'
+        )
+
+        self.django = Course.objects.create(
+            title='Django', description='Web apps', category=self.programming,
+            language='English', level='Beginner', price=Decimal('49.99')
+        )
+        self.django.subcategory.add(self.web, self.backend)
+        self.django.instructor.add(self.instructor)
+        section = Section.objects.create(title='Intro', course=self.django, order=1)
+        Lecture.objects.create(title='Setup', section=section, content_type='article',
+                               article='Install Django', duration=45 * 60, order=1)
+
+        self.flask = Course.objects.create(
+            title='Flask', description='Micro framework', category=self.programming,
+            language='Spanish', level='Intermediate', price=Decimal('0.00')
+        )
+        self.flask.subcategory.add(self.web)
+
+        self.figma = Course.objects.create(
+            title='Figma', description='Design tools', category=self.design,
+            language='English', level='Beginner', price=Decimal('120.00')
+        )
+
+    def titles(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(course['title'] for course in response.json()['results'])
+
+    def test_ids_and_names(self):
+        """Test ids and exact names select the same courses, without duplicates"""
+        self.assertEqual(self.titles(category='Programming'), ['Django', 'Flask'])
+        self.assertEqual(self.titles(category=f'{self.design.id},Programming'),
+                         ['Django', 'Figma', 'Flask'])
+        self.assertEqual(self.titles(category='Program'), [])
+        self.assertEqual(self.titles(subcategory=f'{self.web.id},Backend'), ['Django', 'Flask'])
+        self.assertEqual(self.titles(instructor='john@example.com'), ['Django'])
+        self.assertEqual(self.titles(instructor=str(self.instructor.id)), ['Django'])
+
+    def test_column_filters(self):
+        """Test level, language, price, free and duration filters"""
+        self.assertEqual(self.titles(level='Beginner,Intermediate'), ['Django', 'Figma', 'Flask'])
+        self.assertEqual(self.titles(language='Spanish'), ['Flask'])
+        self.assertEqual(self.titles(free='true'), ['Flask'])
+        self.assertEqual(self.titles(free='false', price_max='100'), ['Django'])
+        self.assertEqual(self.titles(price_min='40', price_max='120'), ['Django', 'Figma'])
+        self.assertEqual(self.titles(min_duration='30'), ['Django'])
+        self.assertEqual(self.titles(max_duration='30'), ['Figma', 'Flask'])
+        self.assertEqual(self.titles(category='Programming', level='Beginner',
+                                     subcategory='Web Development'), ['Django'])
+
+    def test_invalid_values(self):
+        """Test malformed filter values are rejected"""
+        for params in ({'price_min': 'cheap'}, {'price_max': '-1'}, {'free': 'maybe'},
+                       {'min_duration': '1.5'}, {'min_rating': 'high'},
+                       {'price_min': '50', 'price_max': '10'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class CourseFilterQueryPlanTest(TestCase):
+    """Test every filter is answered from an index"""
+
+    FILTERS = {
+        'category': 'Programming,2',
+        'subcategory': 'Web Development,3',
+        'instructor': 'john@example.com,4',
+        'level': 'Beginner',
+        'language': 'English',
+        'free': 'true',
+        'price_min': '10',
+        'price_max': '100',
+        'min_duration': '60',
+        'max_duration': '600',
+        'min_rating': '4',
+    }
+
+    def query_plan(self, params):
+        query = QueryDict(mutable=True)
+        query.update(params)
+        queryset = filter_courses(Course.objects.order_by(), query).values('id')
+        sql, sql_params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', sql_params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_no_full_table_scans(self):
+        """Test no filter, alone or combined, scans a whole table"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN is SQLite syntax')
+
+        cases = [{name: value} for name, value in self.FILTERS.items()]
+        cases.append({'category': 'Programming', 'level': 'Beginner', 'price_max': '50'})
+        for params in cases:
+            plan = self.query_plan(params)
+            scans = [step for step in plan if step.startswith('SCAN ')]
+            self.assertEqual(scans, [], f'{params}: {plan}')
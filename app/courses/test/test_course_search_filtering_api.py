@@ -0,0 +1,682 @@
+"""
+Test Search & Filtering API Endpoints
+"""
+import base64
+import json
+import time
+from io import StringIO
+from unittest import mock
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from decimal import Decimal
+from django.conf import settings
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.models import (Category, SubCategory,
+                         CourseReview, Course, CatalogVersion, CourseSearchDocument,
+                         User, Enrollment)
+from core import search
+from courses import cache as search_cache
+
+class CourseSearchFilteringAPITest(APITestCase):
+    """Test Course Search and Filtering API endpoints"""
+
+    def setUp(self):
+        """Set up test data for search and filtering"""
+        search_cache.reset()
+        self.programming_category = Category.objects.create(
+            name="Programming",
+            description="Programming courses"
+        )
+        self.design_category = Category.objects.create(
+            name="Design",
+            description="Design courses"
+        )
+
+        self.web_dev_subcategory = SubCategory.objects.create(
+            category=self.programming_category,
+            name="Web Development",
+            description="Web development courses"
+        )
+        self.mobile_dev_subcategory = SubCategory.objects.create(
+            category=self.programming_category,
+            name="Mobile Development",
+            description="Mobile app development"
+        )
+        self.ui_design_subcategory = SubCategory.objects.create(
+            category=self.design_category,
+            name="UI Design",
+            description="User interface design"
+        )
+
+        self.instructor1 = User.objects.create_user(
+            name="John Doe",
+            email="john@example.com",
+            password='Testpass123@',
+            role="instructor"
+        )
+        self.instructor2 = User.objects.create_user(
+            name="Jane Smith",
+            email="jane@example.com",
+            password='Testpass123@',
+            role="instructor"
+        )
+
+        self.django_course = Course.objects.create(
+            title="Complete Django Web Development",
+            description="Learn Django framework from scratch to build amazing web applications",
+            category=self.programming_category,
+            language="English",
+            level="Beginner",
+            price=Decimal('49.99')
+        )
+        self.django_course.instructor.add(self.instructor1)
+        self.django_course.subcategory.add(self.web_dev_subcategory)
+
+        self.react_course = Course.objects.create(
+            title="React Native Mobile App Development",
+            description="Build cross-platform mobile apps with React Native and JavaScript",
+            category=self.programming_category,
+            language="English",
+            level="Intermediate",
+            price=Decimal('79.99')
+        )
+        self.react_course.instructor.add(self.instructor2)
+        self.react_course.subcategory.add(self.mobile_dev_subcategory)
+
+        self.python_course = Course.objects.create(
+            title="Python Programming Fundamentals",
+            description="Master Python programming language with hands-on projects",
+            category=self.programming_category,
+            language="English",
+            level="Beginner",
+            price=Decimal('29.99')
+        )
+        self.python_course.instructor.add(self.instructor1)
+        self.python_course.subcategory.add(self.web_dev_subcategory)
+
+        self.design_course = Course.objects.create(
+            title="Modern UI Design Principles",
+            description="Learn modern user interface design with Figma and Adobe XD",
+            category=self.design_category,
+            language="English",
+            level="All-Level",
+            price=Decimal('39.99')
+        )
+        self.design_course.instructor.add(self.instructor2)
+        self.design_course.subcategory.add(self.ui_design_subcategory)
+
+        student = User.objects.create_user(
+            name="Test Student",
+            email="student@example.com",
+            password='Testpass123@',
+            role="student"
+        )
+        Enrollment.objects.create(
+            student=student,
+            course=self.django_course
+        )
+
+        CourseReview.objects.create(
+            student=student,
+            course=self.django_course,
+            rating=5,
+            review_text="Excellent course!"
+        )
+
+        Enrollment.objects.create(
+            student=student,
+            course=self.python_course
+        )
+
+        CourseReview.objects.create(
+            student=student,
+            course=self.python_course,
+            rating=3,
+            review_text="Good course"
+        )
+
+    def test_search_by_course_title(self):
+        """Test searching courses by title"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'q': 'Django'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Complete Django Web Development')
+
+        # Search for "Python" in title
+        response = self.client.get(url, {'q': 'Python'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Python Programming Fundamentals')
+
+        # Case-insensitive search
+        response = self.client.get(url, {'q': 'REACT'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'React Native Mobile App Development')
+
+    def test_search_by_course_description(self):
+        """Test searching courses by description"""
+        url = reverse('course:course-search')
+
+        # Search for "framework" in description
+        response = self.client.get(url, {'q': 'framework'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Complete Django Web Development')
+
+        # Search for "mobile" in description
+        response = self.client.get(url, {'q': 'mobile'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'React Native Mobile App Development')
+
+    def test_search_no_results(self):
+        """Test search with no matching results"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'q': 'nonexistent'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 0)
+
+    def test_search_empty_query(self):
+        """Test search with empty query returns all courses"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'q': ''})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 4)
+
+    def test_filter_by_category(self):
+        """Test filtering courses by category name"""
+        url = reverse('course:course-search')
+
+        # Filter by "Programming" category
+        response = self.client.get(url, {'category': 'Programming'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)  # Django, React, Python courses
+
+        # Filter by "Design" category
+        response = self.client.get(url, {'category': 'Design'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)  # Design course only
+        self.assertEqual(results[0]['title'], 'Modern UI Design Principles')
+
+    def test_filter_by_nonexistent_category(self):
+        """Test filtering by non-existent category"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'category': 'NonExistent'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 0)
+
+    def test_filter_by_subcategory(self):
+        """Test filtering courses by subcategory name"""
+        url = reverse('course:course-search')
+
+        # Filter by "Web Development" subcategory
+        response = self.client.get(url, {'subcategory': 'Web Development'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)  # Django and Python courses
+
+        # Filter by "Mobile Development" subcategory
+        response = self.client.get(url, {'subcategory': 'Mobile Development'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)  # React Native course
+        self.assertEqual(results[0]['title'], 'React Native Mobile App Development')
+
+    def test_filter_by_level(self):
+        """Test filtering courses by level"""
+        url = reverse('course:course-search')
+
+        # Filter by "Beginner" level
+        response = self.client.get(url, {'level': 'Beginner'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)  # Django and Python courses
+
+        # Filter by "Intermediate" level
+        response = self.client.get(url, {'level': 'Intermediate'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)  # React course
+        self.assertEqual(results[0]['title'], 'React Native Mobile App Development')
+
+    def test_filter_by_minimum_rating(self):
+        """Test filtering courses by minimum rating"""
+        url = reverse('course:course-search')
+
+        # Filter courses with rating >= 4
+        response = self.client.get(url, {'min_rating': 4})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Complete Django Web Development')
+
+        # Filter courses with rating >= 3
+        response = self.client.get(url, {'min_rating': 3})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)  # Django (5 stars) and Python (3 stars)
+
+    def test_combined_text_search_and_category_filter(self):
+        """Test combining text search with category filter"""
+        url = reverse('course:course-search')
+
+        # Search "Development" + Programming category
+        response = self.client.get(url, {
+            'q': 'Development',
+            'category': 'Programming'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        # Django and React by title, Python through its "Web Development" subcategory
+        self.assertEqual(len(results), 3)
+
+        # Search "Design" + Design category
+        response = self.client.get(url, {
+            'q': 'Design',
+            'category': 'Design'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)  # Design course
+
+    def test_combined_multiple_filters(self):
+        """Test combining multiple filters"""
+        url = reverse('course:course-search')
+
+        # Programming + Beginner + Web Development
+        response = self.client.get(url, {
+            'category': 'Programming',
+            'level': 'Beginner',
+            'subcategory': 'Web Development'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)  # Django and Python courses
+
+    def test_sort_by_rating(self):
+        """Test sorting courses by rating (highest first)"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'sort': 'rating'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        # First course should have highest rating (Django with 5 stars)
+        self.assertEqual(results[0]['title'], 'Complete Django Web Development')
+
+    def test_sort_by_popular(self):
+        """Test many good reviews and enrollments beat a single 5-star review"""
+        for index, rating in enumerate([5, 5, 5, 4, 5, 4, 5, 5, 5, 4]):
+            student = User.objects.create_user(
+                email=f'fan{index}@example.com', password='Testpass123@'
+            )
+            Enrollment.objects.create(student=student, course=self.react_course)
+            CourseReview.objects.create(student=student, course=self.react_course, rating=rating)
+
+        out = StringIO()
+        call_command('recompute_popularity', '--batch-size', '3', stdout=out)
+        self.assertIn('Scored 4 courses', out.getvalue())
+
+        url = reverse('course:course-search')
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'sort': 'popular'})
+        self.assertEqual(response.status_code, 200)
+
+        titles = [course['title'] for course in response.json()['results']]
+        self.assertEqual(titles[:2], [
+            'React Native Mobile App Development',
+            'Complete Django Web Development',
+        ])
+        self.assertEqual(titles[-1], 'Modern UI Design Principles')
+
+    def test_sort_by_newest(self):
+        """Test sorting courses by creation date (newest first)"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'sort': 'newest'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 4)
+        # Should be ordered by created_at desc (newest first)
+
+    def test_sort_by_price_low_to_high(self):
+        """Test sorting courses by price (low to high)"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'sort': 'price'})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        # First course should have lowest price (Python: 29.99)
+        self.assertEqual(results[0]['title'], 'Python Programming Fundamentals')
+
+    def test_search_pagination(self):
+        """Test search results are paginated"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'page': 1})
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertIn('count', data)
+        self.assertIn('next', data)
+        self.assertIn('previous', data)
+        self.assertIn('results', data)
+
+    def test_search_query_count_is_constant(self):
+        """Test a page of courses does not run one rating query per course"""
+        url = reverse('course:course-search')
+
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'sort': 'rating'})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(
+            results[0]['average_rating'],
+            {'average_rating': 5.0, 'review_count': 1}
+        )
+
+    def test_search_by_subcategory_and_instructor_name(self):
+        """Test full-text search covers subcategory and instructor names"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'q': 'mobile development'})
+        titles = [course['title'] for course in response.json()['results']]
+        self.assertEqual(titles, ['React Native Mobile App Development'])
+
+        response = self.client.get(url, {'q': 'jane'})
+        titles = {course['title'] for course in response.json()['results']}
+        self.assertEqual(
+            titles,
+            {'React Native Mobile App Development', 'Modern UI Design Principles'}
+        )
+
+    def test_search_matches_word_prefixes(self):
+        """Test partial words match as prefixes"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'q': 'prog fundament'})
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Python Programming Fundamentals')
+
+    def test_search_ranks_title_matches_first(self):
+        """Test results for q are ordered by relevance"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'q': 'design'})
+        results = response.json()['results']
+        self.assertEqual(results[0]['title'], 'Modern UI Design Principles')
+
+    def test_search_index_follows_course_changes(self):
+        """Test renaming a course, subcategory or instructor updates the index"""
+        url = reverse('course:course-search')
+
+        self.django_course.title = 'Complete Flask Web Development'
+        self.django_course.save()
+        response = self.client.get(url, {'q': 'flask'})
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.ui_design_subcategory.name = 'Interaction Design'
+        self.ui_design_subcategory.save()
+        response = self.client.get(url, {'q': 'interaction'})
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.design_course.instructor.remove(self.instructor2)
+        self.design_course.instructor.add(self.instructor1)
+        response = self.client.get(url, {'q': 'john'})
+        self.assertEqual(len(response.json()['results']), 3)
+
+        self.react_course.delete()
+        response = self.client.get(url, {'q': 'react'})
+        self.assertEqual(len(response.json()['results']), 0)
+
+    def test_rebuild_search_index_command(self):
+        """Test the management command reindexes every course"""
+        out = StringIO()
+        call_command('rebuild_search_index', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Indexed 4 courses', out.getvalue())
+        response = self.client.get(reverse('course:course-search'), {'q': 'python'})
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_failed_rebuild_keeps_the_index(self):
+        """Test a rebuild failing partway leaves every course searchable"""
+        document_select = search._document_select
+        calls = []
+
+        def fail_on_second_batch(where):
+            calls.append(where)
+            if len(calls) == 2:
+                raise RuntimeError('disk full')
+            return document_select(where)
+
+        with mock.patch.object(search, '_document_select', fail_on_second_batch), \
+                self.assertRaises(RuntimeError):
+            search.rebuild(batch_size=2)
+        response = self.client.get(reverse('course:course-search'), {'q': 'python'})
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(CourseSearchDocument.objects.count(), Course.objects.count())
+
+    def _walk_cursor_pages(self, response):
+        """Follow next links, return every page's titles"""
+        pages = []
+        while True:
+            data = response.json()
+            pages.append([course['title'] for course in data['results']])
+            if not data['next']:
+                return pages, data
+            response = self.client.get(data['next'])
+
+    def test_cursor_pagination_walks_sorted_results(self):
+        """Test cursor mode returns every course once in sort order"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'pagination': 'cursor', 'sort': 'price', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.json())
+        self.assertIsNone(response.json()['previous'])
+
+        pages, last = self._walk_cursor_pages(response)
+        self.assertEqual(pages, [
+            ['Python Programming Fundamentals'],
+            ['Modern UI Design Principles'],
+            ['Complete Django Web Development'],
+            ['React Native Mobile App Development'],
+        ])
+
+        response = self.client.get(last['previous'])
+        self.assertEqual(
+            [course['title'] for course in response.json()['results']],
+            ['Complete Django Web Development']
+        )
+
+    def test_cursor_pagination_for_rating_and_newest(self):
+        """Test cursor mode on the other sort keys"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'pagination': 'cursor', 'sort': 'rating', 'page_size': 3})
+        pages, _ = self._walk_cursor_pages(response)
+        self.assertEqual([len(page) for page in pages], [3, 1])
+        self.assertEqual(pages[0][:2], ['Complete Django Web Development',
+                                        'Python Programming Fundamentals'])
+
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        pages, _ = self._walk_cursor_pages(response)
+        self.assertEqual(pages, [
+            ['Modern UI Design Principles', 'Python Programming Fundamentals'],
+            ['React Native Mobile App Development', 'Complete Django Web Development'],
+        ])
+
+    def test_cursor_pagination_count_is_opt_in(self):
+        """Test the total count is only computed when asked for"""
+        url = reverse('course:course-search')
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertNotIn('count', response.json())
+
+        response = self.client.get(url, {'pagination': 'cursor', 'count': 'true'})
+        self.assertEqual(response.json()['count'], 4)
+
+    def test_invalid_cursor_returns_404(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get(reverse('course:course-search'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_values_of_the_wrong_type_return_404(self):
+        """Test cursor values that do not fit their sort key are rejected"""
+        for values in (['abc', 'x'], [None, 1], [[1], {'a': 1}]):
+            payload = json.dumps({'d': 'n', 'v': values}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            for url in (reverse('course:course-list'), reverse('course:course-search')):
+                response = self.client.get(url, {'cursor': cursor, 'sort': 'price'})
+                self.assertEqual(response.status_code, 404, (url, values))
+
+    def test_search_facet_counts(self):
+        """Test facet counts describe the filtered result set"""
+        url = reverse('course:course-search')
+
+        response = self.client.get(url, {'category': 'Programming', 'facets': 'all'})
+        self.assertEqual(response.status_code, 200)
+        facets = response.json()['facets']
+
+        self.assertEqual(facets['category'], [
+            {'id': self.programming_category.id, 'name': 'Programming', 'count': 3}
+        ])
+        self.assertEqual(
+            {row['name']: row['count'] for row in facets['subcategory']},
+            {'Web Development': 2, 'Mobile Development': 1}
+        )
+        self.assertEqual(
+            {row['value']: row['count'] for row in facets['level']},
+            {'Beginner': 2, 'Intermediate': 1}
+        )
+        self.assertEqual(facets['language'], [{'value': 'English', 'count': 3}])
+        self.assertEqual(
+            {row['bucket']: row['count'] for row in facets['price']},
+            {'free': 0, '0-20': 0, '20-50': 2, '50-100': 1, '100+': 0}
+        )
+
+    def test_search_facets_use_fixed_query_count_and_cache(self):
+        """Test facets cost one grouped query each and are cached per filter signature"""
+        url = reverse('course:course-search')
+
+        with self.assertNumQueries(4 + 2):
+            self.client.get(url, {'q': 'development', 'facets': 'category,level'})
+
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'q': ' Development ', 'facets': 'category,level',
+                                              'sort': 'price'})
+        self.assertEqual(
+            {row['value']: row['count'] for row in response.json()['facets']['level']},
+            {'Beginner': 2, 'Intermediate': 1}
+        )
+
+    def test_search_unknown_facet_rejected(self):
+        """Test an unknown facet name is a validation error"""
+        response = self.client.get(reverse('course:course-search'), {'facets': 'color'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_results_are_cached(self):
+        """Test repeated searches are served from cache and counted"""
+        url = reverse('course:course-search')
+
+        self.client.get(url, {'q': 'python', 'level': 'Beginner'})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'level': 'Beginner', 'q': '  Python'})
+
+        self.assertEqual(len(response.json()['results']), 1)
+        admin = User.objects.create_superuser(email='admin@example.com', password='Testpass123@')
+        token = Token.objects.create(user=admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        stats = self.client.get(reverse('course:search-cache-stats')).json()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_search_cache_invalidated_by_catalog_writes(self):
+        """Test course, review and instructor changes bump the catalog version"""
+        url = reverse('course:course-search')
+        self.client.get(url, {'sort': 'price'})
+        self.client.get(url, {'min_rating': 4})
+
+        self.python_course.price = Decimal('99.99')
+        self.python_course.save()
+        response = self.client.get(url, {'sort': 'price'})
+        self.assertEqual(response.json()['results'][0]['title'], 'Modern UI Design Principles')
+
+        CourseReview.objects.filter(course=self.django_course).get().delete()
+        response = self.client.get(url, {'min_rating': 4})
+        self.assertEqual(len(response.json()['results']), 0)
+
+        self.design_course.instructor.add(self.instructor1)
+        response = self.client.get(url, {'sort': 'price'})
+        self.assertEqual(
+            set(response.json()['results'][0]['instructor']),
+            {'john@example.com', 'jane@example.com'}
+        )
+
+    def test_catalog_version_shared_between_workers(self):
+        """Test a write in another worker reaches cached results within the version TTL"""
+        url = reverse('course:course-search')
+        self.client.get(url, {'sort': 'price'})
+        version = search_cache.get_catalog_version()
+
+        # another worker's write moves the row, not this process's copy of it
+        Course.objects.filter(pk=self.python_course.pk).update(price=Decimal('99.99'))
+        CatalogVersion.bump()
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'sort': 'price'})
+        self.assertEqual(response.json()['results'][0]['title'], 'Python Programming Fundamentals')
+
+        later = time.monotonic() + settings.COURSE_SEARCH_VERSION_TTL + 1
+        with mock.patch.object(search_cache.time, 'monotonic', return_value=later):
+            self.assertGreater(search_cache.get_catalog_version(), version)
+            response = self.client.get(url, {'sort': 'price'})
+        self.assertEqual(response.json()['results'][0]['title'], 'Modern UI Design Principles')
+
+    def test_search_cache_stats_staff_only(self):
+        """Test cache counters are not public"""
+        response = self.client.get(reverse('course:search-cache-stats'))
+        self.assertEqual(response.status_code, 401)
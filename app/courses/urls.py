@@ -31,6 +31,10 @@ urlpatterns = [
          course_content_views.CurriculumViews.as_view(),
          name='curriculum-detail'
     ),
+    path('curriculum/<int:course_id>/import',
+         course_content_views.CurriculumImportView.as_view(),
+         name='curriculum-import'
+    ),
     path('<int:course_id>/sections-create/',
          course_content_views.SectionCreateView.as_view(),
          name='section-create'
@@ -39,6 +43,14 @@ urlpatterns = [
          course_content_views.SectionDetailView.as_view(),
          name='section-detail'
     ),
+    path('<int:course_id>/sections/reorder',
+         course_content_views.SectionReorderView.as_view(),
+         name='section-reorder'
+    ),
+    path('section/<int:section_id>/lectures/reorder',
+         course_content_views.LectureReorderView.as_view(),
+         name='lecture-reorder'
+    ),
     path('<int:section_id>/create-lecture',
          course_content_views.LectureCreateView.as_view(),
          name='lecture-create'
@@ -47,6 +59,26 @@ urlpatterns = [
          course_content_views.LectureDetailView.as_view(),
          name='lecture-detail'
     ),
+    path('lectures/<int:lecture_id>/content',
+         course_content_views.LectureContentView.as_view(),
+         name='lecture-content'
+    ),
+    path('lectures/<int:lecture_id>/media',
+         course_content_views.LectureMediaView.as_view(),
+         name='lecture-media'
+    ),
+    path('lectures/<int:lecture_id>/uploads',
+         course_content_views.UploadSessionCreateView.as_view(),
+         name='upload-create'
+    ),
+    path('uploads/<uuid:upload_id>',
+         course_content_views.UploadSessionView.as_view(),
+         name='upload-detail'
+    ),
+    path('uploads/<uuid:upload_id>/finalize',
+         course_content_views.UploadFinalizeView.as_view(),
+         name='upload-finalize'
+    ),
 
     path('course/<int:course_id>/enroll',
              enrollment_views.EnrollmentCreateView.as_view(),
@@ -72,10 +104,22 @@ urlpatterns = [
              progresstracker_views.MarkLectureIncompleteView.as_view(),
              name='mark-lecture-incomplete'
     ),
+    path('lectures/<int:lecture_id>/heartbeat',
+             progresstracker_views.LectureHeartbeatView.as_view(),
+             name='lecture-heartbeat'
+    ),
+    path('courses/<int:course_id>/mark-lectures-complete',
+             progresstracker_views.BulkMarkLecturesCompleteView.as_view(),
+             name='bulk-mark-lectures-complete'
+    ),
     path('courses/<int:course_id>/course-progress',
              progresstracker_views.CourseProgressView.as_view(),
              name='course-progress'
     ),
+    path('courses/<int:course_id>/progress-analytics',
+             progresstracker_views.CourseProgressAnalyticsView.as_view(),
+             name='course-progress-analytics'
+    ),
     path('my-progress',
              progresstracker_views.CourseProgressViewAll.as_view(),
              name='my-progress'
@@ -97,6 +141,8 @@ urlpatterns = [
 
     # Searching
     path('courses/search/', views.CourseSearchView.as_view(), name='course-search'),
+    path('courses/search/cache-stats/', views.SearchCacheStatsView.as_view(), name='search-cache-stats'),
+    path('courses/autocomplete/', views.AutocompleteView.as_view(), name='course-autocomplete'),
     # Cart URLS
     path('cart/<int:course_id>', cart_views.CartViews.as_view(), name='cart-add'),
     path('cart-items', cart_views.MyCartViews.as_view(), name='my-cart'),
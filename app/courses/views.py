@@ -4,17 +4,29 @@ Course API Views
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.authentication import TokenAuthentication
 from rest_framework import (mixins, viewsets)
+from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
 
 from courses import serializers, permission
+from courses import autocomplete
+from courses import cache as search_cache
+from courses.facets import get_facets, parse_facets
+from courses.filters import FILTER_PARAMS, filter_courses
+from courses.pagination import CourseKeysetPagination
+from core import search
+from core.conditional import ConditionalListMixin, ConditionalRetrieveMixin
 from core.models import Course, Category
 from category import serializers as category_serializer
 
-from django.db.models import Q, Avg
+from django.db.models import Q
 from rest_framework import generics
 from rest_framework.response import Response
 
 
-class CourseViewSet(mixins.ListModelMixin,
+class CourseViewSet(ConditionalListMixin,
+                    ConditionalRetrieveMixin,
+                    mixins.ListModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.CreateModelMixin,
                     mixins.UpdateModelMixin,
@@ -24,16 +36,39 @@ class CourseViewSet(mixins.ListModelMixin,
     authentication_classes = [TokenAuthentication]
     permission_classes = [permission.IsInstructorForCreateOrOwnerForEdit]
 
-    queryset = Course.objects.prefetch_related('instructor').order_by('-id')
+    queryset = Course.objects.prefetch_related('instructor').order_by('-created_at', '-id')
     serializer_class = serializers.CourseSerializer
+    pagination_class = CourseKeysetPagination
+
+    def get_validator_extras(self):
+        """
+        Category and instructor writes shown in the payload bump the catalog
+        version, course rows and their M2M edits move MAX(updated_at)
+        """
+        return [search_cache.get_catalog_version()]
 
 @extend_schema(
     parameters=[
-        OpenApiParameter(name='q', description='Search in title & description', required=False, type=str),
-        OpenApiParameter(name='category', description='Filter by category name', required=False, type=str),
-        OpenApiParameter(name='subcategory', description='Filter by subcategory name', required=False, type=str),
-        # ...
-
+        OpenApiParameter(name='q', description='Full-text search in title, description, objectives, '
+                                               'category, subcategory and instructor names', required=False, type=str),
+        OpenApiParameter(name='category', description='Comma separated category ids or names', required=False, type=str),
+        OpenApiParameter(name='subcategory', description='Comma separated subcategory ids or names', required=False, type=str),
+        OpenApiParameter(name='instructor', description='Comma separated instructor ids or emails', required=False, type=str),
+        OpenApiParameter(name='level', description='Comma separated course levels', required=False, type=str),
+        OpenApiParameter(name='language', description='Comma separated languages', required=False, type=str),
+        OpenApiParameter(name='free', description='Only free (true) or only paid (false) courses', required=False, type=bool),
+        OpenApiParameter(name='price_min', description='Minimum price', required=False, type=float),
+        OpenApiParameter(name='price_max', description='Maximum price', required=False, type=float),
+        OpenApiParameter(name='min_duration', description='Minimum total duration in minutes', required=False, type=int),
+        OpenApiParameter(name='max_duration', description='Maximum total duration in minutes', required=False, type=int),
+        OpenApiParameter(name='min_rating', description='Minimum average rating', required=False, type=float),
+        OpenApiParameter(name='sort', description='relevance, rating, popular, newest or price', required=False, type=str),
+        OpenApiParameter(name='facets', description='Comma separated facet counts to include: '
+                                                    'category, subcategory, level, language, price or all',
+                         required=False, type=str),
+        OpenApiParameter(name='pagination', description='Set to "cursor" for keyset pagination', required=False, type=str),
+        OpenApiParameter(name='cursor', description='Opaque cursor from a previous next/previous link', required=False, type=str),
+        OpenApiParameter(name='count', description='Include the total count in cursor mode', required=False, type=bool),
     ]
 )
 
@@ -42,104 +77,153 @@ class CourseSearchView(generics.ListAPIView):
     API endpoint for searching and filtering courses
 
     Query Parameters:
-    - q: Text search in title and description
-    - category: Filter by category name
-    - subcategory: Filter by subcategory name
-    - level: Filter by course level
-    - min_rating: Filter by minimum average rating
-    - sort: Sort results (rating, newest, price)
+    - q: Full-text search in title, description, objectives,
+      category, subcategory and instructor names
+    - category, subcategory, instructor, level, language, free,
+      price_min, price_max, min_duration, max_duration, min_rating:
+      structured filters, see courses/filters.py
+    - sort: Sort results (relevance, rating, popular, newest, price),
+      defaults to relevance when q is given and newest otherwise
+    - pagination=cursor / cursor / count: keyset pagination, see CourseKeysetPagination
+    - facets: Add per-value counts for the filtered results
     """
     serializer_class = serializers.CourseSerializer
+    pagination_class = CourseKeysetPagination
+    filter_params = ('q',) + FILTER_PARAMS
     # pagination_class = None
 
     def get_queryset(self):
         """Build filtered queryset based on query parameters"""
         queryset = Course.objects.select_related('category').prefetch_related(
-            'subcategory', 'instructor', 'reviews'
+            'subcategory', 'instructor'
         )
 
         # Get query parameters
         query = self.request.query_params.get('q', '').strip()
-        category = self.request.query_params.get('category', '').strip()
-        subcategory = self.request.query_params.get('subcategory', '').strip()
-        level = self.request.query_params.get('level', '').strip()
-        min_rating = self.request.query_params.get('min_rating')
-        sort_by = self.request.query_params.get('sort', 'newest')
+        sort_by = self.request.query_params.get('sort', 'relevance' if query else 'newest')
 
+        self.ranked = False
         if query:
             queryset = self._apply_text_search(queryset, query)
 
-        if category:
-            queryset = self._apply_category_filter(queryset, category)
-
-        if subcategory:
-            queryset = self._apply_subcategory_filter(queryset, subcategory)
-
-        if level:
-            queryset = self._apply_level_filter(queryset, level)
-
-        if min_rating:
-            queryset = self._apply_rating_filter(queryset, min_rating)
+        queryset = filter_courses(queryset, self.request.query_params)
 
         queryset = self._apply_sorting(queryset, sort_by)
 
         return queryset
 
     def _apply_text_search(self, queryset, query):
-        """Apply text search in title and description"""
+        """
+        Apply full-text search through the FTS5 index,
+        falling back to icontains where the index is not available
+        """
+        match = search.build_match_query(query)
+        if match and search.is_available():
+            self.ranked = True
+            return queryset.filter(search_document__document__match=match)
+
         return queryset.filter(
             Q(title__icontains=query) | Q(description__icontains=query)
         )
 
-    def _apply_category_filter(self, queryset, category_name):
-        """Filter by category name"""
-        return queryset.filter(category__name__icontains=category_name)
-
-    def _apply_subcategory_filter(self, queryset, subcategory_name):
-        """Filter by subcategory name"""
-        return queryset.filter(subcategory__name__icontains=subcategory_name)
-
-    def _apply_level_filter(self, queryset, level):
-        """Filter by course level"""
-        return queryset.filter(level=level)
-
-    def _apply_rating_filter(self, queryset, min_rating):
-        """Filter by minimum average rating"""
-        try:
-            min_rating_value = float(min_rating)
-            return queryset.annotate(
-                avg_rating=Avg('reviews__rating')
-            ).filter(avg_rating__gte=min_rating_value)
-        except (ValueError, TypeError):
-            return queryset
-
     def _apply_sorting(self, queryset, sort_by):
         """Apply sorting to queryset"""
-        if sort_by == 'rating':
-            return queryset.annotate(
-                avg_rating=Avg('reviews__rating')
-            ).order_by('-avg_rating', '-created_at')
+        if sort_by == 'relevance' and self.ranked:
+            return queryset.order_by('search_document__rank', 'id')
+
+        elif sort_by == 'rating':
+            return queryset.order_by('-average_rating', '-id')
+
+        elif sort_by == 'popular':
+            return queryset.order_by('-popularity_score', '-id')
 
         elif sort_by == 'price':
-            return queryset.order_by('price', '-created_at')
+            return queryset.order_by('price', 'id')
 
         elif sort_by == 'newest':
-            return queryset.order_by('-created_at')
+            return queryset.order_by('-created_at', '-id')
 
         else:
-            return queryset.order_by('-created_at')
+            return queryset.order_by('-created_at', '-id')
 
     def list(self, request, *args, **kwargs):
         """Override list to add search metadata"""
+        facets = request.query_params.get('facets', '').strip()
+        facet_names = parse_facets(facets) if facets else ()
+
+        cached = search_cache.get_result(request)
+        if cached is not None:
+            return Response(cached)
+
         queryset = self.filter_queryset(self.get_queryset())
 
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response({
+                'count': len(serializer.data),
+                'results': serializer.data
+            })
+
+        if facet_names:
+            response.data['facets'] = get_facets(
+                queryset, request.query_params, self.filter_params, facet_names
+            )
 
-        serializer = self.get_serializer(queryset, many=True)
+        search_cache.set_result(request, response.data)
+        return response
+
+
+class SearchCacheStatsView(APIView):
+    """
+    GET search result cache hit/miss counters (staff only)
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(search_cache.stats())
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='q', description='Prefix typed so far', required=True, type=str),
+        OpenApiParameter(name='limit', description='Maximum suggestions (1-10)', required=False, type=int),
+        OpenApiParameter(name='types', description='Comma separated subset of '
+                                                   'course, category, subcategory, instructor',
+                         required=False, type=str),
+    ]
+)
+class AutocompleteView(APIView):
+    """
+    GET typeahead suggestions for course titles, category,
+    subcategory and instructor names, most enrolled first
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', autocomplete.TOP_K))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = max(1, min(limit, autocomplete.TOP_K))
+
+        types = None
+        if request.query_params.get('types'):
+            types = {name.strip() for name in request.query_params['types'].split(',')}
+            unknown = types - set(autocomplete.TYPES)
+            if unknown:
+                raise ValidationError({'types': f"Unknown type(s): {', '.join(sorted(unknown))}"})
+
+        suggestions = autocomplete.get_index().search(prefix, limit=limit, types=types)
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data
+            'results': [
+                {'type': suggestion.type, 'id': suggestion.id, 'label': suggestion.label}
+                for suggestion in suggestions
+            ]
         })
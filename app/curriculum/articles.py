@@ -0,0 +1,61 @@
+"""
+Article body delivery.
+
+Lecture.article is a CompressedTextField: bodies of at least its threshold
+are stored as a gzip stream. Asked for the body as text/plain (Accept header
+or ?format=text), the content endpoint sends that stream as it is read from
+the database with Content-Encoding: gzip when the client accepts gzip, so
+neither side of the request compresses or decompresses anything. Other
+clients, and bodies stored plain, get the text.
+"""
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import renderers
+
+from core.models import Lecture
+
+CONTENT_TYPE = 'text/plain; charset=utf-8'
+
+
+class ArticleTextRenderer(renderers.BaseRenderer):
+    """The article body alone, errors as their detail"""
+    media_type = 'text/plain'
+    format = 'text'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = data['article'] if 'article' in data else data.get('detail', '')
+        return str(data or '')
+
+
+def accepts_gzip(request):
+    """Whether the Accept-Encoding header allows gzip, by name or as *"""
+    accepted = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in accepted:
+            return accepted[coding] > 0
+    return False
+
+
+def serve(request, lecture):
+    """text/plain response of a lecture's article, the stored gzip stream when possible"""
+    stored = Lecture._meta.get_field('article').stored_value(lecture)
+    if stored is not None and stored.gzip is not None and accepts_gzip(request):
+        response = HttpResponse(stored.gzip, content_type=CONTENT_TYPE)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(lecture.article or '', content_type=CONTENT_TYPE)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,144 @@
+"""
+Lecture durations measured from the uploaded videos.
+
+When a video lecture gets a new file, its id is queued until the transaction
+commits (see curriculum/signals.py); the queued ids of one transaction are
+sent together to a process pool of MEDIA_DURATION_WORKERS processes, which
+parse the container headers with curriculum.mediaprobe. The results are
+written back from the pool's callback thread: every changed duration in one
+bulk_update, then one recount of the course totals, one snapshot rebuild
+and one catalog version bump per batch. With MEDIA_DURATION_WORKERS = 0
+parsing runs in the committing thread.
+
+A pool broken by a crashed process is replaced by a new one: a failed submit
+is logged and sent once more to the new pool, a failed batch is logged, and
+neither reaches the request that committed the lectures.
+
+The duration entered with the lecture still has to pass Lecture.clean, the
+measured one replaces it.
+"""
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core.models import Course, Lecture
+from core.oncommit import on_commit_once
+from courses.cache import bump_catalog_version
+from curriculum import mediaprobe, snapshot
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process pool shared by the requests of this worker, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawned processes inherit no database connections or locks
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'MEDIA_DURATION_WORKERS', 2),
+                mp_context=get_context('spawn'),
+            )
+        return _pool
+
+
+def discard_pool(pool):
+    """Shut a broken pool down, the next get_pool() starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def measure_after_commit(lecture_ids):
+    on_commit_once(measure, lecture_ids)
+
+
+def measure(lecture_ids):
+    """
+    Parse the video durations of lectures, in the pool unless
+    MEDIA_DURATION_WORKERS is 0. Returns the pool's future, if any.
+    """
+    storage = storages['lecture_media']
+    paths = {
+        lecture_id: storage.path(name)
+        for lecture_id, name in Lecture.objects.filter(
+            pk__in=lecture_ids, content_type='video'
+        ).values_list('id', 'video')
+        if name
+    }
+    if not paths:
+        return None
+    if getattr(settings, 'MEDIA_DURATION_WORKERS', 2) < 1:
+        write_durations(mediaprobe.durations_of(paths))
+        return None
+    for attempt in range(2):
+        pool = get_pool()
+        try:
+            future = pool.submit(mediaprobe.durations_of, paths)
+        except RuntimeError:
+            # BrokenProcessPool after a process died, or a pool shut down
+            logger.exception('Submitting lecture durations failed, restarting the pool')
+            discard_pool(pool)
+            continue
+        future.add_done_callback(partial(_write_back, threading.get_ident(), pool))
+        return future
+    return None
+
+
+def _write_back(submitter, pool, future):
+    try:
+        write_durations(future.result())
+    except BrokenProcessPool:
+        logger.exception('Measuring lecture durations failed, restarting the pool')
+        discard_pool(pool)
+    except Exception:
+        logger.exception('Storing measured lecture durations failed')
+    finally:
+        if threading.get_ident() != submitter:
+            # the pool's callback thread opened its own connections
+            connections.close_all()
+
+
+def write_durations(durations):
+    """
+    Store {lecture id: seconds} where it differs from the lecture's duration,
+    then refresh the totals and curriculum of the courses concerned.
+    Returns the number of lectures changed.
+    """
+    seconds = {
+        lecture_id: max(1, round(value))
+        for lecture_id, value in durations.items() if value
+    }
+    now = timezone.now()
+    changed = []
+    course_ids = set()
+    for lecture_id, duration, course_id in Lecture.objects.filter(pk__in=seconds).values_list(
+        'id', 'duration', 'section__course_id'
+    ):
+        if duration != seconds[lecture_id]:
+            changed.append(Lecture(pk=lecture_id, duration=seconds[lecture_id], updated_at=now))
+            course_ids.add(course_id)
+    if not changed:
+        return 0
+
+    with transaction.atomic():
+        Lecture.objects.bulk_update(changed, ['duration', 'updated_at'], batch_size=500)
+        # bulk_update skips the signals keeping these current
+        Course.recalculate_curriculum_totals(course_ids)
+        snapshot.rebuild_after_commit(course_ids)
+        # cached searches and duration filters show the old total_duration
+        bump_catalog_version()
+    return len(changed)
@@ -0,0 +1,183 @@
+"""
+Lecture media delivery.
+
+Players fetch a video in many small Range requests, so the per-request work
+is one query: the lecture's media name together with EXISTS subqueries for
+the user's active enrollment and instructor seat (see
+LectureQuerySet.with_access).
+
+With MEDIA_DELIVERY = 'django' the file is answered here: a single byte
+range as 206 Partial Content, anything else as the whole file. The response
+is a FileResponse over a FileRange, whose fileno() lets a WSGI server with
+wsgi.file_wrapper (gunicorn, uWSGI) send it with os.sendfile from the range
+start for Content-Length bytes; other servers read it in READ_SIZE pieces
+that stop at the range end. 'x-accel-redirect' (nginx) and 'x-sendfile'
+(Apache, lighttpd) only check access and leave ranges to the web server.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from core.models import Lecture
+
+READ_SIZE = 64 * 1024
+
+MEDIA_FIELDS = {'video': 'video', 'file': 'file'}
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """
+    `length` bytes of an open file from `start`: reads stop at the end of the
+    range, fileno() and tell() let sendfile start at the range
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def playable_media(user, lecture_id):
+    """
+    (lecture values, allowed) of a video or file lecture in one query, None
+    when there is no such lecture or it has no media. Previews are allowed
+    for everyone, other lectures for active students and instructors.
+    """
+    values = (
+        Lecture.objects.filter(pk=lecture_id, content_type__in=MEDIA_FIELDS)
+        .with_access(user)
+        .values('content_type', 'video', 'file', 'is_preview', 'enrolled', 'teaches')
+        .first()
+    )
+    if values is None or not values[MEDIA_FIELDS[values['content_type']]]:
+        return None
+    allowed = values['is_preview'] or values['enrolled'] or values['teaches']
+    return values, bool(allowed)
+
+
+def media_file(values):
+    """FieldFile of the lecture's media from playable_media values"""
+    field = MEDIA_FIELDS[values['content_type']]
+    return getattr(Lecture(**{field: values[field]}), field)
+
+
+def parse_range(header, size):
+    """
+    (start, length) of a single 'bytes=' range, None when the whole file is
+    sent (no header, several ranges or an invalid one)
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                raise RangeNotSatisfiable
+            start = max(size - suffix, 0)
+            return start, size - start
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    end = min(end, size - 1)
+    return start, end - start + 1
+
+
+def serve(request, fieldfile):
+    """Response delivering a lecture's media file per MEDIA_DELIVERY"""
+    mode = getattr(settings, 'MEDIA_DELIVERY', 'django')
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        return _offload('X-Accel-Redirect', prefix + quote(fieldfile.name), fieldfile.name)
+    if mode == 'x-sendfile':
+        return _offload('X-Sendfile', fieldfile.path, fieldfile.name)
+
+    try:
+        file = open(fieldfile.path, 'rb')
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+    stat = os.fstat(file.fileno())
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        file.close()
+        return _media_headers(response, etag, last_modified)
+
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return _media_headers(response, etag, last_modified)
+
+    start, length = byte_range or (0, size)
+    response = FileResponse(FileRange(file, start, length), status=206 if byte_range else 200)
+    response.block_size = READ_SIZE
+    response['Content-Length'] = length
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    return _media_headers(response, etag, last_modified)
+
+
+def _if_range_matches(request, etag, last_modified):
+    """False when an If-Range validator is stale, the full file is sent then"""
+    validator = request.headers.get('If-Range')
+    if not validator:
+        return True
+    if validator.startswith('"'):
+        return validator == etag
+    return validator == http_date(last_modified)
+
+
+def _media_headers(response, etag, last_modified):
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True)
+    return response
+
+
+def _offload(header, target, name):
+    """Empty response telling the web server which file to send"""
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    response = HttpResponse(content_type=content_type)
+    response[header] = target
+    patch_cache_control(response, private=True)
+    return response
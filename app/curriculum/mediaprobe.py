@@ -0,0 +1,154 @@
+"""
+Play length of MP4 and WebM files from their container metadata.
+
+Pure Python with no Django imports, so pool processes started with 'spawn'
+only import this module. Both parsers seek from header to header and read a
+few bytes at each, never the media data itself:
+
+- MP4/QuickTime: the top-level `moov` box holds `mvhd`, whose duration is
+  counted in `timescale` units per second (32-bit fields in version 0,
+  64-bit in version 1). `moov` may come before or after `mdat`.
+- WebM/Matroska: EBML elements; Segment > Info holds Duration (a float) in
+  TimecodeScale nanoseconds, 1 ms unless stated otherwise.
+"""
+import os
+import struct
+
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+CLUSTER = 0x1F43B675
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+
+
+def media_duration(path):
+    """Seconds of an MP4 or WebM file, None when it is neither or has no duration"""
+    try:
+        with open(path, 'rb') as stream:
+            magic = stream.read(4)
+            stream.seek(0)
+            if int.from_bytes(magic, 'big') == EBML_HEADER:
+                return webm_duration(stream)
+            return mp4_duration(stream)
+    except (OSError, IndexError, ValueError, struct.error):
+        return None
+
+
+def durations_of(paths):
+    """{key: seconds or None} of {key: path}, the task run in the pool"""
+    return {key: media_duration(path) for key, path in paths.items()}
+
+
+def _size(stream):
+    return os.fstat(stream.fileno()).st_size
+
+
+def mp4_duration(stream):
+    start, end = 0, _size(stream)
+    for wanted in (b'moov', b'mvhd'):
+        box = _find_box(stream, wanted, start, end)
+        if box is None:
+            return None
+        start, end = box
+
+    stream.seek(start)
+    version = stream.read(4)[0]
+    if version == 1:
+        _, _, timescale, duration = struct.unpack('>QQIQ', stream.read(28))
+        unknown = 0xFFFFFFFFFFFFFFFF
+    else:
+        _, _, timescale, duration = struct.unpack('>IIII', stream.read(16))
+        unknown = 0xFFFFFFFF
+    if not timescale or duration == unknown:
+        return None
+    return duration / timescale
+
+
+def _find_box(stream, wanted, position, end):
+    """(payload start, box end) of the first `wanted` box between position and end"""
+    while position + 8 <= end:
+        stream.seek(position)
+        size, kind = struct.unpack('>I4s', stream.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', stream.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return None
+        if kind == wanted:
+            return position + header, min(position + size, end)
+        position += size
+    return None
+
+
+def webm_duration(stream):
+    end = _size(stream)
+    element, start, size = _element(stream, 0)
+    if element != EBML_HEADER or size is None:
+        return None
+    element, start, size = _element(stream, start + size)
+    if element != SEGMENT:
+        return None
+
+    position = start
+    segment_end = min(start + size, end) if size is not None else end
+    while position < segment_end:
+        element, start, size = _element(stream, position)
+        if element == CLUSTER or size is None:
+            # Info comes before the media data
+            return None
+        if element == INFO:
+            return _info_duration(stream, start, start + size)
+        position = start + size
+    return None
+
+
+def _info_duration(stream, position, end):
+    scale = 1000000
+    duration = None
+    while position < end:
+        element, start, size = _element(stream, position)
+        if size is None:
+            return None
+        stream.seek(start)
+        data = stream.read(size)
+        if element == TIMECODE_SCALE:
+            scale = int.from_bytes(data, 'big')
+        elif element == DURATION and size in (4, 8):
+            duration = struct.unpack('>f' if size == 4 else '>d', data)[0]
+        position = start + size
+    if duration is None:
+        return None
+    return duration * scale / 1e9
+
+
+def _element(stream, position):
+    """(id, data start, data size or None when unknown) of the element at position"""
+    stream.seek(position)
+    element, id_length = _vint(stream, keep_marker=True)
+    size, size_length = _vint(stream, keep_marker=False)
+    if size == (1 << (7 * size_length)) - 1:
+        size = None
+    return element, position + id_length + size_length, size
+
+
+def _vint(stream, keep_marker):
+    """EBML variable length integer, with its length marker bit for element ids"""
+    first = stream.read(1)
+    if not first:
+        raise ValueError('Unexpected end of file')
+    byte = first[0]
+    length = 1
+    mask = 0x80
+    while not byte & mask:
+        mask >>= 1
+        length += 1
+        if not mask:
+            raise ValueError('Invalid variable length integer')
+    value = byte if keep_marker else byte & (mask - 1)
+    for byte in stream.read(length - 1):
+        value = (value << 8) | byte
+    return value, length
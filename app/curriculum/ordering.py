@@ -0,0 +1,72 @@
+"""
+Gapped ordering for sections and lectures.
+
+`order` values are spaced ORDER_GAP apart, so an item moved between two
+neighbours takes a value in the gap between them and is the only row
+written. Applying a full desired order keeps the longest run of items
+already in increasing order (a longest increasing subsequence) and only
+renumbers the others inside the gaps around them. When a gap is too small
+for the items moved into it, the whole list is renumbered with fresh gaps.
+"""
+from bisect import bisect_left
+
+ORDER_GAP = 1024
+
+
+def longest_increasing_run(values):
+    """Indexes of one longest strictly increasing subsequence, O(n log n)"""
+    tails = []       # smallest tail value of an increasing run of each length
+    tail_index = []  # index of that tail
+    previous = [None] * len(values)
+    for index, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_index.append(index)
+        else:
+            tails[length] = value
+            tail_index[length] = index
+        previous[index] = tail_index[length - 1] if length else None
+
+    kept = []
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        kept.append(index)
+        index = previous[index]
+    return set(kept)
+
+
+def plan_reorder(current, desired_ids):
+    """
+    New order values for the rows that must change so `desired_ids` is sorted,
+    given `current` = {id: order}. Returns {id: new order}.
+    """
+    orders = [current[item_id] for item_id in desired_ids]
+    kept = longest_increasing_run(orders)
+
+    changes = {}
+    run = []
+    low = 0
+    for position, item_id in enumerate(desired_ids + [None]):
+        if item_id is not None and position not in kept:
+            run.append(item_id)
+            continue
+        high = orders[position] if item_id is not None else low + ORDER_GAP * (len(run) + 1)
+        if run:
+            step = (high - low) // (len(run) + 1)
+            if step < 1:
+                return renumber(current, desired_ids)
+            for offset, moved_id in enumerate(run, start=1):
+                changes[moved_id] = low + step * offset
+            run = []
+        low = high
+    return changes
+
+
+def renumber(current, desired_ids):
+    """Evenly gapped orders for the whole list, only the rows that change"""
+    changes = {}
+    for position, item_id in enumerate(desired_ids, start=1):
+        if current[item_id] != position * ORDER_GAP:
+            changes[item_id] = position * ORDER_GAP
+    return changes
@@ -3,7 +3,7 @@ Curriculum API Permissions
 """
 from rest_framework import permissions
 
-from core.models import Course, Section, Lecture
+from core.access import get_access
 
 
 class IsCourseInstructor(permissions.BasePermission):
@@ -24,11 +24,7 @@ class IsCourseInstructor(permissions.BasePermission):
         if not course_id:
             return False
 
-        try:
-            course = Course.objects.get(id=course_id)
-            return course.instructor.filter(id=request.user.id).exists()
-        except Course.DoesNotExist:
-            return False
+        return get_access(request.user).is_instructor(course_id)
 
 
 class IsSectionInstructor(permissions.BasePermission):
@@ -48,11 +44,8 @@ class IsSectionInstructor(permissions.BasePermission):
         if not section_id:
             return False
 
-        try:
-            section = Section.objects.select_related('course').get(id=section_id)
-            return section.course.instructor.filter(id=request.user.id).exists()
-        except Section.DoesNotExist:
-            return False
+        access = get_access(request.user)
+        return access.is_instructor(access.section_course_id(section_id))
 
 
 class IsLectureInstructor(permissions.BasePermission):
@@ -72,11 +65,8 @@ class IsLectureInstructor(permissions.BasePermission):
         if not lecture_id:
             return False
 
-        try:
-            lecture = Lecture.objects.select_related('section__course').get(id=lecture_id)
-            return lecture.section.course.instructor.filter(id=request.user.id).exists()
-        except Lecture.DoesNotExist:
-            return False
+        access = get_access(request.user)
+        return access.is_instructor(access.lecture_course_id(lecture_id))
 
 
 class IsSectionLectureInstructor(permissions.BasePermission):
@@ -96,8 +86,21 @@ class IsSectionLectureInstructor(permissions.BasePermission):
         if not section_id:
             return False
 
-        try:
-            section = Section.objects.select_related('course').get(id=section_id)
-            return section.course.instructor.filter(id=request.user.id).exists()
-        except Section.DoesNotExist:
-            return False
+        access = get_access(request.user)
+        return access.is_instructor(access.section_course_id(section_id))
+
+
+class IsUploadInstructor(permissions.BasePermission):
+    """
+    Custom permission for upload sessions: /uploads/{id}/
+    The session's owner must still teach its lecture's course
+    """
+
+    def has_permission(self, request, view):
+        """Check if user is authenticated, sessions of other owners are not found"""
+        return request.user.is_authenticated
+
+    def has_object_permission(self, request, view, obj):
+        """Check if user is instructor of the session's lecture's course"""
+        access = get_access(request.user)
+        return access.is_instructor(access.lecture_course_id(obj.lecture_id))
@@ -1,11 +1,16 @@
 """
 Curriculum API Serializers
 """
+import re
+
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 
-from core.models import Course, Section, Lecture, User
+from core.access import get_access
+from core.models import Course, Section, Lecture, MediaBlob, UploadSession, User
 
 
 class LectureSerializer(serializers.ModelSerializer):
@@ -24,6 +29,8 @@ class LectureSerializer(serializers.ModelSerializer):
             'section': {'read_only': True},
             'content_type': {'write_only': True},
             'is_preview': {'write_only': True},
+            # served by LectureContentSerializer, lecture reads defer it
+            'article': {'write_only': True},
         }
 
     def validate(self, data):
@@ -39,7 +46,7 @@ class LectureSerializer(serializers.ModelSerializer):
 
         request = self.context.get('request')
         if section and request and request.user.is_authenticated:
-            if not section.course.instructor.filter(id=request.user.id).exists():
+            if not get_access(request.user).is_instructor(section.course_id):
                 raise serializers.ValidationError(
                     "You don't have permission to add Lecture in this section"
                 )
@@ -114,6 +121,15 @@ class LectureSerializer(serializers.ModelSerializer):
 
         return instance
 
+class LectureContentSerializer(serializers.ModelSerializer):
+    """Article body of a lecture"""
+
+    class Meta:
+        model = Lecture
+        fields = ['id', 'title', 'content_type', 'article']
+        read_only_fields = fields
+
+
 class LectureCreateSerializer(LectureSerializer):
     """
     Creating Lectures within Section, context gotten from context
@@ -159,7 +175,7 @@ class SectionSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
 
         if course and request and request.user.is_authenticated:
-            if not course.instructor.filter(id=request.user.id).exists():
+            if not get_access(request.user).is_instructor(course.id):
                 raise serializers.ValidationError(
                     "You don't have permission to add Section in this Course"
                 )
@@ -267,3 +283,248 @@ class CurriculumSerializer(serializers.ModelSerializer):
         data['total_duration'] = total_duration
 
         return data
+
+
+class LectureImportSerializer(serializers.ModelSerializer):
+    """One lecture of a curriculum import, matched by id, else by title within its section"""
+    id = serializers.IntegerField(required=False, min_value=1)
+
+    class Meta:
+        model = Lecture
+        fields = ['id', 'title', 'order', 'duration', 'content_type', 'is_preview', 'article']
+
+
+class SectionImportSerializer(serializers.ModelSerializer):
+    """One section of a curriculum import, matched by id, else by title within the course"""
+    id = serializers.IntegerField(required=False, min_value=1)
+    lectures = LectureImportSerializer(many=True, required=False, default=list)
+
+    class Meta:
+        model = Section
+        fields = ['id', 'title', 'order', 'lectures']
+
+
+class CurriculumImportSerializer(serializers.Serializer):
+    """
+    Upsert a course's whole sections+lectures tree in one transaction.
+    Order and title uniqueness are checked in memory against the existing
+    curriculum; any error rejects the whole import and is reported at the
+    position of the item that caused it. Sections and lectures left out of
+    the payload are kept.
+    """
+    sections = SectionImportSerializer(many=True, allow_empty=False, max_length=500)
+
+    LECTURE_FIELDS = ['title', 'order', 'duration', 'content_type', 'is_preview',
+                      'article', 'video', 'file', 'section']
+
+    def validate(self, attrs):
+        course = get_object_or_404(Course, id=self.context['course_id'])
+        sections = {section.id: section for section in course.sections.all()}
+        lectures = {
+            lecture.id: lecture
+            for lecture in Lecture.objects.filter(section__course=course)
+        }
+        section_by_title = {section.title: section for section in sections.values()}
+
+        errors = [{} for _ in attrs['sections']]
+        plan = []
+        for index, item in enumerate(attrs['sections']):
+            section = self._match(item, sections, section_by_title, errors[index], 'section')
+            if section is None:
+                section = Section(course=course)
+            section.title = item['title']
+            section.order = item['order']
+            plan.append((section, self._plan_lectures(
+                section, item['lectures'], lectures, errors[index]
+            )))
+
+        # sections of the payload and untouched existing ones must stay unique
+        planned = {id(section) for section, _ in plan}
+        final = [section for section, _ in plan] + [
+            section for section in sections.values() if id(section) not in planned
+        ]
+        self._check_unique(final, errors, 'order', 'Order number already exists in this course')
+        self._check_unique(final, errors, 'title', 'Title already exists in this course')
+
+        if any(errors):
+            raise serializers.ValidationError({'sections': errors})
+        attrs['course'] = course
+        attrs['plan'] = plan
+        return attrs
+
+    def _match(self, item, existing, by_title, errors, kind):
+        """The existing row an item updates, None for new rows"""
+        if 'id' in item:
+            if item['id'] not in existing:
+                errors['id'] = [f'No {kind} with this id in this course.']
+                return None
+            return existing[item['id']]
+        return by_title.get(item['title'])
+
+    def _plan_lectures(self, section, items, lectures, section_errors):
+        """(lecture, errors) pairs of one section, validated with Lecture.clean()"""
+        existing = {
+            lecture.id: lecture for lecture in lectures.values()
+            if section.pk and lecture.section_id == section.pk
+        }
+        by_title = {lecture.title: lecture for lecture in existing.values()}
+        errors = [{} for _ in items]
+        plan = []
+        for index, item in enumerate(items):
+            if 'id' in item and item['id'] in lectures and item['id'] not in existing:
+                # moved from another section of the course
+                existing[item['id']] = lectures[item['id']]
+            lecture = self._match(item, existing, by_title, errors[index], 'lecture')
+            if lecture is None:
+                lecture = Lecture()
+            lecture.section = section
+            for field, value in item.items():
+                if field != 'id':
+                    setattr(lecture, field, value)
+            if lecture.content_type != 'video':
+                lecture.video = None
+            if lecture.content_type != 'file':
+                lecture.file = None
+            if lecture.content_type != 'article':
+                lecture.article = None
+            if lecture.content_type in ('video', 'file') and not lecture.pk:
+                errors[index].setdefault('content_type', []).append(
+                    'Video and file lectures are uploaded through the lecture endpoint.'
+                )
+            else:
+                try:
+                    lecture.clean()
+                except DjangoValidationError as error:
+                    for field, messages in error.message_dict.items():
+                        errors[index].setdefault(field, []).extend(messages)
+            plan.append(lecture)
+
+        planned = {id(lecture) for lecture in plan}
+        final = plan + [
+            lecture for lecture in existing.values()
+            if id(lecture) not in planned and lecture.section_id == section.pk
+        ]
+        self._check_unique(final, errors, 'order', 'Order number already exist')
+        self._check_unique(final, errors, 'title', 'Title already exist')
+        if any(errors):
+            section_errors['lectures'] = errors
+        return plan
+
+    @staticmethod
+    def _check_unique(rows, errors, field, message):
+        """Flag every payload item (the first len(errors) rows) sharing a value"""
+        seen = {}
+        for position, row in enumerate(rows):
+            seen.setdefault(getattr(row, field), []).append(position)
+        for positions in seen.values():
+            if len(positions) > 1:
+                for position in positions:
+                    if position < len(errors):
+                        errors[position].setdefault(field, []).append(message)
+
+    def create(self, validated_data):
+        course = validated_data['course']
+        plan = validated_data['plan']
+        new_sections = [section for section, _ in plan if section.pk is None]
+        old_sections = [section for section, _ in plan if section.pk is not None]
+
+        with transaction.atomic():
+            Section.objects.bulk_create(new_sections)
+            Section.objects.bulk_update(old_sections, ['title', 'order'], batch_size=500)
+
+            lectures = [lecture for _, section_lectures in plan for lecture in section_lectures]
+            for lecture in lectures:
+                # bulk_create assigned the primary keys of new sections
+                lecture.section = lecture.section
+            new_lectures = [lecture for lecture in lectures if lecture.pk is None]
+            old_lectures = [lecture for lecture in lectures if lecture.pk is not None]
+            Lecture.objects.bulk_create(new_lectures, batch_size=500)
+            # articles left deferred are unchanged, writing them back would load each one
+            loaded = [lecture for lecture in old_lectures if 'article' in lecture.__dict__]
+            deferred = [lecture for lecture in old_lectures if 'article' not in lecture.__dict__]
+            Lecture.objects.bulk_update(loaded, self.LECTURE_FIELDS, batch_size=500)
+            Lecture.objects.bulk_update(
+                deferred, [field for field in self.LECTURE_FIELDS if field != 'article'],
+                batch_size=500,
+            )
+            # and the signal moving the blob references of replaced or cleared media
+            replaced = set()
+            for lecture in old_lectures:
+                if lecture._stored_media is not None:
+                    replaced |= lecture._stored_media ^ lecture.media_names()
+                    lecture.remember_stored_media()
+            if replaced:
+                MediaBlob.recount(replaced)
+
+            # bulk writes skip the Lecture signals keeping the course totals
+            Course.recalculate_curriculum_totals([course.id])
+
+        return {
+            'course': course,
+            'sections_created': [section.id for section in new_sections],
+            'sections_updated': [section.id for section in old_sections],
+            'lectures_created': [lecture.id for lecture in new_lectures],
+            'lectures_updated': [lecture.id for lecture in old_lectures],
+        }
+
+    def to_representation(self, instance):
+        return {key: value for key, value in instance.items() if key != 'course'}
+
+
+class ReorderSerializer(serializers.Serializer):
+    """
+    Desired order of every section of a course or lecture of a section,
+    context['current'] maps their ids to the stored order
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        current = self.context['current']
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Each id may only appear once.")
+        missing = set(current) - set(value)
+        unknown = set(value) - set(current)
+        if missing or unknown:
+            raise serializers.ValidationError(
+                f"ids must list every item exactly once. Missing: {sorted(missing)}, "
+                f"unknown: {sorted(unknown)}"
+            )
+        return value
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Resumable upload of a lecture video or file, `received` is the offset to resume from"""
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'lecture', 'field', 'filename', 'size',
+            'received', 'sha256', 'status',
+        ]
+        read_only_fields = ['id', 'lecture', 'received', 'status']
+
+    def validate_filename(self, value):
+        """Only the base name is kept, storage decides the directory"""
+        name = value.replace('\\', '/').rsplit('/', 1)[-1]
+        if not name or name in ('.', '..'):
+            raise serializers.ValidationError("A file name is required.")
+        return name
+
+    def validate_size(self, value):
+        max_size = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 5 * 1024 ** 3)
+        if value < 1:
+            raise serializers.ValidationError("Size must be at least 1 byte.")
+        if value > max_size:
+            raise serializers.ValidationError(f"Size may not exceed {max_size} bytes.")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and not re.fullmatch(r'[0-9a-f]{64}', value):
+            raise serializers.ValidationError("Expected a hex SHA-256 digest.")
+        return value
+
+
+class UploadFinalizeSerializer(serializers.Serializer):
+    """Optional lecture duration to store with the finished upload"""
+    duration = serializers.IntegerField(min_value=0, required=False)
@@ -0,0 +1,50 @@
+"""
+Signals rebuilding the curriculum snapshots of changed courses,
+measuring new lecture videos and removing the partial files of deleted uploads
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import Course, Section, Lecture, UploadSession
+from curriculum import durations, snapshot, uploads
+
+
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+def rebuild_curriculum_on_section_change(sender, instance, **kwargs):
+    snapshot.rebuild_after_commit([instance.course_id])
+
+
+@receiver(post_save, sender=Lecture)
+@receiver(post_delete, sender=Lecture)
+def rebuild_curriculum_on_lecture_change(sender, instance, **kwargs):
+    snapshot.rebuild_after_commit(
+        Section.objects.filter(pk=instance.section_id).values_list('course_id', flat=True)
+    )
+
+
+@receiver(pre_save, sender=Lecture)
+def note_new_lecture_video(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_media', None)
+    instance._video_changed = (
+        instance.content_type == 'video' and bool(instance.video)
+        and (stored is None or instance.video.name not in stored)
+    )
+
+
+@receiver(post_save, sender=Lecture)
+def measure_new_lecture_video(sender, instance, **kwargs):
+    if getattr(instance, '_video_changed', False):
+        durations.measure_after_commit([instance.pk])
+
+
+@receiver(post_save, sender=Course)
+def rebuild_curriculum_on_course_change(sender, instance, created, **kwargs):
+    """The course title is part of the curriculum"""
+    if not created:
+        snapshot.rebuild_after_commit([instance.pk])
+
+
+@receiver(post_delete, sender=UploadSession)
+def discard_partial_upload(sender, instance, **kwargs):
+    uploads.discard(instance)
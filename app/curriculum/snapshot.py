@@ -0,0 +1,58 @@
+"""
+Materialized curriculum responses.
+
+The curriculum of a course is rendered once with CurriculumSerializer over a
+prefetched tree and stored as JSON text in CurriculumSnapshot, together with
+a SHA-256 digest of that text used as strong ETag. Section, lecture and
+course writes rebuild the snapshots of their courses after commit (see
+curriculum/signals.py); a course without one is built on first read.
+"""
+import hashlib
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.models import Course, CurriculumSnapshot
+from core.oncommit import on_commit_once
+from curriculum.serializers import CurriculumSerializer
+
+
+def render(course):
+    """Curriculum JSON of a course with prefetched sections__lectures"""
+    return json.dumps(
+        CurriculumSerializer(course).data,
+        cls=JSONEncoder,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+
+
+def build(course_ids):
+    """Render and store the snapshots of existing courses, by course id"""
+    snapshots = []
+    for course in Course.objects.filter(pk__in=course_ids).prefetch_related('sections__lectures'):
+        payload = render(course)
+        snapshots.append(CurriculumSnapshot(
+            course=course,
+            payload=payload,
+            etag=hashlib.sha256(payload.encode()).hexdigest(),
+        ))
+    CurriculumSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['course'],
+        update_fields=['payload', 'etag', 'built_at'],
+    )
+    return {snapshot.course_id: snapshot for snapshot in snapshots}
+
+
+def rebuild_after_commit(course_ids):
+    on_commit_once(build, course_ids)
+
+
+def get_snapshot(course_id):
+    """Stored snapshot of a course, built when missing, None for unknown courses"""
+    snapshot = CurriculumSnapshot.objects.filter(course_id=course_id).first()
+    if snapshot is None:
+        snapshot = build([course_id]).get(course_id)
+    return snapshot
@@ -1,14 +1,27 @@
 """
 Tests for Curriculum API
 """
-
+import hashlib
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 
-from core.models import Course, Category, SubCategory, Section, Lecture
+from core.models import (Course, Category, SubCategory, Section, Lecture, Enrollment,
+                         CourseProgress, CurriculumSnapshot, LectureProgress, MediaBlob,
+                         UploadSession)
+from curriculum import uploads
 
 User = get_user_model()
 
@@ -325,3 +338,496 @@ class CurriculumAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('content', response.data)
         self.assertIn('cannot provide multiple content types', str(response.data['content']).lower())
+
+
+class CurriculumSnapshotTestCase(APITestCase):
+    """Test the curriculum is served from its snapshot with an ETag"""
+
+    def setUp(self):
+        # committed, so the tests' own after-commit work gets its own callbacks
+        with self.captureOnCommitCallbacks(execute=True):
+            CurriculumAPITestCase.setUp(self)
+            for order in range(2, 6):
+                section = Section.objects.create(course=self.course, title=f"Part {order}", order=order)
+                for lecture_order in (1, 2):
+                    Lecture.objects.create(section=section, title=f"Lecture {lecture_order}",
+                                           order=lecture_order, duration=60,
+                                           content_type="article", article="Notes")
+
+    def test_curriculum_built_in_constant_queries(self):
+        """Test building the snapshot does not query per section"""
+        CurriculumSnapshot.objects.all().delete()
+        with self.assertNumQueries(5):  # lookup, course, sections, lectures, upsert
+            response = self.client.get(self.curriculum_url)
+        data = response.json()
+        self.assertEqual((data['total_sections'], data['total_lectures'], data['total_duration']),
+                         (5, 9, 530))
+        self.assertEqual(data['sections'][1]['lecture_count'], 2)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.curriculum_url)
+
+    def test_etag_revalidation(self):
+        """Test a matching If-None-Match answers 304 and changes move the ETag"""
+        response = self.client.get(self.curriculum_url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get(self.curriculum_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Lecture.objects.create(section=self.section, title="New", order=2, duration=10,
+                                   content_type="article", article="Notes")
+        response = self.client.get(self.curriculum_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['total_lectures'], 10)
+
+    def test_unknown_course(self):
+        response = self.client.get(reverse("course:curriculum-detail", args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CurriculumImportTestCase(APITestCase):
+    """Test the transactional curriculum import"""
+
+    def setUp(self):
+        # committed, so the tests' own after-commit work gets its own callbacks
+        with self.captureOnCommitCallbacks(execute=True):
+            CurriculumAPITestCase.setUp(self)
+        self.url = reverse("course:curriculum-import", args=[self.course.id])
+
+    @staticmethod
+    def lecture_item(title, order, **fields):
+        return {"title": title, "order": order, "duration": 60,
+                "content_type": "article", "article": "Notes", **fields}
+
+    def test_import_creates_and_updates_in_constant_queries(self):
+        """Test a whole tree is upserted without per-item queries"""
+        self.client.force_authenticate(self.instructor)
+        payload = {"sections": [
+            {"title": "Introduction", "order": 1, "lectures": [
+                {"id": self.lecture.id, "title": "Welcome!", "order": 1, "duration": 70,
+                 "content_type": "video"},
+                self.lecture_item("Setup", 2),
+            ]},
+        ] + [
+            {"title": f"Part {number}", "order": number + 1,
+             "lectures": [self.lecture_item(f"Lecture {order}", order) for order in range(1, 11)]}
+            for number in range(1, 6)
+        ]}
+        # the snapshot and progress are rebuilt after commit, outside these
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(13):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['sections_updated'], [self.section.id])
+        self.assertEqual(len(response.data['sections_created']), 5)
+        self.assertEqual(len(response.data['lectures_created']), 51)
+        self.assertEqual(response.data['lectures_updated'], [self.lecture.id])
+
+        self.lecture.refresh_from_db()
+        self.assertEqual((self.lecture.title, self.lecture.duration), ("Welcome!", 70))
+        self.assertTrue(self.lecture.video)
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.lecture_count, self.course.total_duration), (52, 51 * 60 + 70))
+        self.assertEqual(self.client.get(self.curriculum_url).json()['total_lectures'], 52)
+
+    def test_import_leaves_unchanged_articles_unloaded(self):
+        """Test re-importing article lectures without their body costs no query per lecture"""
+        self.client.force_authenticate(self.instructor)
+        section = Section.objects.create(course=self.course, title="Readings", order=2)
+        lectures = [
+            Lecture.objects.create(section=section, title=f"Reading {order}", order=order,
+                                   duration=60, content_type="article", article="Notes")
+            for order in range(1, 31)
+        ]
+
+        def import_count(count):
+            payload = {"sections": [{"id": section.id, "title": "Readings", "order": 2, "lectures": [
+                {"id": lecture.id, "title": lecture.title, "order": lecture.order,
+                 "duration": 90, "content_type": "article"}
+                for lecture in lectures[:count]
+            ]}]}
+            with self.captureOnCommitCallbacks(execute=True), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            return len(queries)
+
+        self.assertEqual(import_count(30), import_count(3))
+        self.assertEqual(Lecture.objects.with_content().get(pk=lectures[-1].pk).article, "Notes")
+
+    def test_import_releases_cleared_media(self):
+        """Test a video lecture imported as an article drops its blob reference"""
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        with self.settings(MEDIA_ROOT=media.name):
+            lecture = Lecture.objects.create(
+                section=self.section, title="Recorded", order=2, duration=60,
+                content_type="video", video=SimpleUploadedFile("recorded.mp4", b"recording"),
+            )
+            self.assertEqual(MediaBlob.objects.get(name=lecture.video.name).ref_count, 1)
+
+            self.client.force_authenticate(self.instructor)
+            payload = {"sections": [{"id": self.section.id, "title": "Introduction", "order": 1,
+                                     "lectures": [self.lecture_item("Recorded", 2, id=lecture.id)]}]}
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(MediaBlob.objects.get(name=lecture.video.name).ref_count, 0)
+
+    def test_import_recounts_progress_after_commit(self):
+        """Test students' progress totals are recounted once the import commits"""
+        Enrollment.objects.create(student=self.student, course=self.course)
+        LectureProgress.objects.create(student=self.student, lecture=self.lecture, is_completed=True)
+        self.client.force_authenticate(self.instructor)
+        payload = {"sections": [{"title": "Introduction", "order": 1, "lectures": [
+            self.lecture_item("Setup", 2),
+        ]}]}
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        progress = CourseProgress.objects.get(student=self.student, course=self.course)
+        self.assertEqual(progress.total_lectures, 1)
+
+        for callback in callbacks:
+            callback()
+        progress.refresh_from_db()
+        self.assertEqual((progress.completed_lectures, progress.total_lectures), (1, 2))
+        self.assertEqual(float(progress.progress_percentage), 50)
+
+    def test_errors_are_reported_per_item_and_nothing_is_written(self):
+        """Test every invalid item is reported at its position and the import is rolled back"""
+        self.client.force_authenticate(self.instructor)
+        payload = {"sections": [
+            {"title": "New", "order": 1, "lectures": [
+                self.lecture_item("A", 1),
+                self.lecture_item("A", 1),
+                self.lecture_item("B", 2, article=""),
+            ]},
+            {"title": "Other", "order": 3, "lectures": [
+                self.lecture_item("C", 1, content_type="video"),
+            ]},
+            {"id": 999999, "title": "Ghost", "order": 4},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['sections']
+        # order 1 is taken by the existing Introduction section
+        self.assertIn('order', errors[0])
+        self.assertEqual(set(errors[0]['lectures'][0]), {'order', 'title'})
+        self.assertEqual(set(errors[0]['lectures'][1]), {'order', 'title'})
+        self.assertIn('content', errors[0]['lectures'][2])
+        self.assertIn('content_type', errors[1]['lectures'][0])
+        self.assertIn('id', errors[2])
+        self.assertEqual(Section.objects.filter(course=self.course).count(), 1)
+        self.assertEqual(Lecture.objects.filter(section__course=self.course).count(), 1)
+
+    def test_only_course_instructors_can_import(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post(self.url, {"sections": [{"title": "X", "order": 2}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ReorderTestCase(APITestCase):
+    """Test reordering sections and lectures"""
+
+    def setUp(self):
+        CurriculumAPITestCase.setUp(self)
+        self.sections = [self.section] + [
+            Section.objects.create(course=self.course, title=f"Part {order}", order=order)
+            for order in range(2, 6)
+        ]
+        self.lectures = [self.lecture] + [
+            Lecture.objects.create(section=self.section, title=f"Lecture {order}", order=order,
+                                   duration=60, content_type="article", article="Notes")
+            for order in range(2, 5)
+        ]
+        self.section_url = reverse("course:section-reorder", args=[self.course.id])
+        self.lecture_url = reverse("course:lecture-reorder", args=[self.section.id])
+        self.client.force_authenticate(self.instructor)
+
+    def order_of(self, model, **filters):
+        return list(model.objects.filter(**filters).order_by('order').values_list('id', flat=True))
+
+    def test_reorder_sections_then_move_one_row(self):
+        """Test the first reorder spreads orders out and a later move writes one row"""
+        ids = [section.id for section in self.sections]
+        desired = [ids[4]] + ids[:4]
+        response = self.client.post(self.section_url, {"ids": desired}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.order_of(Section, course=self.course), desired)
+
+        moved = [desired[0], desired[3], desired[1], desired[2], desired[4]]
+        response = self.client.post(self.section_url, {"ids": moved}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(self.order_of(Section, course=self.course), moved)
+
+    def test_reorder_lectures(self):
+        ids = [lecture.id for lecture in reversed(self.lectures)]
+        response = self.client.post(self.lecture_url, {"ids": ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.order_of(Lecture, section=self.section), ids)
+
+    def test_ids_must_be_a_permutation(self):
+        ids = [section.id for section in self.sections]
+        for payload in (ids[:-1], ids + [ids[0]], ids[:-1] + [self.lecture.id + 999]):
+            response = self.client.post(self.section_url, {"ids": payload}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+
+    def test_only_instructors_can_reorder(self):
+        self.client.force_authenticate(self.student)
+        ids = [lecture.id for lecture in self.lectures]
+        response = self.client.post(self.lecture_url, {"ids": ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ChunkedUploadTestCase(APITestCase):
+    """Test resumable chunked uploads of lecture files"""
+
+    def setUp(self):
+        CurriculumAPITestCase.setUp(self)
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = self.settings(
+            MEDIA_ROOT=media.name,
+            CHUNKED_UPLOAD_DIR=Path(media.name) / 'partial',
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.data = bytes(range(256)) * 1000
+        self.create_url = reverse("course:upload-create", args=[self.lecture.id])
+        self.client.force_authenticate(self.instructor)
+
+    def open_session(self, **extra):
+        payload = {"field": "file", "filename": "../slides.pdf", "size": len(self.data)}
+        payload.update(extra)
+        response = self.client.post(self.create_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data['id']
+
+    def put_chunk(self, upload_id, first, last):
+        return self.client.put(
+            reverse("course:upload-detail", args=[upload_id]),
+            self.data[first:last + 1],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {first}-{last}/{len(self.data)}',
+        )
+
+    def finalize(self, upload_id, **payload):
+        return self.client.post(
+            reverse("course:upload-finalize", args=[upload_id]), payload, format='json'
+        )
+
+    def test_chunks_are_assembled_and_attached(self):
+        upload_id = self.open_session(sha256=hashlib.sha256(self.data).hexdigest())
+        for first in range(0, len(self.data), 100000):
+            response = self.put_chunk(upload_id, first, min(first + 99999, len(self.data) - 1))
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['received'], len(self.data))
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['status'], 'complete')
+
+        self.lecture.refresh_from_db()
+        self.assertEqual(self.lecture.content_type, 'file')
+        self.assertFalse(self.lecture.video)
+        self.assertTrue(self.lecture.file.name.endswith('.pdf'))
+        with self.lecture.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertFalse(uploads.partial_path(UploadSession.objects.get(pk=upload_id)).exists())
+
+    def test_uploading_stored_content_again_reuses_the_blob(self):
+        other = Lecture.objects.create(section=self.section, title="Handout", order=2,
+                                       duration=0, content_type="article", article="Notes")
+        names = []
+        for lecture in (self.lecture, other):
+            self.create_url = reverse("course:upload-create", args=[lecture.id])
+            upload_id = self.open_session()
+            self.put_chunk(upload_id, 0, len(self.data) - 1)
+            self.assertEqual(self.finalize(upload_id).status_code, status.HTTP_200_OK)
+            self.assertFalse(uploads.partial_path(UploadSession.objects.get(pk=upload_id)).exists())
+            lecture.refresh_from_db()
+            names.append(lecture.file.name)
+        self.assertEqual(names[0], names[1])
+        self.assertEqual(MediaBlob.objects.get(name=names[0]).ref_count, 2)
+
+    def test_resume_from_reported_offset(self):
+        """Test a chunk not starting at the offset is refused and the digest survives a new worker"""
+        upload_id = self.open_session()
+        self.put_chunk(upload_id, 0, 99999)
+
+        response = self.put_chunk(upload_id, 50000, 149999)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], 100000)
+
+        response = self.client.get(reverse("course:upload-detail", args=[upload_id]))
+        self.assertEqual(response.data['received'], 100000)
+
+        uploads._digests.clear()
+        self.put_chunk(upload_id, 100000, len(self.data) - 1)
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['sha256'], hashlib.sha256(self.data).hexdigest())
+
+    def test_finalize_requires_every_byte(self):
+        upload_id = self.open_session()
+        self.put_chunk(upload_id, 0, 99)
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_digest_mismatch_restarts_upload(self):
+        upload_id = self.open_session(sha256='0' * 64)
+        self.put_chunk(upload_id, 0, len(self.data) - 1)
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).received, 0)
+        self.lecture.refresh_from_db()
+        self.assertEqual(self.lecture.content_type, 'video')
+
+    def test_invalid_lecture_keeps_upload(self):
+        """Test a video without duration is rejected before the file is moved"""
+        Lecture.objects.filter(pk=self.lecture.pk).update(duration=0)
+        upload_id = self.open_session(field='video')
+        self.put_chunk(upload_id, 0, len(self.data) - 1)
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(uploads.partial_path(UploadSession.objects.get(pk=upload_id)).exists())
+
+        response = self.finalize(upload_id, duration=30)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+    def test_only_instructor_uploads(self):
+        upload_id = self.open_session()
+        self.client.force_authenticate(self.student)
+        response = self.client.post(
+            self.create_url, {"field": "file", "filename": "x.pdf", "size": 10}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.put_chunk(upload_id, 0, 99)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_removed_instructor_cannot_continue(self):
+        """Test the owner of a session loses it with the course"""
+        upload_id = self.open_session()
+        self.put_chunk(upload_id, 0, len(self.data) - 1)
+        self.course.instructor.remove(self.instructor)
+
+        response = self.put_chunk(upload_id, 0, 99)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).status, 'open')
+
+    def test_open_sessions_per_lecture_are_capped(self):
+        """Test expired sessions do not count against CHUNKED_UPLOAD_MAX_OPEN"""
+        with self.settings(CHUNKED_UPLOAD_MAX_OPEN=2, CHUNKED_UPLOAD_EXPIRY=3600):
+            first = self.open_session()
+            self.open_session()
+            response = self.client.post(
+                self.create_url, {"field": "file", "filename": "x.pdf", "size": 10}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+            UploadSession.objects.filter(pk=first).update(
+                updated_at=timezone.now() - timedelta(hours=2)
+            )
+            self.open_session()
+
+    def test_expire_uploads_deletes_abandoned_sessions(self):
+        abandoned = self.open_session()
+        self.put_chunk(abandoned, 0, 99)
+        active = self.open_session()
+        self.put_chunk(active, 0, 99)
+        UploadSession.objects.filter(pk=abandoned).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        partial = uploads.partial_path(UploadSession.objects.get(pk=abandoned))
+
+        out = StringIO()
+        call_command('expire_uploads', '--expiry', '86400', '--batch-size', '1', stdout=out)
+        self.assertIn('Deleted 1 expired uploads', out.getvalue())
+        self.assertFalse(UploadSession.objects.filter(pk=abandoned).exists())
+        self.assertFalse(partial.exists())
+        self.assertTrue(uploads.partial_path(UploadSession.objects.get(pk=active)).exists())
+
+    def test_running_digests_of_expired_sessions_are_dropped(self):
+        """Test a worker forgets the digests of sessions idle past the expiry"""
+        abandoned = uuid.UUID(self.open_session())
+        self.put_chunk(abandoned, 0, 99)
+        self.assertIn(abandoned, uploads._digests)
+        with self.settings(CHUNKED_UPLOAD_EXPIRY=0):
+            self.put_chunk(self.open_session(), 0, 99)
+        self.assertNotIn(abandoned, uploads._digests)
+
+
+class LectureMediaTestCase(APITestCase):
+    """Test streaming lecture media with Range requests"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        CurriculumAPITestCase.setUp(self)
+        self.data = b"file_content"
+        self.url = reverse("course:lecture-media", args=[self.lecture.id])
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.client.force_authenticate(self.student)
+
+    def content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_range_request_returns_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(self.content(response), self.data[2:6])
+        self.assertEqual(response["Content-Range"], f"bytes 2-5/{len(self.data)}")
+        self.assertEqual(response["Content-Length"], "4")
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-3")
+        self.assertEqual(self.content(response), self.data[-3:])
+
+    def test_full_file_without_range(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(self.content(response), self.data)
+
+    def test_stale_if_range_sends_full_file(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.content(response), self.data)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-")
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_access_check_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_RANGE="bytes=0-0")
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+    def test_only_enrolled_or_preview(self):
+        Enrollment.objects.filter(student=self.student).update(is_active=False)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        Lecture.objects.filter(pk=self.lecture.pk).update(is_preview=True)
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_offload_to_web_server(self):
+        with self.settings(MEDIA_DELIVERY="x-accel-redirect"):
+            response = self.client.get(self.url, HTTP_RANGE="bytes=0-1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.lecture.video.name}")
+        self.assertEqual(response["Content-Type"], "video/mp4")
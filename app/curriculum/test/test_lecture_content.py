@@ -0,0 +1,147 @@
+"""
+Tests for deferred lecture article loading
+"""
+import gzip
+from unittest import mock
+
+from django.db import connection
+from django.db.backends import utils
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.fields import GZIP_MAGIC
+from core.models import Enrollment, Lecture
+from curriculum.test import test_curriculum_api
+
+ARTICLE_SIZE = 200000
+# ids, titles, orders and file names of a handful of rows
+SMALL_RESPONSE_BYTES = 20000
+
+
+class BytesReadContext(CaptureQueriesContext):
+    """Size of the column values fetched from the database inside the block"""
+
+    def __init__(self):
+        super().__init__(connection)
+        self.bytes_read = 0
+
+    def count(self, rows):
+        for row in rows:
+            for value in row:
+                if isinstance(value, (str, bytes, memoryview)):
+                    self.bytes_read += len(value)
+                elif value is not None:
+                    self.bytes_read += 8
+        return rows
+
+    def __enter__(self):
+        context = self
+
+        class CountingCursor(utils.CursorDebugWrapper):
+            def fetchone(self):
+                row = self.cursor.fetchone()
+                if row is not None:
+                    context.count([row])
+                return row
+
+            def fetchmany(self, *args):
+                return context.count(self.cursor.fetchmany(*args))
+
+            def fetchall(self):
+                return context.count(self.cursor.fetchall())
+
+            def __iter__(self):
+                for row in self.cursor:
+                    context.count([row])
+                    yield row
+
+        self.patcher = mock.patch.object(utils, 'CursorDebugWrapper', CountingCursor)
+        self.patcher.start()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        self.patcher.stop()
+
+
+class LectureContentTestCase(APITestCase):
+    """Test article bodies are only read by the content endpoint"""
+
+    def setUp(self):
+        test_curriculum_api.CurriculumAPITestCase.setUp(self)
+        self.article = "x" * ARTICLE_SIZE
+        self.articles = [
+            Lecture.objects.create(section=self.section, title=f"Reading {order}", order=order,
+                                   duration=60, content_type="article", article=self.article)
+            for order in range(2, 6)
+        ]
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.content_url = reverse("course:lecture-content", args=[self.articles[0].id])
+
+    def read(self, method, url):
+        with BytesReadContext() as context:
+            response = getattr(self.client, method)(url)
+        return response, context.bytes_read
+
+    def test_curriculum_does_not_read_articles(self):
+        self.client.force_authenticate(self.student)
+        response, bytes_read = self.read('get', self.curriculum_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLess(bytes_read, SMALL_RESPONSE_BYTES)
+
+    def test_lecture_detail_does_not_read_article(self):
+        self.client.force_authenticate(self.instructor)
+        url = reverse("course:lecture-detail", args=[self.section.id, self.articles[0].id])
+        response, bytes_read = self.read('get', url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('article', response.data)
+        self.assertLess(bytes_read, SMALL_RESPONSE_BYTES)
+
+    def test_marking_complete_does_not_read_article(self):
+        self.client.force_authenticate(self.student)
+        url = reverse("course:mark-lecture-complete", args=[self.articles[0].id])
+        response, bytes_read = self.read('post', url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLess(bytes_read, SMALL_RESPONSE_BYTES)
+
+    def test_content_endpoint_reads_article(self):
+        self.client.force_authenticate(self.student)
+        response, bytes_read = self.read('get', self.content_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['article'], self.article)
+        # the body is read as stored, gzip compressed
+        stored = Lecture._meta.get_field('article').stored_value(
+            Lecture.objects.with_content().get(pk=self.articles[0].pk)
+        )
+        self.assertGreaterEqual(bytes_read, len(stored.stored))
+
+    def test_content_as_text_sends_stored_gzip(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get(self.content_url, {'format': 'text'},
+                                   HTTP_ACCEPT_ENCODING='br, gzip;q=0.8')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response.content[:2], GZIP_MAGIC)
+        self.assertEqual(gzip.decompress(response.content).decode(), self.article)
+
+    def test_content_as_text_without_gzip(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get(self.content_url, HTTP_ACCEPT='text/plain',
+                                   HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content.decode(), self.article)
+
+    def test_content_requires_enrollment_or_preview(self):
+        Enrollment.objects.filter(student=self.student).delete()
+        self.client.force_authenticate(self.student)
+        response = self.client.get(self.content_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        Lecture.objects.filter(pk=self.articles[0].pk).update(is_preview=True)
+        self.client.force_authenticate(None)
+        response = self.client.get(self.content_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,160 @@
+"""
+Tests for measuring lecture video durations
+"""
+import struct
+import tempfile
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from rest_framework.test import APITestCase
+
+from core.models import Course, Lecture
+from courses import cache as search_cache
+from curriculum import durations, mediaprobe
+from curriculum.test import test_curriculum_api
+
+
+class BrokenPool:
+    """Pool whose process crashed"""
+
+    def __init__(self, **kwargs):
+        self.running = True
+
+    def submit(self, *args):
+        raise BrokenProcessPool('A process in the pool was terminated abruptly')
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.running = False
+
+
+def box(kind, payload):
+    return struct.pack('>I4s', len(payload) + 8, kind) + payload
+
+
+def mp4(timescale, duration, version=0):
+    if version == 1:
+        mvhd = bytes([1, 0, 0, 0]) + struct.pack('>QQIQ', 0, 0, timescale, duration)
+    else:
+        mvhd = bytes(4) + struct.pack('>IIII', 0, 0, timescale, duration)
+    # media data before the movie header, as written by most encoders
+    return (box(b'ftyp', b'isom\x00\x00\x02\x00') + box(b'mdat', bytes(1000))
+            + box(b'moov', box(b'mvhd', mvhd + bytes(80))))
+
+
+def ebml(element_id, payload):
+    return element_id + bytes([0x80 | len(payload)]) + payload
+
+
+def webm(milliseconds):
+    info = (ebml(b'\x2a\xd7\xb1', (1000000).to_bytes(3, 'big'))
+            + ebml(b'\x44\x89', struct.pack('>d', milliseconds)))
+    segment_unknown_size = b'\x01\xff\xff\xff\xff\xff\xff\xff'
+    return (ebml(b'\x1a\x45\xdf\xa3', ebml(b'\x42\x82', b'webm'))
+            + b'\x18\x53\x80\x67' + segment_unknown_size
+            + ebml(b'\x11\x4d\x9b\x74', bytes(10))
+            + ebml(b'\x15\x49\xa9\x66', info)
+            + b'\x1f\x43\xb6\x75' + segment_unknown_size)
+
+
+class MediaProbeTests(APITestCase):
+    """Test parsing container durations"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write(self, name, data):
+        path = self.directory / name
+        path.write_bytes(data)
+        return str(path)
+
+    def test_mp4_movie_header(self):
+        self.assertEqual(mediaprobe.media_duration(self.write('a.mp4', mp4(1000, 125400))), 125.4)
+        self.assertEqual(
+            mediaprobe.media_duration(self.write('b.mp4', mp4(90000, 90000 * 61, version=1))), 61
+        )
+
+    def test_webm_segment_info(self):
+        self.assertEqual(mediaprobe.media_duration(self.write('a.webm', webm(90500.0))), 90.5)
+
+    def test_other_files_have_no_duration(self):
+        for name, data in (('a.pdf', b'%PDF-1.4 ...'), ('b.mp4', b''), ('c.mp4', box(b'ftyp', b'isom'))):
+            self.assertIsNone(mediaprobe.media_duration(self.write(name, data)), name)
+
+    def test_pool_measures_files(self):
+        self.addCleanup(self.shutdown_pool)
+        path = self.write('a.mp4', mp4(1000, 2000))
+        future = durations.get_pool().submit(mediaprobe.durations_of, {7: path})
+        self.assertEqual(future.result(timeout=60), {7: 2.0})
+
+    def shutdown_pool(self):
+        durations.get_pool().shutdown()
+        durations._pool = None
+
+
+class LectureDurationTests(APITestCase):
+    """Test measured durations replace the entered ones after commit"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name, MEDIA_DURATION_WORKERS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            test_curriculum_api.CurriculumAPITestCase.setUp(self)
+
+    def test_new_video_is_measured(self):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            lecture = Lecture.objects.create(
+                section=self.section, title="Deep dive", order=2, duration=10,
+                content_type="video", video=SimpleUploadedFile("deep.mp4", mp4(1000, 125400)),
+            )
+        lecture.refresh_from_db()
+        self.assertEqual(lecture.duration, 125)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).total_duration, 50 + 125)
+
+    def test_unchanged_video_is_not_measured_again(self):
+        lecture = Lecture.objects.get(pk=self.lecture.pk)
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            lecture.title = "Renamed"
+            lecture.save()
+        self.assertFalse([
+            callback for callback in callbacks
+            if getattr(callback, 'handler', None) is durations.measure
+        ])
+
+    def test_measured_duration_moves_the_catalog_version(self):
+        """Test cached searches do not keep the entered total duration"""
+        version = search_cache.get_catalog_version()
+        self.assertEqual(durations.write_durations({self.lecture.pk: 125.0}), 1)
+        self.assertGreater(search_cache.get_catalog_version(), version)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).total_duration, 125)
+
+    def test_broken_pool_is_replaced(self):
+        """Test a failed submit is logged and retried on a new pool"""
+        self.addCleanup(setattr, durations, '_pool', None)
+        broken = durations._pool = BrokenPool()
+        with self.settings(MEDIA_DURATION_WORKERS=1), \
+                mock.patch.object(durations, 'ProcessPoolExecutor', BrokenPool), \
+                self.assertLogs('curriculum.durations', 'ERROR') as logs:
+            self.assertIsNone(durations.measure([self.lecture.pk]))
+        self.assertEqual(len(logs.records), 2)
+        self.assertFalse(broken.running)
+        self.assertIsNone(durations._pool)
+
+    def test_pool_broken_while_measuring_is_discarded(self):
+        self.addCleanup(setattr, durations, '_pool', None)
+        pool = durations._pool = BrokenPool()
+        future = Future()
+        future.set_exception(BrokenProcessPool('A process in the pool was terminated abruptly'))
+        with self.assertLogs('curriculum.durations', 'ERROR'):
+            durations._write_back(threading.get_ident(), pool, future)
+        self.assertFalse(pool.running)
+        self.assertIsNone(durations._pool)
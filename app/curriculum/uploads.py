@@ -0,0 +1,237 @@
+"""
+Resumable chunked uploads of lecture videos and files.
+
+A client opens an UploadSession for one lecture field and the total size,
+then PUTs the file in consecutive chunks whose Content-Range starts at the
+session's offset. Each chunk is streamed from the request to a partial file
+in READ_SIZE pieces, so memory stays bounded whatever the chunk size, and
+fed to a SHA-256 digest on the way. An interrupted chunk is sent again from
+the offset the session reports; its bytes already on disk are truncated.
+
+Running digests are kept in process memory keyed by session and offset. A
+worker that did not receive the previous chunk rebuilds the digest by
+reading the partial file once, again in READ_SIZE pieces.
+
+A session receiving no chunk for CHUNKED_UPLOAD_EXPIRY seconds is expired:
+it no longer counts against the CHUNKED_UPLOAD_MAX_OPEN open sessions of its
+lecture, its running digest is dropped by the worker holding it, and the
+expire_uploads command deletes it with its partial file.
+
+Finalizing moves the partial file into the lecture's storage (a rename on
+the same filesystem, nothing when DedupStorage already holds the content)
+and saves the lecture in one transaction.
+"""
+import fcntl
+import hashlib
+import os
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import File
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Lecture, UploadSession
+
+READ_SIZE = 64 * 1024
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+CONTENT_FIELDS = ('video', 'article', 'file')
+
+# session id -> (offset, sha256 of the first offset bytes, monotonic time stored)
+_digests = {}
+
+
+class UploadError(Exception):
+    """Chunk rejected, `conflict` when it does not continue the session"""
+
+    def __init__(self, message, conflict=False):
+        super().__init__(message)
+        self.conflict = conflict
+
+
+class AssembledFile(File):
+    """
+    Finished partial file, moved rather than copied by FileSystemStorage,
+    with its digest so DedupStorage does not read it again
+    """
+
+    def __init__(self, path, size, sha256=None):
+        super().__init__(None, os.path.basename(path))
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def expiry():
+    """Seconds an open session may go without a chunk"""
+    return getattr(settings, 'CHUNKED_UPLOAD_EXPIRY', 24 * 3600)
+
+
+def live_sessions():
+    """Open sessions that received a chunk, or were opened, within the expiry"""
+    return UploadSession.objects.filter(
+        status='open', updated_at__gte=timezone.now() - timedelta(seconds=expiry())
+    )
+
+
+def upload_dir():
+    return Path(getattr(settings, 'CHUNKED_UPLOAD_DIR', Path('uploads')))
+
+
+def partial_path(session):
+    return upload_dir() / f'{session.pk}.part'
+
+
+def parse_content_range(header):
+    """(first, last, total) byte positions of a 'bytes first-last/total' header"""
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range header "bytes first-last/total" is required.')
+    first, last, total = (int(value) for value in match.groups())
+    if last < first:
+        raise UploadError('Content-Range last byte is before its first byte.')
+    return first, last, total
+
+
+def _digest_at(session, offset, partial):
+    """SHA-256 of the first `offset` bytes, from memory or the partial file"""
+    cached = _digests.pop(session.pk, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+    digest = hashlib.sha256()
+    partial.seek(0)
+    remaining = offset
+    while remaining:
+        data = partial.read(min(READ_SIZE, remaining))
+        if not data:
+            break
+        digest.update(data)
+        remaining -= len(data)
+    return digest
+
+
+def _remember(session, digest):
+    """Keep the running digest of a session, dropping those of expired ones"""
+    now = time.monotonic()
+    for pk, cached in list(_digests.items()):
+        if now - cached[2] > expiry():
+            _digests.pop(pk, None)
+    _digests[session.pk] = (session.received, digest, now)
+
+
+def write_chunk(session, stream, first, last):
+    """
+    Append bytes first..last read from `stream` to the partial file of an
+    open session and advance its offset. Returns the new offset.
+    """
+    length = last - first + 1
+    if last >= session.size:
+        raise UploadError('Chunk ends past the declared upload size.')
+
+    path = partial_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as partial:
+        try:
+            fcntl.flock(partial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Another chunk of this upload is being written.', conflict=True)
+        # the offset may have moved while this request waited for the lock
+        session.refresh_from_db(fields=['received', 'status'])
+        if session.status != 'open':
+            raise UploadError('This upload is already finalized.', conflict=True)
+        if first != session.received:
+            raise UploadError(f'Chunk must start at byte {session.received}.', conflict=True)
+
+        digest = _digest_at(session, first, partial)
+        partial.truncate(first)
+        partial.seek(first)
+        remaining = length
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                raise UploadError('Request body is shorter than its Content-Range.')
+            partial.write(data)
+            digest.update(data)
+            remaining -= len(data)
+        partial.flush()
+
+        UploadSession.objects.filter(pk=session.pk).update(
+            received=last + 1, updated_at=timezone.now()
+        )
+        session.received = last + 1
+        _remember(session, digest)
+    return session.received
+
+
+def digest(session):
+    """Hex SHA-256 of everything received so far"""
+    with open(partial_path(session), 'rb') as partial:
+        running = _digest_at(session, session.received, partial)
+    _remember(session, running)
+    return running.hexdigest()
+
+
+def discard(session):
+    """Remove the partial file and digest of a session"""
+    _digests.pop(session.pk, None)
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def restart(session):
+    """Drop the received bytes, the client uploads again from offset 0"""
+    discard(session)
+    UploadSession.objects.filter(pk=session.pk).update(received=0, updated_at=timezone.now())
+    session.received = 0
+
+
+def attach(session, checksum, duration=None):
+    """
+    Move the finished file into the lecture's `session.field` and make it the
+    lecture's only content. Raises django ValidationError, leaving the partial
+    file in place, when the lecture would be invalid.
+    """
+    path = partial_path(session)
+    moved = False
+    try:
+        with transaction.atomic():
+            lecture = Lecture.objects.select_for_update().get(pk=session.lecture_id)
+            lecture.content_type = session.field
+            for name in CONTENT_FIELDS:
+                setattr(lecture, name, None)
+            if duration is not None:
+                lecture.duration = duration
+
+            # validate with the bare name before anything is moved
+            setattr(lecture, session.field, session.filename)
+            lecture.full_clean()
+
+            fieldfile = getattr(lecture, session.field)
+            fieldfile.save(session.filename, AssembledFile(str(path), session.size, checksum), save=False)
+            moved = True
+            try:
+                lecture.save()
+                session.status = 'complete'
+                session.sha256 = checksum
+                session.save(update_fields=['status', 'sha256', 'updated_at'])
+            except Exception:
+                fieldfile.storage.delete(fieldfile.name)
+                raise
+    except Exception:
+        if moved:
+            # the partial file is gone with the deleted copy
+            restart(session)
+        raise
+    # left in place when the content was already stored
+    discard(session)
+    return lecture
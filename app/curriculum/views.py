@@ -1,16 +1,28 @@
 """
 Course API Views
 """
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
-from curriculum import serializers
-from core.models import Lecture, Section, Course
-from rest_framework.authentication import TokenAuthentication
-from rest_framework import generics
+from curriculum import articles, media, ordering, serializers, snapshot, uploads
+from core.models import Lecture, Section, Course, UploadSession
+from core.signal.signals import schedule_progress_recalculation
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from curriculum.permissions import (IsLectureInstructor,
                          IsSectionLectureInstructor,
                          IsSectionInstructor,
-                         IsCourseInstructor)
+                         IsCourseInstructor,
+                         IsUploadInstructor)
 
 class LectureCreateView(generics.CreateAPIView):
     """
@@ -87,11 +99,251 @@ class SectionDetailView(generics.RetrieveUpdateDestroyAPIView):
         return context
 
 
+class CurriculumImportView(generics.CreateAPIView):
+    """
+    POST /curriculum/{course_id}/import
+    Create or update many sections and lectures of a course in one
+    transaction, body: {"sections": [{"title", "order", "lectures": [...]}]}
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsCourseInstructor]
+    serializer_class = serializers.CurriculumImportSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['course_id'] = self.kwargs.get('course_id')
+        return context
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            result = serializer.save()
+            course_id = result['course'].id
+            # bulk writes skip the signals scheduling these after commit
+            snapshot.rebuild_after_commit([course_id])
+            if result['lectures_created']:
+                schedule_progress_recalculation([course_id])
+
+
+class ReorderView(generics.GenericAPIView):
+    """
+    Apply a desired id order in one bulk update of gapped order values,
+    only the rows that have to move are written (see curriculum/ordering.py).
+    Subclasses name the reordered model, its parent and the URL kwarg of the parent.
+    """
+    authentication_classes = [TokenAuthentication]
+    serializer_class = serializers.ReorderSerializer
+    model = None
+    # foreign key of `model` to the parent whose rows are reordered
+    parent_field = None
+    parent_model = None
+    parent_kwarg = None
+    # attribute of the parent holding its course id
+    parent_course_attr = None
+
+    def get_queryset(self):
+        return self.model.objects.filter(**{self.parent_field: self.kwargs[self.parent_kwarg]})
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['current'] = {row_id: row.order for row_id, row in self.rows.items()}
+        return context
+
+    def post(self, request, *args, **kwargs):
+        parent = get_object_or_404(self.parent_model, id=self.kwargs[self.parent_kwarg])
+        self.rows = {row.id: row for row in self.get_queryset().only('id', 'order')}
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        ids = serializer.validated_data['ids']
+        changes = ordering.plan_reorder(serializer.context['current'], ids)
+        for row_id, order in changes.items():
+            self.rows[row_id].order = order
+        with transaction.atomic():
+            self.model.objects.bulk_update(
+                [self.rows[row_id] for row_id in changes], ['order'], batch_size=500
+            )
+            # bulk_update skips the signals rebuilding the curriculum
+            snapshot.rebuild_after_commit([getattr(parent, self.parent_course_attr)])
+        return Response({'ids': ids, 'updated': len(changes)})
+
+
+class SectionReorderView(ReorderView):
+    """
+    POST /{course_id}/sections/reorder
+    body: {"ids": [section ids in the desired order]}
+    """
+    permission_classes = [IsCourseInstructor]
+    model = Section
+    parent_field = 'course'
+    parent_model = Course
+    parent_kwarg = 'course_id'
+    parent_course_attr = 'id'
+
+
+class LectureReorderView(ReorderView):
+    """
+    POST /section/{section_id}/lectures/reorder
+    body: {"ids": [lecture ids in the desired order]}
+    """
+    permission_classes = [IsSectionLectureInstructor]
+    model = Lecture
+    parent_field = 'section'
+    parent_model = Section
+    parent_kwarg = 'section_id'
+    parent_course_attr = 'course_id'
+
+
+class LectureContentView(generics.RetrieveAPIView):
+    """
+    GET /lectures/{lecture_id}/content
+    Article body of a lecture, the one read that loads it (see LectureManager);
+    previews for everyone, other lectures for enrolled students and instructors.
+    As text/plain (?format=text) the stored gzip body is sent with
+    Content-Encoding: gzip to clients accepting it
+    """
+    authentication_classes = [SessionAuthentication, TokenAuthentication]
+    permission_classes = [AllowAny]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [articles.ArticleTextRenderer]
+    serializer_class = serializers.LectureContentSerializer
+    lookup_url_kwarg = 'lecture_id'
+
+    def get_queryset(self):
+        return (Lecture.objects.filter(content_type='article')
+                .with_content().with_access(self.request.user))
+
+    def get_object(self):
+        lecture = super().get_object()
+        if not (lecture.is_preview or lecture.enrolled or lecture.teaches):
+            raise PermissionDenied("Enroll in the course to read this lecture.")
+        return lecture
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != articles.ArticleTextRenderer.format:
+            return super().retrieve(request, *args, **kwargs)
+        return articles.serve(request, self.get_object())
+
+
+class UploadSessionCreateView(generics.CreateAPIView):
+    """
+    POST /lectures/{lecture_id}/uploads
+    Open a resumable upload of the lecture's video or file,
+    body: {"field": "video"|"file", "filename", "size", "sha256" (optional),
+    at most CHUNKED_UPLOAD_MAX_OPEN unexpired open sessions per lecture
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsLectureInstructor]
+    serializer_class = serializers.UploadSessionSerializer
+
+    def perform_create(self, serializer):
+        lecture = get_object_or_404(Lecture, id=self.kwargs['lecture_id'])
+        max_open = getattr(settings, 'CHUNKED_UPLOAD_MAX_OPEN', 3)
+        if uploads.live_sessions().filter(lecture=lecture).count() >= max_open:
+            raise ValidationError(
+                {'detail': f'This lecture already has {max_open} open uploads, '
+                           'finish them or wait for them to expire.'}
+            )
+        serializer.save(lecture=lecture, owner=self.request.user)
+
+
+class UploadSessionView(generics.RetrieveAPIView):
+    """
+    GET /uploads/{upload_id}
+    Offset (`received`) to resume from
+    PUT /uploads/{upload_id}
+    Raw chunk bytes with Content-Range: bytes {first}-{last}/{size},
+    first must equal the current offset (409 Conflict otherwise)
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsUploadInstructor]
+    serializer_class = serializers.UploadSessionSerializer
+    lookup_url_kwarg = 'upload_id'
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+
+    def put(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            if session.status != 'open':
+                raise uploads.UploadError('This upload is already finalized.', conflict=True)
+            first, last, total = uploads.parse_content_range(request.headers.get('Content-Range'))
+            if total != session.size:
+                raise uploads.UploadError(f'Content-Range total must be {session.size}.')
+            # read from the request stream, request.data would buffer the body
+            uploads.write_chunk(session, request._request, first, last)
+        except uploads.UploadError as error:
+            return Response(
+                {'detail': str(error), 'received': session.received},
+                status=status.HTTP_409_CONFLICT if error.conflict else status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(self.get_serializer(session).data)
+
+
+class UploadFinalizeView(generics.GenericAPIView):
+    """
+    POST /uploads/{upload_id}/finalize
+    Attach the completely received file to the lecture, body: {"duration"} (optional)
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsUploadInstructor]
+    serializer_class = serializers.UploadFinalizeSerializer
+    lookup_url_kwarg = 'upload_id'
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        session = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if session.status != 'open' or session.received != session.size:
+            return Response(
+                {'detail': 'Upload is finalized or not completely received.',
+                 'received': session.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        checksum = uploads.digest(session)
+        if session.sha256 and checksum != session.sha256:
+            uploads.restart(session)
+            raise ValidationError({'sha256': 'Uploaded data does not match the digest, upload it again.'})
+        try:
+            uploads.attach(session, checksum, serializer.validated_data.get('duration'))
+        except DjangoValidationError as error:
+            raise ValidationError(error.message_dict)
+        return Response(serializers.UploadSessionSerializer(session).data)
+
+
+class LectureMediaView(generics.GenericAPIView):
+    """
+    GET /lectures/{lecture_id}/media
+    Video or file of a lecture for enrolled students, instructors and, for
+    previews, everyone; honours Range (206 Partial Content)
+    """
+    # session cookies let <video> elements authenticate
+    authentication_classes = [SessionAuthentication, TokenAuthentication]
+    permission_classes = [AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # the response is the file itself, whatever the Accept header
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, *args, **kwargs):
+        playable = media.playable_media(request.user, self.kwargs['lecture_id'])
+        if playable is None:
+            raise Http404
+        values, allowed = playable
+        if not allowed:
+            raise PermissionDenied("Enroll in the course to watch this lecture.")
+        return media.serve(request, media.media_file(values))
+
+
 class CurriculumViews(generics.RetrieveAPIView):
     """
     GET /courses/{id}/curriculum/
     Retrieve complete curriculum structure for a course
-    Lecture shows ID only
+    Lecture shows ID only. Served from the stored snapshot with a strong
+    ETag and Last-Modified, revalidation answers 304 Not Modified.
     """
     # permission_classes = [IsCourseInstructor]
     # authentication_classes = [TokenAuthentication]
@@ -99,12 +351,17 @@ class CurriculumViews(generics.RetrieveAPIView):
     lookup_url_kwarg = 'course_id'
     queryset = Course.objects.all()
 
-    def get_object(self):
-        """Get course with prefetched curriculum data"""
-        course_id = self.kwargs['course_id']
-        return get_object_or_404(
-            Course.objects.prefetch_related(
-                'sections__lectures'
-            ),
-            id=course_id
-        )
+    def retrieve(self, request, *args, **kwargs):
+        curriculum = snapshot.get_snapshot(self.kwargs['course_id'])
+        if curriculum is None:
+            raise Http404
+        etag = f'"{curriculum.etag}"'
+        last_modified = int(curriculum.built_at.timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(curriculum.payload, content_type='application/json')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        return response
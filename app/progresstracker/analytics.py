@@ -0,0 +1,103 @@
+"""
+Per-course progress analytics for instructors.
+
+Every figure is a grouped aggregate in the database: the completion
+histogram is one conditional COUNT over the course's CourseProgress rows,
+the median reads the one or two middle rows ordered by percentage, and the
+per-lecture counts are one GROUP BY over LectureProgress. Results are cached
+for PROGRESS_ANALYTICS_CACHE_TIMEOUT seconds and dropped once progress writes
+commit (see progresstracker/signals.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+
+from core.models import CourseProgress, Lecture
+
+# (label, lowest, highest percentage), both inclusive
+BUCKETS = (
+    ('0', 0, 0),
+    ('1-25', 0.01, 25),
+    ('26-50', 25.01, 50),
+    ('51-75', 50.01, 75),
+    ('76-99', 75.01, 99.99),
+    ('100', 100, 100),
+)
+
+
+def cache_key(course_id):
+    return f'progress-analytics:{course_id}'
+
+
+def invalidate(*course_ids):
+    """Drop the cached analytics of the given courses"""
+    cache.delete_many([cache_key(course_id) for course_id in course_ids if course_id])
+
+
+def invalidate_lectures(lecture_ids):
+    """Drop the cached analytics of the courses owning the given lectures"""
+    invalidate(*set(
+        Lecture.objects.filter(pk__in=lecture_ids).values_list('section__course_id', flat=True)
+    ))
+
+
+def get_course_analytics(course_id):
+    """Cached analytics of one course"""
+    key = cache_key(course_id)
+    data = cache.get(key)
+    if data is None:
+        data = compute_course_analytics(course_id)
+        cache.set(key, data, getattr(settings, 'PROGRESS_ANALYTICS_CACHE_TIMEOUT', 60))
+    return data
+
+
+def compute_course_analytics(course_id):
+    progress = CourseProgress.objects.filter(course_id=course_id).order_by()
+    summary = progress.aggregate(
+        students=Count('id'),
+        average=Avg('progress_percentage'),
+        **{
+            f'bucket_{label}': Count('id', filter=Q(
+                progress_percentage__gte=lowest, progress_percentage__lte=highest
+            ))
+            for label, lowest, highest in BUCKETS
+        }
+    )
+    students = summary['students']
+
+    lectures = Lecture.objects.filter(section__course_id=course_id).annotate(
+        started=Count('progress_records'),
+        completed=Count('progress_records', filter=Q(progress_records__is_completed=True)),
+    ).order_by('section__order', 'order').values(
+        'id', 'title', 'section_id', 'started', 'completed'
+    )
+    lecture_rows = []
+    previous = None
+    for lecture in lectures:
+        lecture['completion_rate'] = round(lecture['completed'] * 100 / students, 2) if students else 0.0
+        # students who completed the previous lecture but not this one, at most
+        lecture['drop_off'] = max(previous - lecture['completed'], 0) if previous is not None else 0
+        previous = lecture['completed']
+        lecture_rows.append(lecture)
+
+    return {
+        'course': course_id,
+        'students': students,
+        'average_percentage': round(float(summary['average'] or 0), 2),
+        'median_percentage': _median(progress, students),
+        'histogram': [
+            {'bucket': label, 'students': summary[f'bucket_{label}']}
+            for label, lowest, highest in BUCKETS
+        ],
+        'lectures': lecture_rows,
+    }
+
+
+def _median(progress, students):
+    if not students:
+        return 0.0
+    middle = list(
+        progress.order_by('progress_percentage')
+        .values_list('progress_percentage', flat=True)[(students - 1) // 2:students // 2 + 1]
+    )
+    return round(float(sum(middle)) / len(middle), 2)
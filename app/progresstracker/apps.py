@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProgresstrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'progresstracker'
+
+    def ready(self):
+        import progresstracker.signals  # noqa
@@ -0,0 +1,203 @@
+"""
+Write-behind buffer for playback heartbeats.
+
+Players report their position about every ten seconds per viewer. Writing
+each report would mean one UPDATE per heartbeat, so positions are
+coalesced in memory per (student, lecture) instead. Only the latest
+position and the furthest one reached are kept. The buffer is written
+with bulk_create/bulk_update once it holds HEARTBEAT_FLUSH_SIZE keys or
+HEARTBEAT_FLUSH_INTERVAL seconds after the first buffered heartbeat.
+
+A lecture is completed once the furthest position reaches
+HEARTBEAT_COMPLETE_FRACTION of its duration, and the CourseProgress
+counter is shifted like for an explicit mark-complete.
+
+The buffer lives per worker process, so a crash loses at most one flush
+interval of positions. Granted access checks are cached per process for
+HEARTBEAT_ACCESS_TTL seconds, refusals are not, so a student who enrolls
+is accepted on the next heartbeat and a revoked enrollment stops being
+tracked within the TTL. Flushes read lecture durations afresh.
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Lecture, LectureProgress, CourseProgress
+from progresstracker import analytics
+
+MAX_ACCESS_ENTRIES = 100000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class HeartbeatBuffer:
+    """Latest and furthest position per (student, lecture), flushed in batches"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # serializes writes so an older batch never lands after a newer one
+        self.flush_lock = threading.Lock()
+        self.pending = {}
+        self.access = {}
+        self.timer = None
+
+    def lookup(self, student_id, lecture_id):
+        """
+        (course_id, duration) of a lecture the student may track,
+        None when not enrolled or the lecture does not exist
+        """
+        key = (student_id, lecture_id)
+        now = time.monotonic()
+        cached = self.access.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        row = Lecture.objects.filter(
+            pk=lecture_id,
+            section__course__enrollments__student_id=student_id,
+            section__course__enrollments__is_active=True,
+        ).values_list('section__course_id', 'duration').first()
+        if row is None:
+            self.access.pop(key, None)
+            return None
+        if len(self.access) >= MAX_ACCESS_ENTRIES:
+            self.access.clear()
+        self.access[key] = (now + _setting('HEARTBEAT_ACCESS_TTL', 60), row)
+        return row
+
+    def add(self, student_id, lecture_id, position):
+        """Buffer one heartbeat, flushing when the size threshold is reached"""
+        with self.lock:
+            key = (student_id, lecture_id)
+            latest, furthest = self.pending.get(key, (0, 0))
+            self.pending[key] = (position, max(furthest, position))
+            full = len(self.pending) >= _setting('HEARTBEAT_FLUSH_SIZE', 1000)
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def _schedule(self):
+        interval = _setting('HEARTBEAT_FLUSH_INTERVAL', 5)
+        if self.timer is None and interval > 0:
+            self.timer = threading.Timer(interval, self._flush_from_timer)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Write every buffered position, returns the number of (student, lecture) keys"""
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+            if not pending:
+                return 0
+            return self._write(pending)
+
+    def _write(self, pending):
+        now = timezone.now()
+        fraction = _setting('HEARTBEAT_COMPLETE_FRACTION', 0.9)
+        keys = list(pending)
+        lectures = {
+            lecture_id: (course_id, duration)
+            for lecture_id, course_id, duration in Lecture.objects.filter(
+                pk__in={lecture_id for _, lecture_id in keys}
+            ).values_list('id', 'section__course_id', 'duration')
+        }
+
+        def completes(key, furthest):
+            course_id, duration = lectures.get(key[1], (None, 0))
+            return bool(duration) and furthest >= duration * fraction
+
+        existing = []
+        for start in range(0, len(keys), 200):
+            condition = Q()
+            for student_id, lecture_id in keys[start:start + 200]:
+                condition |= Q(student_id=student_id, lecture_id=lecture_id)
+            existing.extend(LectureProgress.objects.filter(condition))
+
+        # (student_id, lecture_id) of existing rows completed by this batch
+        completed = []
+        for progress in existing:
+            key = (progress.student_id, progress.lecture_id)
+            latest, furthest = pending.pop(key)
+            progress.last_position = latest
+            progress.watch_time = max(progress.watch_time, furthest)
+            progress.updated_at = now
+            if not progress.is_completed and completes(key, furthest):
+                progress.is_completed = True
+                progress.completed_at = now
+                completed.append(key)
+        LectureProgress.objects.bulk_update(
+            existing,
+            ['last_position', 'watch_time', 'is_completed', 'completed_at', 'updated_at'],
+            batch_size=500,
+        )
+
+        created = []
+        # (student_id, course_id) whose new rows may complete lectures
+        recount = set()
+        for (student_id, lecture_id), (latest, furthest) in pending.items():
+            done = completes((student_id, lecture_id), furthest)
+            if done:
+                recount.add((student_id, lectures[lecture_id][0]))
+            created.append(LectureProgress(
+                student_id=student_id,
+                lecture_id=lecture_id,
+                last_position=latest,
+                watch_time=furthest,
+                is_completed=done,
+                completed_at=now if done else None,
+            ))
+        LectureProgress.objects.bulk_create(created, batch_size=500, ignore_conflicts=True)
+
+        # bulk writes skip the LectureProgress signals, apply their deltas here
+        for student_id, lecture_id in completed:
+            if not CourseProgress.apply_completion_delta(student_id, lecture_id, 1):
+                recount.add((student_id, lectures[lecture_id][0]))
+        # ignore_conflicts does not tell which rows were inserted: a row another
+        # request created meanwhile was counted there, so new rows are recounted
+        for student_id, course_id in recount:
+            course_progress, _ = CourseProgress.objects.get_or_create(
+                student_id=student_id, course_id=course_id,
+                defaults={'total_lectures': 0}
+            )
+            course_progress.update_progress()
+        analytics.invalidate(*{course_id for course_id, _ in lectures.values()})
+
+        return len(existing) + len(created)
+
+
+_buffer = HeartbeatBuffer()
+
+
+def get_buffer():
+    return _buffer
+
+
+def reset():
+    """Drop buffered positions and cached access checks without writing them"""
+    global _buffer
+    if _buffer.timer is not None:
+        _buffer.timer.cancel()
+    _buffer = HeartbeatBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    if _buffer.pending:
+        _buffer.flush()
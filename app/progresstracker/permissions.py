@@ -2,7 +2,7 @@
 Custome Permission to check if enrolled
 """
 from rest_framework.permissions import BasePermission
-from core.models import Enrollment, Lecture
+from core.access import get_access
 
 class IsEnrolledInLectureCourse(BasePermission):
     """
@@ -16,14 +16,35 @@ class IsEnrolledInLectureCourse(BasePermission):
         lecture_id = view.kwargs.get('lecture_id')
         if not lecture_id:
             return False
-        try:
-            lecture = Lecture.objects.get(pk=lecture_id)
-        except Lecture.DoesNotExist:
+        access = get_access(request.user)
+        return access.is_enrolled(access.lecture_course_id(lecture_id))
+
+
+
+
+class IsEnrolledInCourse(BasePermission):
+    """
+    Only allow access if the requesting user has an active enrollment
+    in the course from the URL.
+    """
+
+    message = 'You must be enrolled in this course to mark progress.'
+
+    def has_permission(self, request, view):
+        course_id = view.kwargs.get('course_id')
+        if not course_id:
             return False
 
-        return Enrollment.objects.filter(
-            student=request.user,
-            course=lecture.section.course
-        ).exists()
+        return get_access(request.user).is_enrolled(course_id, active_only=True)
 
 
+class IsInstructorOfCourse(BasePermission):
+    """
+    Only allow access if the requesting user teaches
+    the course from the URL.
+    """
+
+    message = 'You must be an instructor of this course to view its analytics.'
+
+    def has_permission(self, request, view):
+        return get_access(request.user).is_instructor(view.kwargs.get('course_id'))
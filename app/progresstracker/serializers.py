@@ -1,10 +1,14 @@
 """
 Serializers for Lecture and Course Progress
 """
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import serializers
 
 from core.models import LectureProgress, CourseProgress, Lecture, Enrollment
+from progresstracker import analytics
 
 
 class LectureProgressSerializer(serializers.ModelSerializer):
@@ -16,11 +20,11 @@ class LectureProgressSerializer(serializers.ModelSerializer):
         model = LectureProgress
         fields = [
             'id', 'student', 'lecture', 'is_completed', 'completed_at',
-            'watch_time', 'created_at', 'updated_at'
+            'watch_time', 'last_position', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'student', 'lecture', 'is_completed', 'completed_at',
-            'watch_time', 'created_at', 'updated_at'
+            'watch_time', 'last_position', 'created_at', 'updated_at'
         ]
 
     def create(self, validated_data):
@@ -63,3 +67,106 @@ class CourseProgressSerializer(serializers.ModelSerializer):
             'student', 'course', 'completed_lectures', 'total_lectures',
             'progress_percentage', 'last_accessed', 'created_at'
         ]
+
+
+class BulkLectureCompleteSerializer(serializers.Serializer):
+    """
+    Serializer handling POST of many completed lectures of one course,
+    given as lecture IDs or as a whole section
+    """
+    lecture_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    section = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        if ('lecture_ids' in attrs) == ('section' in attrs):
+            raise serializers.ValidationError("Provide either lecture_ids or section.")
+
+        lectures = Lecture.objects.filter(section__course=self.context['course_id'])
+        if 'section' in attrs:
+            lectures = lectures.filter(section=attrs['section'])
+        else:
+            lectures = lectures.filter(id__in=attrs['lecture_ids'])
+        attrs['lectures'] = list(lectures.values_list('id', flat=True))
+
+        if 'section' in attrs and not attrs['lectures']:
+            raise serializers.ValidationError(
+                {'section': "Section not found in this course or has no lectures."}
+            )
+        unknown = set(attrs.get('lecture_ids', ())) - set(attrs['lectures'])
+        if unknown:
+            raise serializers.ValidationError(
+                {'lecture_ids': f"Lectures not found in this course: {sorted(unknown)}"}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Upsert every LectureProgress row in two statements and recount
+        CourseProgress once, in one transaction. Bypasses LectureProgress.save(),
+        the enrollment it validates is checked once by the view permission.
+        """
+        student = self.context['request'].user
+        lecture_ids = validated_data['lectures']
+        now = timezone.now()
+        with transaction.atomic():
+            rows = LectureProgress.objects.filter(student=student, lecture_id__in=lecture_ids)
+
+            existing = dict(rows.values_list('lecture_id', 'is_completed'))
+            durations = dict(
+                Lecture.objects.filter(id__in=set(lecture_ids) - set(existing))
+                .values_list('id', 'duration')
+            )
+            LectureProgress.objects.bulk_create([
+                LectureProgress(
+                    student=student,
+                    lecture_id=lecture_id,
+                    is_completed=True,
+                    completed_at=now,
+                    watch_time=duration,
+                )
+                for lecture_id, duration in durations.items()
+            ], ignore_conflicts=True)
+
+            # Also completes rows a concurrent request inserted incomplete
+            rows.filter(is_completed=False).update(
+                is_completed=True,
+                completed_at=now,
+                watch_time=Subquery(
+                    Lecture.objects.filter(pk=OuterRef('lecture_id')).values('duration')[:1]
+                ),
+                updated_at=now,
+            )
+
+            course_progress, _ = CourseProgress.objects.get_or_create(
+                student=student,
+                course_id=self.context['course_id'],
+                defaults={'total_lectures': 0}
+            )
+            course_progress.update_progress()
+        # after the commit, a concurrent read cannot cache the old figures again
+        analytics.invalidate(course_progress.course_id)
+        already_completed = sum(existing.values())
+        return {
+            'completed': len(lecture_ids) - already_completed,
+            'already_completed': already_completed,
+            'progress': course_progress,
+        }
+
+    def to_representation(self, instance):
+        return {
+            'completed': instance['completed'],
+            'already_completed': instance['already_completed'],
+            'progress': CourseProgressSerializer(instance['progress']).data,
+        }
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    """
+    Serializer handling a playback position report
+    """
+    position = serializers.IntegerField(min_value=0)
@@ -0,0 +1,25 @@
+"""
+Signals dropping cached progress analytics (see progresstracker/analytics.py)
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import CourseProgress, LectureProgress
+from core.oncommit import on_commit_once
+from core.signal.signals import progress_recalculated
+from progresstracker import analytics
+
+
+@receiver(post_save, sender=LectureProgress)
+@receiver(post_delete, sender=LectureProgress)
+def invalidate_analytics_on_progress_write(sender, instance, **kwargs):
+    """
+    Drop the analytics of the lecture's course once the write commits,
+    one lookup for every lecture written in the transaction.
+    """
+    on_commit_once(analytics.invalidate_lectures, [instance.lecture_id])
+
+
+@receiver(progress_recalculated, sender=CourseProgress)
+def invalidate_analytics_on_recount(sender, course_ids, **kwargs):
+    analytics.invalidate(*course_ids)
@@ -1,7 +1,11 @@
 """
 Test for Progress Tracker - Lecture and Progress Tracker API
 """
+from unittest import mock
+
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
@@ -9,6 +13,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from core.models import (User, Course, Category, SubCategory,
                          Section, Lecture, Enrollment, LectureProgress,
                          CourseProgress)
+from progresstracker import heartbeat
 
 
 class ProgressAPITest(APITestCase):
@@ -204,3 +209,246 @@ class ProgressAPITest(APITestCase):
         url = reverse('course:my-progress')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_mark_lectures_complete(self):
+        """Test POST marks many lectures complete and recounts progress once"""
+        self.client.force_authenticate(user=self.student)
+        lecture2 = Lecture.objects.create(
+            section=self.section, title="Lesson 2", order=2,
+            duration=400, content_type="article", article="Text"
+        )
+        lecture3 = Lecture.objects.create(
+            section=self.section, title="Lesson 3", order=3,
+            duration=200, content_type="article", article="Text"
+        )
+        LectureProgress.objects.create(student=self.student, lecture=self.lecture, is_completed=True)
+        LectureProgress.objects.create(student=self.student, lecture=lecture2, is_completed=False)
+
+        url = reverse('course:bulk-mark-lectures-complete', kwargs={'course_id': self.course.id})
+        response = self.client.post(
+            url, {'lecture_ids': [self.lecture.id, lecture2.id, lecture3.id]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['completed'], 2)
+        self.assertEqual(response.data['already_completed'], 1)
+        self.assertEqual(response.data['progress']['completed_lectures'], 3)
+        self.assertEqual(float(response.data['progress']['progress_percentage']), 100.0)
+        self.assertEqual(
+            dict(LectureProgress.objects.filter(student=self.student)
+                 .values_list('lecture_id', 'watch_time')),
+            {self.lecture.id: 300, lecture2.id: 400, lecture3.id: 200}
+        )
+
+        response = self.client.post(url, {'section': self.section.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['completed'], 0)
+
+    def test_bulk_mark_lectures_complete_is_one_transaction(self):
+        """Test a failing recount leaves no lecture marked complete"""
+        self.client.force_authenticate(user=self.student)
+        url = reverse('course:bulk-mark-lectures-complete', kwargs={'course_id': self.course.id})
+        with mock.patch.object(CourseProgress, 'update_progress', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            self.client.post(url, {'lecture_ids': [self.lecture.id]}, format='json')
+        self.assertFalse(LectureProgress.objects.exists())
+
+    def test_bulk_mark_lectures_complete_validation(self):
+        """Test enrollment, foreign lectures and missing input are rejected"""
+        other_course = Course.objects.create(
+            title='Other', description='Other', category=self.category, price=10
+        )
+        other_lecture = Lecture.objects.create(
+            section=Section.objects.create(course=other_course, title="S", order=1),
+            title="Foreign", order=1, duration=60, content_type="article", article="Text"
+        )
+        self.client.force_authenticate(user=self.student)
+        url = reverse('course:bulk-mark-lectures-complete', kwargs={'course_id': self.course.id})
+
+        response = self.client.post(url, {'lecture_ids': [self.lecture.id, other_lecture.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(LectureProgress.objects.exists())
+
+        response = self.client.post(url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse('course:bulk-mark-lectures-complete', kwargs={'course_id': other_course.id})
+        response = self.client.post(url, {'lecture_ids': [other_lecture.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(HEARTBEAT_FLUSH_INTERVAL=0, HEARTBEAT_FLUSH_SIZE=100,
+                   HEARTBEAT_COMPLETE_FRACTION=0.9)
+class HeartbeatAPITest(APITestCase):
+    """Test buffered playback heartbeats"""
+
+    def setUp(self):
+        ProgressAPITest.setUp(self)
+        heartbeat.reset()
+        self.addCleanup(heartbeat.reset)
+        self.url = reverse('course:lecture-heartbeat', kwargs={'lecture_id': self.lecture.id})
+
+    def test_heartbeats_are_coalesced_until_flush(self):
+        """Test heartbeats write nothing until flushed, then one row per lecture"""
+        self.client.force_authenticate(user=self.student)
+        for position in (10, 20, 30, 15):
+            response = self.client.post(self.url, {'position': position})
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(LectureProgress.objects.exists())
+
+        self.assertEqual(heartbeat.get_buffer().flush(), 1)
+        progress = LectureProgress.objects.get(student=self.student, lecture=self.lecture)
+        self.assertEqual((progress.last_position, progress.watch_time), (15, 30))
+        self.assertFalse(progress.is_completed)
+
+        # A later save keeps the watch time of an unfinished lecture
+        progress = LectureProgress.objects.get(pk=progress.pk)
+        progress.save()
+        progress.refresh_from_db()
+        self.assertEqual(progress.watch_time, 30)
+
+    def test_heartbeat_past_threshold_completes_lecture(self):
+        """Test reaching the completion fraction completes the lecture and course progress"""
+        self.client.force_authenticate(user=self.student)
+        self.client.post(self.url, {'position': 100})
+        heartbeat.get_buffer().flush()
+        self.client.post(self.url, {'position': 280})
+        heartbeat.get_buffer().flush()
+
+        progress = LectureProgress.objects.get(student=self.student, lecture=self.lecture)
+        self.assertTrue(progress.is_completed)
+        self.assertIsNotNone(progress.completed_at)
+        course_progress = CourseProgress.objects.get(student=self.student, course=self.course)
+        self.assertEqual(course_progress.completed_lectures, 1)
+        self.assertEqual(float(course_progress.progress_percentage), 100.0)
+
+    def test_heartbeat_flushes_at_size_threshold(self):
+        """Test the buffer writes itself once it holds HEARTBEAT_FLUSH_SIZE keys"""
+        self.client.force_authenticate(user=self.student)
+        lecture2 = Lecture.objects.create(
+            section=self.section, title="Lesson 2", order=2,
+            duration=400, content_type="article", article="Text"
+        )
+        with self.settings(HEARTBEAT_FLUSH_SIZE=2):
+            self.client.post(self.url, {'position': 5})
+            self.assertFalse(LectureProgress.objects.exists())
+            self.client.post(
+                reverse('course:lecture-heartbeat', kwargs={'lecture_id': lecture2.id}),
+                {'position': 5}
+            )
+        self.assertEqual(LectureProgress.objects.filter(student=self.student).count(), 2)
+
+    def test_heartbeat_requires_enrollment(self):
+        """Test heartbeats for courses the student is not enrolled in are refused"""
+        other_student = User.objects.create_user(email='other@test.com', password='Testpass123!')
+        self.client.force_authenticate(user=other_student)
+
+        response = self.client.post(self.url, {'position': 10})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(self.url, {'position': -1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_refusal_is_not_cached(self):
+        """Test a student enrolling after a refused heartbeat is accepted"""
+        other_student = User.objects.create_user(email='other@test.com', password='Testpass123!')
+        self.client.force_authenticate(user=other_student)
+        self.assertEqual(self.client.post(self.url, {'position': 10}).status_code,
+                         status.HTTP_403_FORBIDDEN)
+        Enrollment.objects.create(student=other_student, course=self.course)
+        self.assertEqual(self.client.post(self.url, {'position': 10}).status_code,
+                         status.HTTP_202_ACCEPTED)
+
+    def test_revoked_enrollment_expires_with_the_access_ttl(self):
+        """Test a cached grant is checked again once HEARTBEAT_ACCESS_TTL has passed"""
+        self.client.force_authenticate(user=self.student)
+        with self.settings(HEARTBEAT_ACCESS_TTL=0):
+            self.assertEqual(self.client.post(self.url, {'position': 10}).status_code,
+                             status.HTTP_202_ACCEPTED)
+            Enrollment.objects.filter(student=self.student).update(is_active=False)
+            self.assertEqual(self.client.post(self.url, {'position': 20}).status_code,
+                             status.HTTP_403_FORBIDDEN)
+
+    def test_row_created_concurrently_is_not_counted_twice(self):
+        """Test a completion inserted by another request meanwhile is counted once"""
+        self.client.force_authenticate(user=self.student)
+        self.client.post(self.url, {'position': 290})
+        bulk_update = LectureProgress.objects.bulk_update
+
+        def mark_complete_meanwhile(*args, **kwargs):
+            # another request marks the lecture complete between the read and the insert
+            LectureProgress.objects.create(student=self.student, lecture=self.lecture,
+                                           is_completed=True)
+            return bulk_update(*args, **kwargs)
+
+        with mock.patch.object(LectureProgress.objects, 'bulk_update', mark_complete_meanwhile):
+            heartbeat.get_buffer().flush()
+        course_progress = CourseProgress.objects.get(student=self.student, course=self.course)
+        self.assertEqual(course_progress.completed_lectures, 1)
+
+
+class ProgressAnalyticsAPITest(APITestCase):
+    """Test the instructor progress analytics endpoint"""
+
+    def setUp(self):
+        # committed, so the tests' own after-commit work gets its own callbacks
+        with self.captureOnCommitCallbacks(execute=True):
+            ProgressAPITest.setUp(self)
+            cache.clear()
+            self.lecture2 = Lecture.objects.create(
+                section=self.section, title="Next", order=2, duration=60,
+                content_type="article", article="Notes"
+            )
+            self.url = reverse('course:course-progress-analytics', kwargs={'course_id': self.course.id})
+            self.students = [self.student] + [
+                User.objects.create_user(email=f's{number}@test.com', password='Testpass123!')
+                for number in range(3)
+            ]
+            for student in self.students[1:]:
+                Enrollment.objects.create(student=student, course=self.course)
+            # 100%, 50%, 50%, 0%
+            LectureProgress.objects.create(student=self.students[0], lecture=self.lecture, is_completed=True)
+            LectureProgress.objects.create(student=self.students[0], lecture=self.lecture2, is_completed=True)
+            LectureProgress.objects.create(student=self.students[1], lecture=self.lecture, is_completed=True)
+            LectureProgress.objects.create(student=self.students[2], lecture=self.lecture, is_completed=True)
+            LectureProgress.objects.create(student=self.students[3], lecture=self.lecture)
+
+    def test_histogram_median_and_lectures(self):
+        """Test buckets, median and per-lecture counts"""
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['students'], 4)
+        self.assertEqual(data['median_percentage'], 50.0)
+        self.assertEqual(data['average_percentage'], 50.0)
+        self.assertEqual(
+            {row['bucket']: row['students'] for row in data['histogram']},
+            {'0': 1, '1-25': 0, '26-50': 2, '51-75': 0, '76-99': 0, '100': 1}
+        )
+        self.assertEqual(
+            [(row['id'], row['started'], row['completed'], row['drop_off']) for row in data['lectures']],
+            [(self.lecture.id, 4, 3, 0), (self.lecture2.id, 1, 1, 2)]
+        )
+        self.assertEqual(data['lectures'][0]['completion_rate'], 75.0)
+
+    def test_cached_until_progress_changes(self):
+        """Test repeated requests are cached and progress writes invalidate them"""
+        self.client.force_authenticate(user=self.instructor)
+        self.client.get(self.url)
+        with self.assertNumQueries(2):  # the instructor check and the cached analytics
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LectureProgress.objects.create(student=self.students[3], lecture=self.lecture2,
+                                           is_completed=True)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['median_percentage'], 50.0)
+        self.assertEqual(data['lectures'][1]['completed'], 2)
+
+    def test_instructor_only(self):
+        """Test students and other instructors are forbidden"""
+        other = User.objects.create_user(email='other@test.com', password='Testpass123!',
+                                         role='instructor')
+        for user in (self.student, other):
+            self.client.force_authenticate(user=user)
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
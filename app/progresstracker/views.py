@@ -6,11 +6,16 @@ from enrollment import serializers
 from core.models import Lecture, Section, Course, Enrollment
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 
 from core.models import LectureProgress, CourseProgress
-from progresstracker.serializers import LectureProgressSerializer, CourseProgressSerializer
-from progresstracker.permissions import IsEnrolledInLectureCourse
+from progresstracker import analytics, heartbeat
+from progresstracker.serializers import (LectureProgressSerializer, CourseProgressSerializer,
+                                         BulkLectureCompleteSerializer, HeartbeatSerializer)
+from progresstracker.permissions import (IsEnrolledInLectureCourse, IsEnrolledInCourse,
+                                         IsInstructorOfCourse)
 
 
 class MarkLectureCompleteView(generics.CreateAPIView):
@@ -28,6 +33,44 @@ class MarkLectureCompleteView(generics.CreateAPIView):
         return context
 
 
+class BulkMarkLecturesCompleteView(generics.CreateAPIView):
+    """
+    Mark many lectures of the course provided from URL complete,
+    body: {"lecture_ids": [...]} or {"section": id}
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsEnrolledInCourse]
+    serializer_class = BulkLectureCompleteSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['course_id'] = self.kwargs['course_id']
+        return context
+
+
+class LectureHeartbeatView(generics.GenericAPIView):
+    """
+    Report the playback position of the lecture provided from URL.
+    Buffered and written in batches, see progresstracker/heartbeat.py
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = HeartbeatSerializer
+
+    def post(self, request, lecture_id):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        buffer = heartbeat.get_buffer()
+        lecture = buffer.lookup(request.user.id, lecture_id)
+        if lecture is None:
+            raise PermissionDenied(IsEnrolledInLectureCourse.message)
+        course_id, duration = lecture
+
+        buffer.add(request.user.id, lecture_id, min(serializer.validated_data['position'], duration))
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
 class MarkLectureIncompleteView(generics.UpdateAPIView):
     """
     Mark Lecture provided from URL complete
@@ -66,3 +109,15 @@ class CourseProgressViewAll(generics.ListAPIView):
 
     def get_queryset(self):
         return CourseProgress.objects.filter(student=self.request.user).order_by('-last_accessed')
+
+
+class CourseProgressAnalyticsView(generics.GenericAPIView):
+    """
+    Progress distribution, median completion and per-lecture
+    completion counts of the course provided from URL (instructors only)
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsInstructorOfCourse]
+
+    def get(self, request, course_id):
+        return Response(analytics.get_course_analytics(course_id))